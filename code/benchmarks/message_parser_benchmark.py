@@ -0,0 +1,97 @@
+'''
+Compares MessageParser.replace_mentions against the implementation that it replaced, which compiled a regex and
+rescanned the message for every resolved id. Run it from the code directory: python -m benchmarks.message_parser_benchmark
+'''
+
+import re
+import timeit
+
+from common.message_parser import MessageParser
+
+
+def legacy_replace_mentions(
+        message: str,
+        interaction_data: dict,
+        hide_mention_formatting = True,
+        hide_meta_mentions = True,
+        anonymize_mentions = False
+):
+    ## In string, replace instances of discord_id with replacement
+    def replace_id_with_string(string, discord_id, replacement):
+        match = re.search(f"<[@|#][!|&]?({discord_id})>", string)
+        if(match):
+            if (hide_mention_formatting):
+                start, end = match.span(0)
+            else:
+                start, end = match.span(1)
+
+            string = string[:start] + replacement + string[end:]
+
+        return string
+
+
+    id_mapping = {}
+    unique_mention_counter = 0
+
+    for user in interaction_data.get("resolved", {}).get("users", {}).values():
+        id_mapping[user["id"]] = f"user{unique_mention_counter}" if anonymize_mentions else user["username"]
+
+    for member in interaction_data.get("resolved", {}).get("members", {}).values():
+        id_mapping[member["user"]["id"]] = f"member{unique_mention_counter}" if anonymize_mentions else member.get("nick") or member["user"]["username"]
+
+    for channel in interaction_data.get("resolved", {}).get("channels", {}).values():
+        id_mapping[channel["id"]] = f"channel{unique_mention_counter}" if anonymize_mentions else channel["name"]
+
+    for role in interaction_data.get("resolved", {}).get("roles", {}).values():
+        id_mapping[role["id"]] = f"role{unique_mention_counter}" if anonymize_mentions else role["name"]
+
+    for discord_id, replacement in id_mapping.items():
+        message = replace_id_with_string(message, discord_id, replacement)
+
+        if (hide_meta_mentions):
+            message = message.replace(discord_id, "")
+        else:
+            message = message.replace(discord_id, replacement)
+
+    return message
+
+
+def build_interaction_data(mention_count: int) -> tuple[str, dict]:
+    '''Builds a command string that mentions the given number of users, and the interaction data that resolves them'''
+
+    user_ids = [str(100000000000000000 + index) for index in range(mention_count)]
+    users = {user_id: {"id": user_id, "username": f"someone{index}"} for index, user_id in enumerate(user_ids)}
+    message = "/clip name:hello " + " ".join(f"user:<@{user_id}>" for user_id in user_ids)
+
+    return message, {"resolved": {"users": users}}
+
+
+def main():
+    message_parser = MessageParser()
+    iterations = 20000
+
+    for mention_count in (1, 4, 16):
+        message, interaction_data = build_interaction_data(mention_count)
+        for options in ({}, {"hide_mention_formatting": False, "hide_meta_mentions": False}):
+            assert (
+                message_parser.replace_mentions(message, interaction_data, **options) ==
+                legacy_replace_mentions(message, interaction_data, **options)
+            )
+
+        legacy_seconds = timeit.timeit(
+            lambda: legacy_replace_mentions(message, interaction_data, False, False),
+            number=iterations
+        )
+        current_seconds = timeit.timeit(
+            lambda: message_parser.replace_mentions(message, interaction_data, False, False),
+            number=iterations
+        )
+
+        print(
+            f"{mention_count:>2} mention(s): legacy {legacy_seconds / iterations * 1e6:.2f}us, "
+            f"current {current_seconds / iterations * 1e6:.2f}us ({legacy_seconds / current_seconds:.1f}x)"
+        )
+
+
+if (__name__ == "__main__"):
+    main()
@@ -15,14 +15,15 @@ import discord
 from discord.ext import commands
 
 from core.cogs import admin_cog, help_cog
-from common import audio_player, message_parser
-from common.cogs import privacy_management_cog, invite_cog
+from common import audio_player, executor_pool, message_parser
+from common.cogs import privacy_management_cog, invite_cog, metrics_cog, diagnostics_cog
 from common.configuration import Configuration
 from common.logging import Logging
-from common.command_management import invoked_command_handler, command_reconstructor
+from common.command_management import invoked_command_handler, command_reconstructor, command_rate_limiter
 from common.database import database_manager
 from common.database.factories import anonymous_item_factory
 from common.database.clients.dynamo_db import dynamo_db_client
+from common.metrics import metrics_manager
 from common.module.module_manager import ModuleManager
 from common.ui import component_factory
 from modules.clips import clips
@@ -55,6 +56,11 @@ class Clipster:
         self._module_manager = ModuleManager(self, self.bot)
 
         ## Register the modules (no circular dependencies!)
+        self.module_manager.register_module(metrics_manager.MetricsManager)
+        self.module_manager.register_module(
+            executor_pool.ExecutorPool,
+            dependencies=[metrics_manager.MetricsManager]
+        )
         self.module_manager.register_module(message_parser.MessageParser)
         self.module_manager.register_module(
             command_reconstructor.CommandReconstructor,
@@ -67,7 +73,7 @@ class Clipster:
         self.module_manager.register_module(
             database_manager.DatabaseManager,
             dynamo_db_client.DynamoDbClient(),
-            dependencies=[command_reconstructor.CommandReconstructor, anonymous_item_factory.AnonymousItemFactory]
+            dependencies=[command_reconstructor.CommandReconstructor, anonymous_item_factory.AnonymousItemFactory, metrics_manager.MetricsManager]
         )
         self.module_manager.register_module(
             component_factory.ComponentFactory,
@@ -78,31 +84,46 @@ class Clipster:
             admin_cog.AdminCog,
             self,
             self.bot,
-            dependencies=[database_manager.DatabaseManager]
+            dependencies=[database_manager.DatabaseManager, metrics_manager.MetricsManager]
         )
         self.module_manager.register_module(
             privacy_management_cog.PrivacyManagementCog,
             self.bot,
-            dependencies=[component_factory.ComponentFactory, database_manager.DatabaseManager]
+            dependencies=[component_factory.ComponentFactory, database_manager.DatabaseManager, metrics_manager.MetricsManager]
         )
         self.module_manager.register_module(
             invite_cog.InviteCog,
             self.bot,
             dependencies=[component_factory.ComponentFactory, database_manager.DatabaseManager]
         )
+        self.module_manager.register_module(
+            command_rate_limiter.CommandRateLimiter,
+            self.bot,
+            dependencies=[metrics_manager.MetricsManager]
+        )
         self.module_manager.register_module(
             invoked_command_handler.InvokedCommandHandler,
-            dependencies=[message_parser.MessageParser, database_manager.DatabaseManager, command_reconstructor.CommandReconstructor]
+            dependencies=[message_parser.MessageParser, database_manager.DatabaseManager, command_reconstructor.CommandReconstructor, metrics_manager.MetricsManager]
         )
         self.module_manager.register_module(
             audio_player.AudioPlayer,
             self.bot,
-            dependencies=[admin_cog.AdminCog, database_manager.DatabaseManager]
+            dependencies=[admin_cog.AdminCog, database_manager.DatabaseManager, metrics_manager.MetricsManager]
+        )
+        self.module_manager.register_module(
+            metrics_cog.MetricsCog,
+            self.bot,
+            dependencies=[metrics_manager.MetricsManager, audio_player.AudioPlayer]
+        )
+        self.module_manager.register_module(
+            diagnostics_cog.DiagnosticsCog,
+            self.bot,
+            dependencies=[admin_cog.AdminCog, database_manager.DatabaseManager, metrics_manager.MetricsManager]
         )
         self.module_manager.register_module(
             help_cog.HelpCog,
             self.bot,
-            dependencies=[component_factory.ComponentFactory, clips.Clips, database_manager.DatabaseManager]
+            dependencies=[component_factory.ComponentFactory, clips.Clips, database_manager.DatabaseManager, executor_pool.ExecutorPool]
         )
 
         ## Find any dynamic modules, and prep them for loading
@@ -0,0 +1,59 @@
+import random
+from array import array
+from typing import Sequence
+
+
+class AliasSampler:
+    '''
+    Draws weighted random indexes in constant time, with Vose's alias method. The weights are split into equal sized
+    columns up front, where each column holds (at most) two indexes: its own, and an alias that fills out the rest of
+    the column. A draw just picks a column, and then flips a biased coin between the two.
+    '''
+
+    def __init__(self, weights: Sequence[float]):
+        count = len(weights)
+        total = sum(weights)
+        if (count == 0 or total <= 0 or any(weight < 0 for weight in weights)):
+            raise ValueError("Weights must be non-negative, with at least one positive weight")
+
+        self._count = count
+        self._probabilities = array('d', bytes(8 * count))
+        self._aliases = array('I', bytes(4 * count))
+
+        scaled = [weight * count / total for weight in weights]
+        small = [index for index, weight in enumerate(scaled) if weight < 1]
+        large = [index for index, weight in enumerate(scaled) if weight >= 1]
+
+        while (small and large):
+            small_index = small.pop()
+            large_index = large.pop()
+
+            self._probabilities[small_index] = scaled[small_index]
+            self._aliases[small_index] = large_index
+
+            ## The large weight gives up whatever it took to fill out the small weight's column
+            scaled[large_index] = (scaled[large_index] + scaled[small_index]) - 1
+            if (scaled[large_index] < 1):
+                small.append(large_index)
+            else:
+                large.append(large_index)
+
+        ## Anything that's left over is (within floating point error) a full column
+        for index in large + small:
+            self._probabilities[index] = 1.0
+
+    ## Magic Methods
+
+    def __len__(self) -> int:
+        return self._count
+
+    ## Methods
+
+    def sample(self, rng: random.Random = random) -> int:
+        '''Draws a random index, with a probability proportional to its weight'''
+
+        index = int(rng.random() * self._count)
+        if (rng.random() < self._probabilities[index]):
+            return index
+
+        return self._aliases[index]
@@ -16,6 +16,8 @@ from common.configuration import Configuration
 from common.exceptions import UnableToConnectToVoiceChannelException, NoVoiceChannelAvailableException
 from common.logging import Logging
 from common.database.database_manager import DatabaseManager
+from common.metrics.metrics_manager import MetricsManager
+from common.metrics.play_latency_tracker import PlayLatencyTimeline, PlayLatencyTracker
 from common.module.module import Cog
 
 import discord
@@ -42,7 +44,8 @@ class AudioPlayRequest:
         audio: FFmpegPCMAudio,
         file_path: Path,
         interaction: Interaction = None,
-        callback: Callable = None
+        callback: Callable = None,
+        timeline: PlayLatencyTimeline = None
     ):
         self.author = author
         self.target = target
@@ -51,6 +54,7 @@ class AudioPlayRequest:
         self.file_path = file_path
         self.interaction = interaction
         self.callback = callback
+        self.timeline = timeline
         self.skipped = False
 
 
@@ -58,6 +62,36 @@ class AudioPlayRequest:
         return f"'{self.author.name if self.author else 'No Author'}' in '{self.channel.name}' wants '{self.file_path}'"
 
 
+class FirstFrameNotifyingAudioSource(discord.AudioSource):
+    '''
+    Wraps an AudioSource, and invokes a callback when the first frame of audio is read from it. Note that reads happen
+    in the voice client's player thread, so the callback shouldn't touch the event loop.
+    '''
+
+    def __init__(self, source: discord.AudioSource, on_first_frame: Callable[[], None]):
+        self.source = source
+        self._on_first_frame = on_first_frame
+
+
+    def read(self) -> bytes:
+        data = self.source.read()
+
+        if (self._on_first_frame is not None):
+            on_first_frame = self._on_first_frame
+            self._on_first_frame = None
+            on_first_frame()
+
+        return data
+
+
+    def is_opus(self) -> bool:
+        return self.source.is_opus()
+
+
+    def cleanup(self):
+        self.source.cleanup()
+
+
 class ServerStateManager:
     '''
     Manages the state of the bot in a given server.
@@ -216,6 +250,23 @@ class ServerStateManager:
             await clean_up_voice_client()
 
 
+    async def send_play_request_error(self, message: str):
+        '''Lets the active play request's requester know that it couldn't be played'''
+
+        interaction = self.active_play_request.interaction
+        if (interaction is None):
+            return
+
+        ## Voice connections happen after the command has been responded to, so this is usually a followup
+        try:
+            if (interaction.response.is_done()):
+                await interaction.followup.send(message, ephemeral=True)
+            else:
+                await interaction.response.send_message(message, ephemeral=True)
+        except discord.HTTPException as e:
+            LOGGER.warning("Unable to send the play request's error message", exc_info=e)
+
+
     async def audio_player_loop(self):
         '''
         Audio player event loop task.
@@ -232,6 +283,8 @@ class ServerStateManager:
                     async with async_timeout.timeout(self.channel_timeout_seconds):
                         self.active_play_request: AudioPlayRequest = await self.audio_play_queue.get()
                         LOGGER.debug(f"Got new audio play request: {self.active_play_request}")
+                        if (self.active_play_request.timeline is not None):
+                            self.active_play_request.timeline.mark(PlayLatencyTimeline.DEQUEUED)
                 except asyncio.TimeoutError:
                     if (self.voice_client and self.voice_client.is_connected()):
                         self.bot.loop.create_task(self.disconnect(inactive=True))
@@ -241,19 +294,22 @@ class ServerStateManager:
                     continue
 
                 ## Join the requester's voice channel & play their requested audio (Or Handle the appropriate exception)
+                timeline = self.active_play_request.timeline
                 try:
                     self.voice_client = await self.get_voice_client(self.active_play_request.channel)
+                    if (timeline is not None):
+                        timeline.mark(PlayLatencyTimeline.CONNECTED)
                 except futures.TimeoutError:
                     LOGGER.error("Timed out trying to connect to the voice channel")
-                    if (self.active_play_request.interaction is not None and self.active_play_request.interaction.followup is not None):
-                        await self.active_play_request.interaction.response.send_message(
-                            f"Sorry <@{self.active_play_request.author.id}>, I can't connect to that channel right now.",
-                            ephemeral=True
-                        )
+                    self.audio_player_cog.play_latency_tracker.record(timeline)
+                    await self.send_play_request_error(
+                        f"Sorry <@{self.active_play_request.author.id}>, I can't connect to that channel right now."
+                    )
                     continue
 
                 except UnableToConnectToVoiceChannelException as e:
                     LOGGER.error("Unable to connect to voice channel")
+                    self.audio_player_cog.play_latency_tracker.record(timeline)
 
                     required_permission_phrases = []
                     if (not e.can_connect):
@@ -261,11 +317,9 @@ class ServerStateManager:
                     if (not e.can_speak):
                         required_permission_phrases.append("speak in that channel")
 
-                    if (self.active_play_request.interaction is not None and self.active_play_request.interaction.followup is not None):
-                        await self.active_play_request.interaction.response.send_message(
-                            f"Sorry <@{self.active_play_request.author.id}>, I don't have permission to {' or '.join(required_permission_phrases)}",
-                            ephemeral=True
-                        )
+                    await self.send_play_request_error(
+                        f"Sorry <@{self.active_play_request.author.id}>, I don't have permission to {' or '.join(required_permission_phrases)}"
+                    )
                     continue
 
                 if (self.is_playing):
@@ -278,6 +332,10 @@ class ServerStateManager:
                     def after_play(_):
                         self.skip_votes.clear()
 
+                        if (current_active_play_request.timeline is not None):
+                            current_active_play_request.timeline.mark(PlayLatencyTimeline.FINISHED)
+                            self.audio_player_cog.play_latency_tracker.record(current_active_play_request.timeline)
+
                         if (id(self.active_play_request) == id(current_active_play_request)):
                             self.next.set()
 
@@ -297,7 +355,11 @@ class ServerStateManager:
                     f"in server: {self.active_play_request.channel.guild.name}, "
                     f"for user: {self.active_play_request.author.name if self.active_play_request.author else None}"
                 )
-                self.voice_client.play(self.active_play_request.audio, after=after_play_callback_builder())
+                audio = self.active_play_request.audio
+                if (timeline is not None):
+                    audio = FirstFrameNotifyingAudioSource(audio, lambda: timeline.mark(PlayLatencyTimeline.FIRST_FRAME))
+
+                self.voice_client.play(audio, after=after_play_callback_builder())
                 await self.next.wait()
 
             except Exception as e:
@@ -321,9 +383,12 @@ class AudioPlayer(Cog):
         assert (self.admin_cog is not None)
         self.database_manager: DatabaseManager = kwargs.get('dependencies', {}).get('DatabaseManager')
         assert (self.database_manager is not None)
+        self.metrics_manager: MetricsManager = kwargs.get('dependencies', {}).get('MetricsManager')
+        assert (self.metrics_manager is not None)
 
         self.server_states = {}
         self.channel_timeout_handler = channel_timeout_handler
+        self.play_latency_tracker = PlayLatencyTracker(self.metrics_manager)
 
         ## Clamp between 0.0 and 1.0
         self.skip_percentage = max(min(float(CONFIG_OPTIONS.get(self.SKIP_PERCENTAGE_KEY, 0.5)), 1.0), 0.0)
@@ -357,6 +422,15 @@ class AudioPlayer(Cog):
             state = self.get_server_state(ctx.guild)
             await state.disconnect()
 
+
+        @self.admin_cog.admin.command()
+        async def play_latency(ctx: Context):
+            """Shows the latency of each stage of playing audio"""
+
+            await self.database_manager.store(ctx)
+
+            await ctx.reply(f"```{self.play_latency_tracker.build_summary()}```")
+
     ## Properties
 
     @property
@@ -405,6 +479,8 @@ class AudioPlayer(Cog):
     async def play_audio(self, file_path: Path, author: Member, target_member: Member, interaction: Interaction = None, callback: Callable = None):
         '''Plays the given audio file aloud to your channel'''
 
+        timeline = self.play_latency_tracker.create_timeline(PlayLatencyTracker.INTERACTION_PLAY_PATH, interaction)
+
         ## Make sure file_path points to an actual file
         if (not file_path.is_file()):
             error_text = f"Unable to play file at: {file_path}, file doesn't exist or isn't a file."
@@ -440,8 +516,12 @@ class AudioPlayer(Cog):
             )
 
         ## Build the player, and add it to the state
+        timeline.mark(PlayLatencyTimeline.SOURCE_BUILD_STARTED)
         player = self.build_player(file_path)
-        await state.add_play_request(AudioPlayRequest(author, target_member, voice_channel, player, file_path, interaction, callback))
+        timeline.mark(PlayLatencyTimeline.SOURCE_BUILT)
+
+        await state.add_play_request(AudioPlayRequest(author, target_member, voice_channel, player, file_path, interaction, callback, timeline))
+        timeline.mark(PlayLatencyTimeline.ENQUEUED)
 
 
     async def _play_audio_via_server_state(self, server_state: ServerStateManager, file_path: Path, callback: Callable = None):
@@ -454,11 +534,15 @@ class AudioPlayer(Cog):
             raise FileNotFoundError(error_text)
 
         ## Create a player for the audio file
+        timeline = self.play_latency_tracker.create_timeline(PlayLatencyTracker.SIGN_OFF_PLAY_PATH)
+        timeline.mark(PlayLatencyTimeline.SOURCE_BUILD_STARTED)
         player = self.build_player(file_path)
+        timeline.mark(PlayLatencyTimeline.SOURCE_BUILT)
 
         ## On successful player creation, build a AudioPlayRequest and push it into the queue
-        play_request = AudioPlayRequest(None, None, server_state.voice_client.channel, player, file_path, None, callback)
+        play_request = AudioPlayRequest(None, None, server_state.voice_client.channel, player, file_path, None, callback, timeline)
         await server_state.add_play_request(play_request)
+        timeline.mark(PlayLatencyTimeline.ENQUEUED)
 
     ## Commands
 
@@ -0,0 +1,221 @@
+import asyncio
+import datetime
+import logging
+import math
+import os
+from pathlib import Path
+
+from common import utilities
+from common.configuration import Configuration
+from common.database.database_manager import DatabaseManager
+from common.diagnostics.loop_lag_monitor import LoopLagMonitor
+from common.diagnostics.memory_snapshotter import MemorySnapshotDiff, MemorySnapshotter
+from common.diagnostics.sampling_profiler import ProfileResult, SamplingProfiler
+from common.logging import Logging
+from common.metrics.metrics_manager import MetricsManager
+from common.module.module import Cog
+
+import discord
+from discord.ext import commands
+from discord.ext.commands import Bot, Context
+
+## Config & logging
+CONFIG_OPTIONS = Configuration.load_config()
+LOGGER = Logging.initialize_logging(logging.getLogger(__name__))
+
+
+class DiagnosticsCog(Cog):
+    """Admin tooling for diagnosing the bot's performance while it's running"""
+
+    ## Keys
+    EVENT_LOOP_LAG_SAMPLE_INTERVAL_SECONDS_KEY = "event_loop_lag_sample_interval_seconds"
+    EVENT_LOOP_LAG_THRESHOLD_SECONDS_KEY = "event_loop_lag_threshold_seconds"
+    DIAGNOSTICS_OUTPUT_PATH_KEY = "diagnostics_output_path"
+    PROFILER_SAMPLE_INTERVAL_SECONDS_KEY = "profiler_sample_interval_seconds"
+
+    ## Bounds on how long a single profile can run for
+    MIN_PROFILE_SECONDS = 1
+    MAX_PROFILE_SECONDS = 300
+
+    ## Discord's message length limit, with a little room to spare for formatting
+    MAX_REPLY_LENGTH = 1900
+
+
+    def __init__(self, bot: Bot, *args, **kwargs):
+        super().__init__(bot, *args, **kwargs)
+
+        self.bot = bot
+
+        self.admin_cog = kwargs.get('dependencies', {}).get('AdminCog')
+        assert (self.admin_cog is not None)
+        self.database_manager: DatabaseManager = kwargs.get('dependencies', {}).get('DatabaseManager')
+        assert (self.database_manager is not None)
+        self.metrics_manager: MetricsManager = kwargs.get('dependencies', {}).get('MetricsManager')
+        assert (self.metrics_manager is not None)
+
+        self.loop_lag_monitor = LoopLagMonitor(
+            self.metrics_manager.histogram("event_loop_lag_seconds", "Seconds that the event loop was late in running a scheduled callback"),
+            float(CONFIG_OPTIONS.get(self.EVENT_LOOP_LAG_SAMPLE_INTERVAL_SECONDS_KEY, 0.25)),
+            float(CONFIG_OPTIONS.get(self.EVENT_LOOP_LAG_THRESHOLD_SECONDS_KEY, 0.1))
+        )
+        self.sampling_profiler = SamplingProfiler(float(CONFIG_OPTIONS.get(self.PROFILER_SAMPLE_INTERVAL_SECONDS_KEY, 0.01)))
+        self.memory_snapshotter = MemorySnapshotter()
+
+        diagnostics_output_path = CONFIG_OPTIONS.get(self.DIAGNOSTICS_OUTPUT_PATH_KEY)
+        if (diagnostics_output_path):
+            self.diagnostics_output_path = Path(diagnostics_output_path)
+        else:
+            self.diagnostics_output_path = Path.joinpath(utilities.get_root_path(), 'diagnostics')
+
+        ## Admin Commands
+        @self.admin_cog.admin.command()
+        async def loop_lag(ctx: Context):
+            """Shows the event loop's lag percentiles, and the most recent slow callbacks"""
+
+            await self.database_manager.store(ctx)
+
+            await ctx.reply(self.build_loop_lag_summary())
+
+
+        @self.admin_cog.admin.command()
+        async def profile(ctx: Context, seconds: int = 10):
+            """Profiles the running bot for the given number of seconds, and reports where the time went"""
+
+            await self.database_manager.store(ctx)
+
+            if (self.sampling_profiler.is_running):
+                await ctx.reply("A profile is already running, try again once it's finished.")
+                return
+
+            seconds = max(min(seconds, self.MAX_PROFILE_SECONDS), self.MIN_PROFILE_SECONDS)
+            await ctx.reply(f"Profiling for {seconds} second{'s' if seconds != 1 else ''}...")
+
+            ## The profiler sleeps between samples in its own thread, so the event loop (and playback) carries on as usual.
+            ## Another profile could've been started while replying above, in which case the profiler turns this one away.
+            try:
+                result = await asyncio.to_thread(self.sampling_profiler.profile, seconds)
+            except RuntimeError:
+                await ctx.reply("A profile is already running, try again once it's finished.")
+                return
+
+            file_path = self.diagnostics_output_path / f"profile-{datetime.datetime.now().strftime('%Y%m%d-%H%M%S')}.collapsed"
+            await asyncio.to_thread(result.write_collapsed, file_path)
+            LOGGER.info(f"Wrote profile to {file_path}")
+
+            await ctx.reply(self.build_profile_summary(result, file_path), file=discord.File(file_path))
+
+
+        @self.admin_cog.admin.command()
+        async def memory_snapshot(ctx: Context, action: str = None):
+            """Takes a memory snapshot and diffs it against the last one, or stops memory tracing with 'stop'"""
+
+            await self.database_manager.store(ctx)
+
+            if (action == "stop"):
+                self.memory_snapshotter.stop()
+                await ctx.reply("Stopped tracing memory allocations.")
+                return
+
+            diff = await asyncio.to_thread(self.memory_snapshotter.take_snapshot)
+            await ctx.reply(self.build_memory_snapshot_summary(diff))
+
+    ## Lifecycle
+
+    async def cog_load(self):
+        ## Modules are (re)loaded before the bot's event loop is running at startup, so wait for on_ready in that case
+        if (self.bot.is_ready()):
+            self.loop_lag_monitor.start()
+
+
+    async def cog_unload(self):
+        await super().cog_unload()
+
+        self.loop_lag_monitor.stop()
+
+    ## Methods
+
+    def build_loop_lag_summary(self) -> str:
+        def format_milliseconds(seconds: float) -> str:
+            return "-" if math.isnan(seconds) else f"{seconds * 1000:.1f}ms"
+
+
+        percentiles = self.loop_lag_monitor.get_percentiles()
+        lines = [
+            "**Event loop lag**",
+            f"p50: {format_milliseconds(percentiles[0.5])}, p90: {format_milliseconds(percentiles[0.9])}, "
+            f"p99: {format_milliseconds(percentiles[0.99])}, max: {format_milliseconds(percentiles[1.0])}"
+        ]
+
+        events = self.loop_lag_monitor.get_events()
+        if (not events):
+            lines.append(f"No callbacks have blocked the loop for more than {self.loop_lag_monitor.threshold_seconds * 1000:.0f}ms.")
+            return os.linesep.join(lines)
+
+        lines.append("**Recent slow callbacks**")
+        for event in events:
+            ## The innermost frame is the most interesting one, since it's what was actually running
+            innermost_frame = event.stack[-1].strip() if event.stack else "No stack available"
+            entry = f"{event}```{innermost_frame}```"
+
+            if (len(os.linesep.join(lines + [entry])) > self.MAX_REPLY_LENGTH):
+                break
+            lines.append(entry)
+
+        return os.linesep.join(lines)
+
+    def build_profile_summary(self, result: ProfileResult, file_path: Path) -> str:
+        lines = [f"{'self %':>7}{'total %':>9}  frame"]
+        for frame, self_count, total_count in result.get_top_frames():
+            lines.append(f"{self_count / result.sample_count * 100:>7.1f}{total_count / result.sample_count * 100:>9.1f}  {frame}")
+
+        header = f"Took {result.sample_count} samples over {result.duration_seconds:.1f}s, and saved the collapsed stacks to `{file_path}`"
+        table = os.linesep.join(lines)[:self.MAX_REPLY_LENGTH - len(header) - 10]
+
+        return f"{header}```{table}```"
+
+    def build_memory_snapshot_summary(self, diff: MemorySnapshotDiff) -> str:
+        def format_bytes(size: int, signed: bool = False) -> str:
+            for unit in ("B", "KiB", "MiB"):
+                if (abs(size) < 1024):
+                    break
+                size /= 1024
+            else:
+                unit = "GiB"
+
+            return f"{size:+.1f} {unit}" if signed else f"{size:.1f} {unit}"
+
+
+        current, peak = diff.traced_memory
+        rss = self.memory_snapshotter.get_rss_bytes()
+        lines = [f"Traced: {format_bytes(current)} (peak {format_bytes(peak)}){f', RSS: {format_bytes(rss)}' if rss is not None else ''}"]
+
+        lines.append("```")
+        lines.extend(
+            f"{type_name:<20}{count:>10}{diff.object_count_deltas[type_name]:>+10}"
+            for type_name, count in sorted(diff.object_counts.items())
+        )
+        lines.append("```")
+
+        if (diff.is_baseline):
+            lines.append("Started tracing memory allocations, and took a baseline snapshot. Take another snapshot later to see what's grown.")
+            return os.linesep.join(lines)
+
+        lines.append("**Top allocation sites since the last snapshot**")
+        allocation_lines = []
+        for statistic in diff.top_statistics:
+            frame = statistic.traceback[0]
+            allocation_lines.append(
+                f"{format_bytes(statistic.size_diff, signed=True):>12}{statistic.count_diff:>+9}  "
+                f"{os.path.basename(frame.filename)}:{frame.lineno}"
+            )
+
+        summary = os.linesep.join(lines)
+        allocations = os.linesep.join(allocation_lines)[:self.MAX_REPLY_LENGTH - len(summary) - 10]
+
+        return f"{summary}```{allocations}```"
+
+    ## Listeners
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        self.loop_lag_monitor.start()
@@ -0,0 +1,124 @@
+import logging
+
+from common.audio_player import AudioPlayer
+from common.configuration import Configuration
+from common.logging import Logging
+from common.metrics.metrics_manager import MetricsManager
+from common.metrics.metrics_server import MetricsServer
+from common.module.module import Cog
+
+import discord
+from discord import Interaction, app_commands
+from discord.ext import commands
+from discord.ext.commands import Bot, Context
+
+## Config & logging
+CONFIG_OPTIONS = Configuration.load_config()
+LOGGER = Logging.initialize_logging(logging.getLogger(__name__))
+
+
+class MetricsCog(Cog):
+    """Collects the bot's runtime metrics, and optionally serves them over HTTP for Prometheus"""
+
+    ## Keys
+    METRICS_SERVER_ENABLE_KEY = "metrics_server_enable"
+    METRICS_SERVER_HOST_KEY = "metrics_server_host"
+    METRICS_SERVER_PORT_KEY = "metrics_server_port"
+
+
+    def __init__(self, bot: Bot, *args, **kwargs):
+        super().__init__(bot, *args, **kwargs)
+
+        self.bot = bot
+
+        self.metrics_manager: MetricsManager = kwargs.get('dependencies', {}).get('MetricsManager')
+        assert (self.metrics_manager is not None)
+        self.audio_player_cog: AudioPlayer = kwargs.get('dependencies', {}).get('AudioPlayer')
+        assert (self.audio_player_cog is not None)
+
+        self.metrics_server = None
+        if (CONFIG_OPTIONS.get(self.METRICS_SERVER_ENABLE_KEY, False)):
+            self.metrics_server = MetricsServer(
+                self.metrics_manager,
+                CONFIG_OPTIONS.get(self.METRICS_SERVER_HOST_KEY, "127.0.0.1"),
+                int(CONFIG_OPTIONS.get(self.METRICS_SERVER_PORT_KEY, 9464))
+            )
+
+        ## Metrics
+        self.guilds_gauge = self.metrics_manager.gauge("guilds", "Number of guilds the bot is in")
+        self.server_states_gauge = self.metrics_manager.gauge("server_states", "Number of server states held by the audio player")
+        self.audio_queue_depth_gauge = self.metrics_manager.gauge("audio_queue_depth", "Number of play requests waiting in each guild's queue", ("guild_id",))
+        self.voice_clients_gauge = self.metrics_manager.gauge("voice_clients", "Number of active voice clients")
+        self.decoder_processes_gauge = self.metrics_manager.gauge("decoder_processes", "Number of FFmpeg decoder processes that have been spawned for queued or playing audio")
+        self.command_latency_histogram = self.metrics_manager.histogram(
+            "command_latency_seconds",
+            "Seconds between a command being created and it completing",
+            ("command",)
+        )
+        self.metrics_manager.register_collector(self.collect_audio_metrics)
+
+    ## Lifecycle
+
+    async def cog_load(self):
+        ## Modules are (re)loaded before the bot's event loop is running at startup, so wait for on_ready in that case
+        if (self.bot.is_ready()):
+            await self.start()
+
+
+    async def cog_unload(self):
+        await super().cog_unload()
+
+        self.metrics_manager.unregister_collector(self.collect_audio_metrics)
+
+        if (self.metrics_server is not None):
+            await self.metrics_server.stop()
+
+    ## Methods
+
+    async def start(self):
+        '''Starts the metrics server (if enabled). Safe to call more than once.'''
+
+        if (self.metrics_server is not None and not self.metrics_server.is_running):
+            try:
+                await self.metrics_server.start()
+            except Exception as e:
+                LOGGER.exception("Unable to start the metrics server", exc_info=e)
+
+
+    def collect_audio_metrics(self):
+        '''Reads the current state of the bot and its audio player into the gauges'''
+
+        self.guilds_gauge.set(len(self.bot.guilds))
+        self.voice_clients_gauge.set(len(self.bot.voice_clients))
+        self.server_states_gauge.set(len(self.audio_player_cog.server_states))
+
+        ## Each queued or playing request holds onto an FFmpegPCMAudio, and each of those owns a decoder process
+        decoder_processes = 0
+        self.audio_queue_depth_gauge.clear()
+        for guild_id, server_state in list(self.audio_player_cog.server_states.items()):
+            queue_depth = server_state.audio_play_queue.qsize()
+            self.audio_queue_depth_gauge.set(queue_depth, guild_id=guild_id)
+
+            decoder_processes += queue_depth
+            if (server_state.active_play_request is not None):
+                decoder_processes += 1
+
+        self.decoder_processes_gauge.set(decoder_processes)
+
+    ## Listeners
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        await self.start()
+
+
+    @commands.Cog.listener()
+    async def on_app_command_completion(self, interaction: Interaction, command: app_commands.Command | app_commands.ContextMenu):
+        latency = (discord.utils.utcnow() - interaction.created_at).total_seconds()
+        self.command_latency_histogram.observe(max(latency, 0.0), command=command.qualified_name)
+
+
+    @commands.Cog.listener()
+    async def on_command_completion(self, ctx: Context):
+        latency = (discord.utils.utcnow() - ctx.message.created_at).total_seconds()
+        self.command_latency_histogram.observe(max(latency, 0.0), command=ctx.command.qualified_name)
@@ -5,17 +5,22 @@ import asyncio
 import dateutil
 import datetime
 import json
+import math
+import time
 from pathlib import Path
 
 from common import utilities
 from common.configuration import Configuration
 from common.database.database_manager import DatabaseManager
+from common.delete_request_journal import DeleteRequestJournal
 from common.logging import Logging
+from common.metrics.metrics_manager import MetricsManager
 from common.module.module import Cog
 from common.ui.component_factory import ComponentFactory
 
 import discord
 from discord import app_commands, Interaction
+from discord.ext import commands
 from discord.ext.commands import command, Context, Bot
 
 ## Config & logging
@@ -34,12 +39,20 @@ class PrivacyManagementCog(Cog):
         assert(self.component_factory is not None)
         self.database_manager: DatabaseManager = kwargs.get('dependencies', {}).get('DatabaseManager')
         assert (self.database_manager is not None)
+        self.metrics_manager: MetricsManager = kwargs.get('dependencies', {}).get('MetricsManager')
+        assert (self.metrics_manager is not None)
 
         self.name = CONFIG_OPTIONS.get("name", "the bot").capitalize()
         self.privacy_policy_url = CONFIG_OPTIONS.get('privacy_policy_url')
         self.delete_request_scheduled_weekday = int(CONFIG_OPTIONS.get('delete_request_weekday_to_process', 0))
         self._delete_request_scheduled_weekday_name = utilities.get_weekday_name_from_day_of_week(self.delete_request_scheduled_weekday)
         self.delete_request_scheduled_time = dateutil.parser.parse(CONFIG_OPTIONS.get('delete_request_time_to_process', "T00:00:00Z"))
+        ## Queued requests are deleted continuously, by scanning a bounded number of table pages at a time, rather than
+        ## all at once on the weekday. The scan rate rises as needed to make sure that the weekday deadline is still met.
+        self.delete_request_scan_page_size = max(int(CONFIG_OPTIONS.get('delete_request_scan_page_size', 500)), 1)
+        self.delete_request_scan_interval_seconds = float(CONFIG_OPTIONS.get('delete_request_scan_interval_seconds', 10))
+        self.delete_request_scan_max_pages = max(int(CONFIG_OPTIONS.get('delete_request_scan_max_pages', 10)), 1)
+        self._deletion_task: asyncio.Task = None
 
         ## Build the filepaths for the various tracking files
         delete_request_queue_file_path = CONFIG_OPTIONS.get('delete_request_queue_file_path')
@@ -69,6 +82,8 @@ class PrivacyManagementCog(Cog):
             raise RuntimeError(message)
 
         ## Keep a copy of all user ids that should be deleted in memory, so the actual file can't get spammed by repeats.
+        ## This is also what the journal is rebuilt from when it's compacted.
+        self.delete_request_journal = DeleteRequestJournal(self.delete_request_queue_file_path)
         self.queued_user_ids = self.get_all_queued_delete_request_ids()
 
         ## Load the delete request metadata to know when deletion operations last happened
@@ -77,12 +92,25 @@ class PrivacyManagementCog(Cog):
         except json.decoder.JSONDecodeError:
             self.metadata = {}
 
-        ## Perform or prepare the deletion process
-        seconds_until_process_delete_request = self.get_seconds_until_process_delete_request_queue_is_due()
-        if (seconds_until_process_delete_request <= 0):
-            asyncio.create_task(self.process_delete_request_queue())
-        else:
-            asyncio.create_task(self.schedule_process_delete_request_queue(seconds_until_process_delete_request))
+        ## Metrics
+        self.delete_request_backlog_gauge = self.metrics_manager.gauge(
+            "delete_request_backlog",
+            "Number of users whose data is queued for deletion"
+        )
+        self.delete_requests_processed_counter = self.metrics_manager.counter(
+            "delete_requests_processed_total",
+            "Number of users whose data has been deleted"
+        )
+        self.delete_request_documents_deleted_counter = self.metrics_manager.counter(
+            "delete_request_documents_deleted_total",
+            "Number of documents deleted on behalf of queued users"
+        )
+        self.delete_request_scan_page_histogram = self.metrics_manager.histogram(
+            "delete_request_scan_page_seconds",
+            "Seconds spent scanning (and deleting from) each page of the table",
+            buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+        )
+        self.delete_request_backlog_gauge.set(len(self.queued_user_ids))
 
         # Don't add a privacy policy link if there isn't a URL to link to
         if (self.privacy_policy_url):
@@ -92,6 +120,21 @@ class PrivacyManagementCog(Cog):
                 callback=self.privacy_policy_command
             ))
 
+    ## Lifecycle
+
+    async def cog_load(self):
+        ## Modules are (re)loaded before the bot's event loop is running at startup, so wait for on_ready in that case
+        if (self.bot.is_ready()):
+            self.start_deletion_worker()
+
+
+    async def cog_unload(self):
+        await super().cog_unload()
+
+        if (self._deletion_task is not None):
+            self._deletion_task.cancel()
+            self._deletion_task = None
+
     ## Methods
 
     def is_file_accessible(self, file_path: Path) -> bool:
@@ -117,18 +160,9 @@ class PrivacyManagementCog(Cog):
 
 
     def get_all_queued_delete_request_ids(self) -> set:
-        """Retrieves all delete request ids from the file, and returns them all in a set"""
-
-        queued_user_ids = None
-
-        with open(self.delete_request_queue_file_path, 'r+') as fd:
-            queued_user_ids = set([int(line.rstrip()) for line in fd.readlines()])
+        """Retrieves all delete request ids from the journal (recovering it if needed), and returns them all in a set"""
 
-        return queued_user_ids
-
-
-    def empty_queued_delete_request_file(self):
-        open(self.delete_request_queue_file_path, 'w').close()
+        return self.delete_request_journal.load()
 
 
     ## Stores's a user's id in a file, which while be used in a batched request to delete their data from the remote DB
@@ -139,47 +173,163 @@ class PrivacyManagementCog(Cog):
 
         self.queued_user_ids.add(user_id)
 
-        user_id_written = False
-        while (not user_id_written):
-            try:
-                with open(self.delete_request_queue_file_path, 'a+') as fd:
-                    fd.write(str(user_id) + '\n')
-                user_id_written = True
-            except IOError as e:
-                LOGGER.exception(f"Unable to write id {user_id} to file at {self.delete_request_queue_file_path}.", e)
-                ## Give the file some time to close
-                await asyncio.sleep(1);
+        try:
+            await self.delete_request_journal.add(user_id)
+            self.delete_request_backlog_gauge.set(len(self.queued_user_ids))
+            return True
+        except OSError as e:
+            LOGGER.exception(f"Unable to write id {user_id} to the journal at {self.delete_request_queue_file_path}.", exc_info=e)
 
-        return user_id_written
+        ## The append may have left a torn record behind, so try rewriting the whole journal (which includes this id)
+        try:
+            await self.delete_request_journal.compact(self.queued_user_ids)
+            self.delete_request_backlog_gauge.set(len(self.queued_user_ids))
+            return True
+        except OSError as e:
+            LOGGER.exception(f"Unable to rewrite the journal at {self.delete_request_queue_file_path}.", exc_info=e)
+
+        ## The request isn't durable, so don't keep it around in memory either. The user is told to try again instead.
+        self.queued_user_ids.discard(user_id)
+        return False
+
+
+    async def save_metadata(self):
+        """
+        Saves the metadata file on a separate thread, so the (fsync'd) write doesn't block the event loop. Only the
+        deletion worker changes the metadata, and it waits for the save, so the dict won't change mid-write.
+        """
 
+        await asyncio.to_thread(utilities.save_json, self.delete_request_meta_file_path, self.metadata)
 
-    def update_last_process_delete_request_queue_time(self, update_time):
+
+    async def update_last_process_delete_request_queue_time(self, update_time):
         self.metadata['last_process_time'] = str(update_time)
-        utilities.save_json(self.delete_request_meta_file_path, self.metadata)
+        await self.save_metadata()
 
 
-    async def process_delete_request_queue(self):
-        ## Perform the operations on a list, since they're slightly easier to wrangle than sets.
-        user_ids = list(self.get_all_queued_delete_request_ids())
+    def start_delete_pass(self, item_count: int) -> dict:
+        """
+        Starts a pass over the table, which deletes the data of every user that's currently queued. The pass' progress
+        is checkpointed in the metadata file, so a restart resumes the scan right where it left off.
+        """
 
-        if (not user_ids):
-            LOGGER.info("Skipping delete request processing, as queue is empty.")
-            return
+        delete_pass = {
+            'user_ids': sorted(self.queued_user_ids),
+            'start_key': None,
+            'pages_scanned': 0,
+            'estimated_pages': max(math.ceil(item_count / self.delete_request_scan_page_size), 1),
+            'scan_complete': False,
+            'documents_deleted': 0,
+            'started_at': str(datetime.datetime.now(datetime.timezone.utc))
+        }
+        self.metadata['delete_pass'] = delete_pass
+
+        LOGGER.info(f"Starting a delete pass for {len(delete_pass['user_ids'])} users")
+
+        return delete_pass
+
+
+    def get_delete_request_scan_pages_per_interval(self, delete_pass: dict) -> int:
+        """
+        Gets how many pages should be scanned this interval. That's a single page, unless the rest of the table can't
+        be scanned by the deadline at that rate, in which case it's however many pages will (up to the configured max).
+        """
+
+        intervals_until_due = max(
+            self.get_seconds_until_process_delete_request_queue_is_due() / self.delete_request_scan_interval_seconds,
+            1
+        )
+        pages_remaining = max(delete_pass['estimated_pages'] - delete_pass['pages_scanned'], 1)
+
+        return min(max(math.ceil(pages_remaining / intervals_until_due), 1), self.delete_request_scan_max_pages)
+
+
+    async def process_delete_request_scan_pages(self):
+        """Scans the next few pages of the table for queued users' data and deletes it, checkpointing after each page"""
+
+        delete_pass = self.metadata.get('delete_pass')
+        if (delete_pass is None):
+            if (not self.queued_user_ids):
+                ## Nothing is waiting to be deleted, so the deadline is trivially met. Only record that once it's due
+                ## though, so the metadata file isn't rewritten every interval.
+                if (self.get_seconds_until_process_delete_request_queue_is_due() <= 0):
+                    await self.update_last_process_delete_request_queue_time(datetime.datetime.now(datetime.timezone.utc))
+                return
+
+            delete_pass = self.start_delete_pass(await self.database_manager.get_detailed_item_count())
+            await self.save_metadata()
 
-        LOGGER.info(f"Batch deleting {len(user_ids)} users from the database")
-        await self.database_manager.batch_delete_users(user_ids)
+        user_ids = set(delete_pass['user_ids'])
+        for _ in range(self.get_delete_request_scan_pages_per_interval(delete_pass)):
+            if (delete_pass['scan_complete']):
+                break
 
-        LOGGER.info("Successfully performed batch delete")
-        self.queued_user_ids = set()
-        self.empty_queued_delete_request_file()
+            started_at = time.perf_counter()
+            deleted, start_key = await self.database_manager.delete_users_page(
+                user_ids,
+                delete_pass['start_key'],
+                self.delete_request_scan_page_size
+            )
+            self.delete_request_scan_page_histogram.observe(time.perf_counter() - started_at)
+            self.delete_request_documents_deleted_counter.inc(deleted)
 
-        LOGGER.info("Updating metadata file with time of completion.")
-        self.update_last_process_delete_request_queue_time(datetime.datetime.now(datetime.timezone.utc))
+            delete_pass['start_key'] = start_key
+            delete_pass['pages_scanned'] += 1
+            delete_pass['documents_deleted'] += deleted
+            delete_pass['scan_complete'] = (start_key is None)
+            await self.save_metadata()
+
+        if (delete_pass['scan_complete']):
+            await self.finish_delete_pass(delete_pass)
+
+
+    async def finish_delete_pass(self, delete_pass: dict):
+        """Removes the pass' users from the queue now that their data is gone, and records when the pass started"""
+
+        user_ids = delete_pass['user_ids']
+        await self.delete_request_journal.remove(user_ids)
+        self.queued_user_ids.difference_update(user_ids)
+
+        ## Rewrite the journal with just the requests that are still queued (ex. those that came in during the pass), so
+        ## it doesn't keep growing with records for users that have already been deleted
+        await self.delete_request_journal.compact(self.queued_user_ids)
+
+        self.delete_requests_processed_counter.inc(len(user_ids))
+        self.delete_request_backlog_gauge.set(len(self.queued_user_ids))
+
+        elapsed = (datetime.datetime.now(datetime.timezone.utc) - dateutil.parser.isoparse(delete_pass['started_at'])).total_seconds()
+        LOGGER.info(
+            f"Deleted {delete_pass['documents_deleted']} documents for {len(user_ids)} users, scanning "
+            f"{delete_pass['pages_scanned']} pages in {elapsed:.0f}s. {len(self.queued_user_ids)} users remain queued."
+        )
 
+        ## Everything that was queued when the pass started has been deleted, so that's when the queue was last processed
+        del self.metadata['delete_pass']
+        await self.update_last_process_delete_request_queue_time(delete_pass['started_at'])
 
-    def get_seconds_until_process_delete_request_queue_is_due(self):
-        def copy_time_data_into_datetime(source: datetime.datetime, target: datetime.datetime):
-            target.replace(hour=source.hour, minute=source.minute, second=source.second, microsecond=0)
+
+    def start_deletion_worker(self):
+        """Starts deleting queued users' data in the background. Safe to call more than once."""
+
+        if (self._deletion_task is None or self._deletion_task.done()):
+            self._deletion_task = asyncio.get_running_loop().create_task(self._process_delete_requests_continuously())
+
+
+    async def _process_delete_requests_continuously(self):
+        while (True):
+            try:
+                await self.process_delete_request_scan_pages()
+            except Exception as e:
+                LOGGER.exception("Unable to process the delete request queue", exc_info=e)
+
+            await asyncio.sleep(self.delete_request_scan_interval_seconds)
+
+
+    def get_seconds_until_process_delete_request_queue_is_due(self) -> int:
+        """
+        Gets the number of seconds until the queue must next be processed by, or 0 if the queue hasn't been processed
+        since the most recent scheduled time.
+        """
 
         try:
             last_process_time = dateutil.parser.isoparse(self.metadata.get('last_process_time'))
@@ -189,22 +339,29 @@ class PrivacyManagementCog(Cog):
 
         now = datetime.datetime.now(datetime.timezone.utc)
 
-        previous_possible_process_time = now - datetime.timedelta(days=(self.delete_request_scheduled_weekday - now.weekday()) % 7)
-        copy_time_data_into_datetime(self.delete_request_scheduled_time, previous_possible_process_time)
+        previous_process_time = (now - datetime.timedelta(days=(now.weekday() - self.delete_request_scheduled_weekday) % 7)).replace(
+            hour=self.delete_request_scheduled_time.hour,
+            minute=self.delete_request_scheduled_time.minute,
+            second=self.delete_request_scheduled_time.second,
+            microsecond=0
+        )
+        ## On the scheduled weekday, but before the scheduled time
+        if (previous_process_time > now):
+            previous_process_time -= datetime.timedelta(days=7)
 
         ## Check if it's been more than a week. Otherwise, get the time until the next queue processing should happen
-        if (last_process_time.timestamp() < previous_possible_process_time.timestamp()):
+        if (last_process_time.timestamp() < previous_process_time.timestamp()):
             return 0
         else:
-            next_possible_process_time = now + datetime.timedelta(days=(self.delete_request_scheduled_weekday - now.weekday()) % 7)
-            copy_time_data_into_datetime(self.delete_request_scheduled_time, next_possible_process_time)
+            next_process_time = previous_process_time + datetime.timedelta(days=7)
 
-            return int(next_possible_process_time.timestamp() - last_process_time.timestamp())
+            return int(next_process_time.timestamp() - now.timestamp())
 
+    ## Listeners
 
-    async def schedule_process_delete_request_queue(self, seconds_to_wait):
-        await asyncio.sleep(seconds_to_wait)
-        await self.process_delete_request_queue()
+    @commands.Cog.listener()
+    async def on_ready(self):
+        self.start_deletion_worker()
 
     ## Commands
 
@@ -240,10 +397,14 @@ class PrivacyManagementCog(Cog):
         user = ctx.author
         if (user.id in self.queued_user_ids):
             await self.database_manager.store(ctx, valid=False)
-            await user.send(f"Hey <@{user.id}>, it looks like you've already requested that your data be deleted. That'll automagically happen next {self._delete_request_scheduled_weekday_name}, so sit tight and it'll happen before you know it!")
+            await user.send(f"Hey <@{user.id}>, it looks like you've already requested that your data be deleted. That'll automagically happen by next {self._delete_request_scheduled_weekday_name}, so sit tight and it'll happen before you know it!")
+            return
+
+        if (not await self.store_user_id_for_batch_delete(user.id)):
+            await self.database_manager.store(ctx, valid=False)
+            await user.send(f"Sorry <@{user.id}>, I wasn't able to save your delete request. Please try again later.")
             return
 
-        await self.store_user_id_for_batch_delete(user.id)
         await self.database_manager.store(ctx)
 
         ## Keep things tidy
@@ -255,4 +416,4 @@ class PrivacyManagementCog(Cog):
             except:
                 pass
 
-        await user.send(f"Hey <@{user.id}>, your delete request has been received, and it'll happen automagically next {self._delete_request_scheduled_weekday_name}.")
+        await user.send(f"Hey <@{user.id}>, your delete request has been received, and it'll happen automagically by next {self._delete_request_scheduled_weekday_name}.")
@@ -0,0 +1,121 @@
+import logging
+import math
+
+from common.configuration import Configuration
+from common.logging import Logging
+from common.metrics.metrics_manager import MetricsManager
+from common.module.module import Module
+from common.token_bucket import TokenBucketRateLimiter
+
+from discord import Interaction, InteractionType
+from discord.ext.commands import Bot
+
+## Config & logging
+CONFIG_OPTIONS = Configuration.load_config()
+LOGGER = Logging.initialize_logging(logging.getLogger(__name__))
+
+
+class CommandRateLimiter(Module):
+    '''
+    Rate limits app commands (and their autocompletes) per user and per guild, with a token bucket for each command
+    that each user and guild uses. It's installed as the command tree's interaction check, so limited interactions are
+    turned away before any of the command's work (audio, database, etc) gets done.
+    '''
+
+    def __init__(self, bot: Bot, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.bot = bot
+
+        self.metrics_manager: MetricsManager = kwargs.get('dependencies', {}).get('MetricsManager')
+        assert (self.metrics_manager is not None)
+
+        self.enabled = CONFIG_OPTIONS.get('rate_limit_enable', True)
+        max_buckets = int(CONFIG_OPTIONS.get('rate_limit_max_buckets', 10000))
+
+        def build_limiter(scope: str, default_burst: int, default_per_minute: float) -> TokenBucketRateLimiter:
+            return TokenBucketRateLimiter(
+                float(CONFIG_OPTIONS.get(f'rate_limit_{scope}_burst', default_burst)),
+                float(CONFIG_OPTIONS.get(f'rate_limit_{scope}_per_minute', default_per_minute)) / 60,
+                max_buckets
+            )
+
+        self.user_limiter = build_limiter("user", 5, 20)
+        self.guild_limiter = build_limiter("guild", 30, 120)
+        ## Autocompletes fire on every keystroke, so they get their own (much more generous) per user limit
+        self.autocomplete_limiter = build_limiter("autocomplete", 20, 240)
+
+        self.rate_limited_counter = self.metrics_manager.counter(
+            "rate_limited_interactions_total",
+            "Number of interactions that were turned away for being over a rate limit, by the limit that they hit",
+            ("scope",)
+        )
+
+        self.bot.tree.interaction_check = self.interaction_check
+
+        self.successful = True
+
+    ## Methods
+
+    def _get_retry_after(self, interaction: Interaction, command_name: str = None) -> tuple[str, float]:
+        '''
+        Gets the scope of the limit that the interaction is over, and the seconds until it isn't, or (None, 0) if it's
+        not over any limit. Tokens are only taken once the interaction is known to be within every limit.
+        '''
+
+        if (command_name is None and interaction.command is not None):
+            command_name = interaction.command.qualified_name
+
+        if (interaction.type == InteractionType.autocomplete):
+            buckets = [("autocomplete", self.autocomplete_limiter, (interaction.user.id, command_name))]
+        else:
+            buckets = [("user", self.user_limiter, (interaction.user.id, command_name))]
+            if (interaction.guild_id is not None):
+                buckets.append(("guild", self.guild_limiter, (interaction.guild_id, command_name)))
+
+        for scope, limiter, key in buckets:
+            retry_after = limiter.get_retry_after(key)
+            if (retry_after > 0):
+                return scope, retry_after
+
+        for _, limiter, key in buckets:
+            limiter.consume(key)
+
+        return None, 0
+
+
+    async def interaction_check(self, interaction: Interaction, command_name: str = None) -> bool:
+        '''
+        Checks whether the interaction is within its limits, and turns it away if not. Interactions that don't come from
+        a command (ex. a selection from a command's menu) can be counted against a command with command_name.
+        '''
+
+        if (not self.enabled):
+            return True
+
+        scope, retry_after = self._get_retry_after(interaction, command_name)
+        if (scope is None):
+            return True
+
+        self.rate_limited_counter.inc(scope=scope)
+        LOGGER.debug(f"Rate limited {interaction.user.id} ({scope}) for {retry_after:.1f}s")
+
+        try:
+            if (interaction.type == InteractionType.autocomplete):
+                await interaction.response.autocomplete([])
+            elif (scope == "guild"):
+                await interaction.response.send_message(
+                    f"Sorry <@{interaction.user.id}>, this server is using that command a lot right now. "
+                    f"Try again in {math.ceil(retry_after)} second(s).",
+                    ephemeral=True
+                )
+            else:
+                await interaction.response.send_message(
+                    f"Sorry <@{interaction.user.id}>, you're using that command too quickly. "
+                    f"Try again in {math.ceil(retry_after)} second(s).",
+                    ephemeral=True
+                )
+        except Exception as e:
+            LOGGER.warning("Unable to respond to a rate limited interaction", exc_info=e)
+
+        return False
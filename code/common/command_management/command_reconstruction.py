@@ -0,0 +1,89 @@
+from functools import cached_property
+
+from discord import Interaction
+
+from common.message_parser import MessageParser
+
+
+class CommandReconstruction:
+    '''
+    The different reconstructions of a single interaction's command string. The interaction's options are only walked
+    once, and each variant is only built (and has its mentions replaced) the first time that it's used.
+    '''
+
+    def __init__(self, interaction: Interaction, message_parser: MessageParser):
+        self._interaction = interaction
+        self._message_parser = message_parser
+
+    ## Properties
+
+    @cached_property
+    def _parameters(self) -> list[tuple[str, str]]:
+        '''The command's (key, value) parameters, with the values of mentionable options formatted as mentions'''
+
+        parameters = []
+        for option in list(self._interaction.data.get("options", [])):
+            flavor = int(option["type"])
+            key = option["name"] + ":"
+            value = option["value"]
+
+            ## https://discord.com/developers/docs/interactions/application-commands#application-command-object-application-command-option-type
+            if (flavor == 6 or flavor == 8):   ## User or Role
+                value = f"<@{value}>"
+            elif (flavor == 7): ## Channel
+                value = f"<#{value}>"
+            elif (flavor == 9): ## Mentionable (how's this different from users or roles? Different format?)
+                value = f"<@{value}>"
+
+            parameters.append((key, value))
+
+        return parameters
+
+
+    @cached_property
+    def raw(self) -> str:
+        '''The command string without parameter keys, and with the mentions left as they are'''
+
+        return self.build(replace_mentions=False)
+
+
+    @cached_property
+    def human(self) -> str:
+        '''The command string without parameter keys, and with the mentions replaced with names'''
+
+        return self.build()
+
+
+    @cached_property
+    def keyed(self) -> str:
+        '''The command string with parameter keys, and with the mentions replaced with names'''
+
+        return self.build(add_parameter_keys=True)
+
+
+    @cached_property
+    def anonymized(self) -> str:
+        '''The command string with parameter keys, and with the mentions anonymized'''
+
+        return self.build(add_parameter_keys=True, anonymize_mentions=True)
+
+    ## Methods
+
+    def build(self, add_parameter_keys = False, anonymize_mentions = False, replace_mentions = True) -> str:
+        ## All interactions refer to slash commands, right?
+        prefix = "/"
+        name = self._interaction.command.qualified_name
+        parameters = [f"{key if add_parameter_keys else ''}{value}" for key, value in self._parameters]
+
+        command_string = f"{prefix}{name}{(' ' if parameters else '') + (' '.join(parameters))}"
+
+        if (replace_mentions):
+            return self._message_parser.replace_mentions(
+                command_string,
+                self._interaction.data,
+                hide_mention_formatting=False,
+                hide_meta_mentions=False,
+                anonymize_mentions=anonymize_mentions
+            )
+        else:
+            return command_string
@@ -3,6 +3,7 @@ import logging
 from discord import Interaction
 from discord.ext.commands import Context
 
+from common.command_management.command_reconstruction import CommandReconstruction
 from common.configuration import Configuration
 from common.logging import Logging
 from common.message_parser import MessageParser
@@ -14,6 +15,9 @@ LOGGER = Logging.initialize_logging(logging.getLogger(__name__))
 
 
 class CommandReconstructor(Module):
+    ## Where an interaction's reconstruction is kept in Interaction.extras, so it goes away along with the interaction
+    RECONSTRUCTION_KEY = "command_reconstruction"
+
     ## Could maybe leverage static methods, but I don't really want to rework how the module management system works
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -27,40 +31,29 @@ class CommandReconstructor(Module):
         return f"{context.clean_prefix}{context.command.qualified_name}"
 
 
+    def get_reconstruction(self, interaction: Interaction) -> CommandReconstruction:
+        """
+        Gets the interaction's reconstruction. It's shared between everything that handles the interaction, so its
+        command strings are only built once.
+        """
+
+        reconstruction = interaction.extras.get(self.RECONSTRUCTION_KEY)
+        if (reconstruction is None):
+            reconstruction = CommandReconstruction(interaction, self.message_parser)
+            interaction.extras[self.RECONSTRUCTION_KEY] = reconstruction
+
+        return reconstruction
+
+
     def _reconstruct_command_from_interaction(self, interaction: Interaction, add_parameter_keys = False, anonymize_mentions = False, replace_mentions = True) -> str:
-        ## All interactions refer to slash commands, right?
-        prefix = "/"
-        name = interaction.command.qualified_name
-        parameters = []
-
-        for option in list(interaction.data.get("options", [])):
-            flavor = int(option["type"])
-            key = option["name"] + ":"
-            value = option["value"]
-
-            ## https://discord.com/developers/docs/interactions/application-commands#application-command-object-application-command-option-type
-            if (flavor == 6 or flavor == 8):   ## User or Role
-                value = f"<@{value}>"
-            elif (flavor == 7): ## Channel
-                value = f"<#{value}>"
-            elif (flavor == 9): ## Mentionable (how's this different from users or roles? Different format?)
-                value = f"<@{value}>"
-
-            parameter = f"{key if add_parameter_keys else ''}{value}"
-            parameters.append(parameter)
-
-        command_string = f"{prefix}{name}{(' ' if parameters else '') + (' '.join(parameters))}"
-
-        if (replace_mentions):
-            return self.message_parser.replace_mentions(
-                command_string,
-                interaction.data,
-                hide_mention_formatting=False,
-                hide_meta_mentions=False,
-                anonymize_mentions=anonymize_mentions
-            )
+        reconstruction = self.get_reconstruction(interaction)
+
+        if (not replace_mentions):
+            return reconstruction.raw if not add_parameter_keys else reconstruction.build(add_parameter_keys, replace_mentions=False)
+        elif (anonymize_mentions):
+            return reconstruction.anonymized if add_parameter_keys else reconstruction.build(anonymize_mentions=True)
         else:
-            return command_string
+            return reconstruction.keyed if add_parameter_keys else reconstruction.human
 
 
     def reconstruct_command_string(self, data: Context | Interaction, add_parameter_keys = False, anonymize_mentions = False, replace_mentions = True) -> str:
@@ -1,6 +1,6 @@
 import asyncio
 import logging
-from typing import Callable
+from typing import Any, Awaitable, Callable
 
 from common.configuration import Configuration
 from common.command_management.command_reconstructor import CommandReconstructor
@@ -8,8 +8,10 @@ from common.command_management.invoked_command import InvokedCommand
 from common.database.database_manager import DatabaseManager
 from common.logging import Logging
 from common.message_parser import MessageParser
+from common.metrics.metrics_manager import MetricsManager
 from common.module.module import Module
 
+import discord
 from discord import Interaction, Member
 
 ## Config & logging
@@ -18,6 +20,10 @@ LOGGER = Logging.initialize_logging(logging.getLogger(__name__))
 
 
 class InvokedCommandHandler(Module):
+    ## Where a deferral's visibility is kept in Interaction.extras, until its 'thinking' message is replaced
+    DEFERRED_EPHEMERAL_KEY = "deferred_ephemeral"
+
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -27,6 +33,17 @@ class InvokedCommandHandler(Module):
         assert (self.database_manager is not None)
         self.command_reconstructor: CommandReconstructor = kwargs.get('dependencies', {}).get('CommandReconstructor')
         assert (self.command_reconstructor is not None)
+        self.metrics_manager: MetricsManager = kwargs.get('dependencies', {}).get('MetricsManager')
+        assert (self.metrics_manager is not None)
+
+        ## Interactions need a response within 3 seconds of being created, so leave plenty of room for the response itself
+        self.command_response_latency_budget_seconds = float(CONFIG_OPTIONS.get('command_response_latency_budget_seconds', 1.5))
+
+        self.command_responses_counter = self.metrics_manager.counter(
+            "command_responses_total",
+            "Number of invoked commands, by whether they were responded to immediately or deferred for a followup",
+            ("command", "path")
+        )
 
     ## Methods
 
@@ -48,20 +65,88 @@ class InvokedCommandHandler(Module):
         return mention
 
 
+    async def send_message(self, interaction: Interaction, content: str, ephemeral: bool = False, **kwargs) -> discord.WebhookMessage | None:
+        """
+        Responds to the interaction, or sends a followup if it's already been responded to (ex. it was deferred). Returns
+        the followup's message, if one was sent.
+
+        Note that the first followup to a deferral replaces its 'thinking' message, and keeps the deferral's visibility.
+        So if a deferral was public but this message shouldn't be, then the 'thinking' message is deleted first.
+        """
+
+        if (not interaction.response.is_done()):
+            await interaction.response.send_message(content, ephemeral=ephemeral, **kwargs)
+            return None
+
+        deferred_ephemeral = interaction.extras.pop(self.DEFERRED_EPHEMERAL_KEY, None)
+        if (deferred_ephemeral is False and ephemeral):
+            try:
+                await interaction.delete_original_response()
+            except discord.HTTPException as e:
+                LOGGER.warning("Unable to delete the public 'thinking' message before an ephemeral followup", exc_info=e)
+
+        return await interaction.followup.send(content, ephemeral=ephemeral, wait=True, **kwargs)
+
+
+    def get_remaining_latency_budget(self, interaction: Interaction) -> float:
+        """Gets the seconds left in the interaction's latency budget, counting from when Discord created it"""
+
+        elapsed = (discord.utils.utcnow() - interaction.created_at).total_seconds()
+
+        return max(self.command_response_latency_budget_seconds - elapsed, 0)
+
+
+    async def defer(self, interaction: Interaction, ephemeral: bool):
+        """Defers the interaction with a 'thinking' message, and remembers its visibility for send_message"""
+
+        await interaction.response.defer(ephemeral=ephemeral, thinking=True)
+        interaction.extras[self.DEFERRED_EPHEMERAL_KEY] = ephemeral
+
+
+    async def run_within_latency_budget(self, interaction: Interaction, awaitable: Awaitable, ephemeral: bool = True) -> tuple[Any, bool]:
+        """
+        Awaits the awaitable, and defers the interaction if it isn't done before the interaction's latency budget runs
+        out (so that the interaction doesn't expire). Returns the awaitable's result, and whether it ran past the budget
+        (meaning that the response will be a followup).
+        """
+
+        task = asyncio.ensure_future(awaitable)
+        try:
+            done, _ = await asyncio.wait({task}, timeout=self.get_remaining_latency_budget(interaction))
+            if (not done and not interaction.response.is_done()):
+                await self.defer(interaction, ephemeral)
+
+            return await task, not done
+        except BaseException:
+            task.cancel()
+            raise
+
+
     async def invoke_command(
             self,
             interaction: Interaction,
             action: Callable[..., InvokedCommand],
             ephemeral: bool = True,
-            callback: Callable[[InvokedCommand], None] = None
+            callback: Callable[[InvokedCommand], None] = None,
+            command_interaction: Interaction = None
     ):
-        '''Handles user feedback when running a deferred command'''
+        '''
+        Handles user feedback when running a deferred command. If the action takes longer than what's left of the
+        interaction's latency budget, then the interaction is deferred so that it doesn't expire, and the feedback is
+        sent as a followup instead.
+
+        If the interaction being responded to didn't come from the command itself (ex. it's a selection from a menu that
+        the command showed), then the command's own interaction should be passed in as command_interaction.
+        '''
 
-        command_string = self.command_reconstructor.reconstruct_command_string(interaction, replace_mentions=False)
+        command_interaction = command_interaction or interaction
+        command_string = self.command_reconstructor.reconstruct_command_string(command_interaction, replace_mentions=False)
+        command_name = command_interaction.command.qualified_name if command_interaction.command is not None else "unknown"
 
         ## Act upon the command, giving human readable feedback if any errors pop up
         try:
-            invoked_command = await action()
+            invoked_command, deferred = await self.run_within_latency_budget(interaction, action(), ephemeral)
+            self.command_responses_counter.inc(command=command_name, path="deferred" if deferred else "immediate")
 
             ## Let the client handle followup feedback if desired
             if(callback is not None):
@@ -72,24 +157,23 @@ class InvokedCommandHandler(Module):
                 return
 
             ## Handle command storage
-            await self.database_manager.store(interaction, valid=invoked_command.successful)
+            await self.database_manager.store(command_interaction, valid=invoked_command.successful)
 
             ## Otherwise provide some basic feedback, and (implicitly) clear the thinking state
             if (invoked_command.successful):
-                await interaction.response.send_message(
-                    f"<@{interaction.user.id}> used **{command_string}**",
-                    ephemeral=ephemeral
-                )
+                await self.send_message(interaction, f"<@{interaction.user.id}> used **{command_string}**", ephemeral=ephemeral)
             elif (invoked_command.human_readable_error_message is not None):
-                await interaction.response.send_message(invoked_command.human_readable_error_message, ephemeral=True)
+                await self.send_message(interaction, invoked_command.human_readable_error_message, ephemeral=True)
             elif (invoked_command.error is not None):
                 raise invoked_command.error
             else:
                 raise RuntimeError("Unspecified error during command handling")
 
         except Exception as e:
-            LOGGER.error("Unspecified error during command handling", e)
-            await interaction.response.send_message(
+            LOGGER.error("Unspecified error during command handling", exc_info=e)
+
+            await self.send_message(
+                interaction,
                 f"I'm sorry <@{interaction.user.id}>, I'm afraid I can't do that.\n" +
                 f"Something went wrong, and I couldn't complete the **{command_string}** command.",
                 ephemeral=True
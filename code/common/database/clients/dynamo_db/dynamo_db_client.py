@@ -1,6 +1,9 @@
 import os
+import asyncio
 import logging
 import boto3
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
 from boto3.dynamodb.conditions import Key
 
@@ -34,6 +37,16 @@ class DynamoDbClient(DatabaseClient):
         self.detailed_table = self.dynamo_db.Table(self.detailed_table_name)
         self.anonymous_table = self.dynamo_db.Table(self.anonymous_table_name)
 
+        ## boto3's calls block, so writes are made on a thread of their own. Just the one, since boto3 resources aren't
+        ## thread safe.
+        self._write_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="dynamo_db_write")
+
+        ## Deletes scan the whole table, so they get their own resource and thread. Otherwise every interaction's write
+        ## would be stuck waiting behind them.
+        self._delete_dynamo_db = boto3.resource(self.resource, region_name=self.region_name)
+        self._delete_detailed_table = self._delete_dynamo_db.Table(self.detailed_table_name)
+        self._delete_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="dynamo_db_delete")
+
     ## Implemented Properties
 
     @property
@@ -66,7 +79,10 @@ class DynamoDbClient(DatabaseClient):
         detailed_item_json["expires_on"] = ttl_expiry_timestamp
         try:
             LOGGER.debug(f"Storing detailed data in {self.detailed_table_name}, {detailed_item_json}")
-            self.detailed_table.put_item(Item=detailed_item_json)
+            await asyncio.get_running_loop().run_in_executor(
+                self._write_executor,
+                partial(self.detailed_table.put_item, Item=detailed_item_json)
+            )
         except Exception as e:
             LOGGER.exception(f"Exception while storing anonymous data into {self.detailed_table_name}", e)
 
@@ -74,7 +90,10 @@ class DynamoDbClient(DatabaseClient):
         anonymous_item_json[self.primary_key] = anonymous_item.build_primary_key()
         try:
             LOGGER.debug(f"Storing anonymous data in {self.anonymous_table_name}, {anonymous_item_json}")
-            self.anonymous_table.put_item(Item=anonymous_item_json)
+            await asyncio.get_running_loop().run_in_executor(
+                self._write_executor,
+                partial(self.anonymous_table.put_item, Item=anonymous_item_json)
+            )
         except Exception as e:
             LOGGER.exception(f"Exception while storing anonymous data into {self.anonymous_table_name}", e)
 
@@ -93,18 +112,67 @@ class DynamoDbClient(DatabaseClient):
         LOGGER.info(f"Starting to process {len(user_ids)} delete requests")
         primary_keys_to_delete = list(map(
             lambda item: item[self.primary_key],
-            await self.get_keys_from_users(self.detailed_table, user_ids)
+            await self.get_keys_from_users(self._delete_detailed_table, user_ids)
         ))
 
         LOGGER.info(f"Starting to batch delete {len(primary_keys_to_delete)} documents.")
 
-        with self.detailed_table.batch_writer() as batch:
-            for key in primary_keys_to_delete:
-                key_value = {self.primary_key: key}
+        def batch_delete():
+            with self._delete_detailed_table.batch_writer() as batch:
+                for key in primary_keys_to_delete:
+                    key_value = {self.primary_key: key}
+
+                    batch.delete_item(
+                        Key = key_value
+                    )
+
+        await asyncio.get_running_loop().run_in_executor(self._delete_executor, batch_delete)
+
+    async def delete_users_page(self, user_ids: set[int], start_key: dict = None, page_size: int = None) -> tuple[int, dict]:
+        """
+        Scans a single page of the Detailed table (starting after start_key), and deletes every document in it that
+        belongs to one of the supplied user_ids. Returns the number of documents deleted, and the key to resume the
+        scan from (or None once the whole table has been scanned). This keeps the work done per call bounded, no
+        matter how large the table is.
+        """
+
+        scan_kwargs = {
+            'ProjectionExpression': '#primary_key, user_id',
+            'ExpressionAttributeNames': {'#primary_key': self.primary_key}
+        }
+        if (page_size):
+            scan_kwargs['Limit'] = page_size
+        if (start_key):
+            scan_kwargs['ExclusiveStartKey'] = start_key
+
+        def scan_and_delete() -> tuple[int, dict]:
+            response = self._delete_detailed_table.scan(**scan_kwargs)
+
+            ## Filtering here rather than with a FilterExpression keeps the expression size independent of the
+            ## number of users being deleted
+            primary_keys_to_delete = [
+                item[self.primary_key] for item in response.get('Items', [])
+                if ('user_id' in item and int(item['user_id']) in user_ids)
+            ]
+
+            if (primary_keys_to_delete):
+                with self._delete_detailed_table.batch_writer() as batch:
+                    for key in primary_keys_to_delete:
+                        batch.delete_item(Key = {self.primary_key: key})
+
+            return len(primary_keys_to_delete), response.get('LastEvaluatedKey', None)
+
+        return await asyncio.get_running_loop().run_in_executor(self._delete_executor, scan_and_delete)
+
+
+    async def get_detailed_item_count(self) -> int:
+        """Gets the approximate number of documents in the Detailed table (DynamoDB refreshes this every ~6 hours)"""
+
+        def get_item_count() -> int:
+            self._delete_detailed_table.reload()
+            return int(self._delete_detailed_table.item_count)
 
-                batch.delete_item(
-                    Key = key_value
-                )
+        return await asyncio.get_running_loop().run_in_executor(self._delete_executor, get_item_count)
 
     ## Methods
 
@@ -142,7 +210,10 @@ class DynamoDbClient(DatabaseClient):
         while (not done):
             if (start_key):
                 scan_kwargs['ExclusiveStartKey'] = start_key
-            response = table.scan(**scan_kwargs)
+            response = await asyncio.get_running_loop().run_in_executor(
+                self._delete_executor,
+                partial(table.scan, **scan_kwargs)
+            )
             results.extend(response.get('Items', []))
             start_key = response.get('LastEvaluatedKey', None)
             done = start_key is None
@@ -34,3 +34,13 @@ class DatabaseClient(ABC):
     @abstractmethod
     async def batch_delete_users(self, user_ids: list[str]):
         raise NotImplementedError(f"The abstract {DatabaseClient.batch_delete_users.__name__} method hasn't been implemented yet!")
+
+
+    @abstractmethod
+    async def delete_users_page(self, user_ids: set[int], start_key: dict = None, page_size: int = None) -> tuple[int, dict]:
+        raise NotImplementedError(f"The abstract {DatabaseClient.delete_users_page.__name__} method hasn't been implemented yet!")
+
+
+    @abstractmethod
+    async def get_detailed_item_count(self) -> int:
+        raise NotImplementedError(f"The abstract {DatabaseClient.get_detailed_item_count.__name__} method hasn't been implemented yet!")
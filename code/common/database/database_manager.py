@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import inspect
 
@@ -12,6 +13,7 @@ from common.database.models.anonymous_item import AnonymousItem
 from common.database.models.detailed_item import DetailedItem
 from common.database.database_client import DatabaseClient
 from common.exceptions import UnableToStoreInDatabaseException
+from common.metrics.metrics_manager import MetricsManager
 from common.module.module import Module
 
 ## Config & logging
@@ -27,9 +29,21 @@ class DatabaseManager(Module):
         assert (self.command_reconstructor is not None)
         self.anonymous_item_factory: AnonymousItemFactory = kwargs.get('dependencies', {}).get('AnonymousItemFactory')
         assert (self.anonymous_item_factory is not None)
+        self.metrics_manager: MetricsManager = kwargs.get('dependencies', {}).get('MetricsManager')
+        assert (self.metrics_manager is not None)
 
         self.enabled = CONFIG_OPTIONS.get('database_enable', False)
 
+        self.pending_writes_gauge = self.metrics_manager.gauge("database_pending_writes", "Number of database writes currently in flight")
+        self.writes_counter = self.metrics_manager.counter(
+            "database_writes_total",
+            "Number of background database writes, by whether they succeeded or failed",
+            ("result",)
+        )
+
+        ## Strong references to the in-flight background writes, so they aren't garbage collected before they finish
+        self._background_writes: set[asyncio.Task] = set()
+
         self._client: DatabaseClient = client
 
     ## Methods
@@ -92,11 +106,31 @@ class DatabaseManager(Module):
         if (self._client is None):
             raise UnableToStoreInDatabaseException("Unable to store data without a client registered!")
 
-        await self._client.store(detailed_item, anonymous_item)
+        self.pending_writes_gauge.inc()
+        try:
+            await self._client.store(detailed_item, anonymous_item)
+        finally:
+            self.pending_writes_gauge.dec()
+
+
+    async def _store_in_background(self, detailed_item: DetailedItem, anonymous_item: AnonymousItem):
+        try:
+            await self._store(detailed_item, anonymous_item)
+            self.writes_counter.inc(result="success")
+        except Exception as e:
+            self.writes_counter.inc(result="failure")
+            LOGGER.exception("Unable to store the item in the database", exc_info=e)
 
 
     async def store(self, data: Context | Interaction, valid: bool = None):
-        """Handles storage of the given Context or Interaction (by converting it into a DetailedItem) in the registered database"""
+        """
+        Handles storage of the given Context or Interaction (by converting it into a DetailedItem) in the registered
+        database. The items are built right away, but they're written in the background, so that the caller (and the
+        user waiting on its response) isn't held up by the database.
+        """
+
+        if (not self.enabled):
+            return
 
         if (isinstance(data, Context)):
             detailed_item = self._build_detailed_item_from_context(data, valid)
@@ -107,7 +141,9 @@ class DatabaseManager(Module):
         else:
             raise UnableToStoreInDatabaseException("Data is not of type Context or Interaction")
 
-        await self._store(detailed_item, anonymous_item)
+        task = asyncio.get_running_loop().create_task(self._store_in_background(detailed_item, anonymous_item))
+        self._background_writes.add(task)
+        task.add_done_callback(self._background_writes.discard)
 
 
     async def batch_delete_users(self, user_ids: list[str]):
@@ -120,3 +156,30 @@ class DatabaseManager(Module):
             raise UnableToStoreInDatabaseException("Unable to batch delete data without a client registered!")
 
         await self._client.batch_delete_users(user_ids)
+
+
+    async def delete_users_page(self, user_ids: set[int], start_key: dict = None, page_size: int = None) -> tuple[int, dict]:
+        """
+        Deletes the supplied users' documents from a single page of the Detailed table. Returns the number of documents
+        deleted, and the key to continue from (or None when there's nothing left to scan).
+        """
+
+        if (not self.enabled):
+            return 0, None
+
+        if (self._client is None):
+            raise UnableToStoreInDatabaseException("Unable to batch delete data without a client registered!")
+
+        return await self._client.delete_users_page(user_ids, start_key, page_size)
+
+
+    async def get_detailed_item_count(self) -> int:
+        """Gets the approximate number of documents in the Detailed table"""
+
+        if (not self.enabled):
+            return 0
+
+        if (self._client is None):
+            raise UnableToStoreInDatabaseException("Unable to count data without a client registered!")
+
+        return await self._client.get_detailed_item_count()
@@ -0,0 +1,161 @@
+import asyncio
+import logging
+import os
+import struct
+import zlib
+from pathlib import Path
+from typing import Iterable
+
+from common.logging import Logging
+
+## Logging
+LOGGER = Logging.initialize_logging(logging.getLogger(__name__))
+
+
+class DeleteRequestJournal:
+    '''
+    An append-only journal of the user ids that have requested that their data be deleted. Each record is length
+    prefixed and checksummed, so a write that was torn by a crash is detected (and dropped) when the journal is loaded.
+
+    Appends are group committed: records that are appended while a write is in progress are batched together, and
+    written (and fsynced) all at once by a single write off of the event loop. Once the queued ids have been processed,
+    the journal is compacted by atomically replacing it with a fresh journal of just the ids that are still queued.
+    '''
+
+    MAGIC = b"CLIPDRJ\x01"
+    RECORD_HEADER = struct.Struct(">II")    # Payload length, payload crc32
+    PAYLOAD = struct.Struct(">BQ")          # Operation, user id
+
+    ## Operations
+    ADD = 1
+    REMOVE = 2
+
+    def __init__(self, path: Path):
+        self.path = path
+
+        self._pending: list[tuple[bytes, asyncio.Future]] = []
+        self._flush_task: asyncio.Task = None
+        self._write_lock = asyncio.Lock()
+
+    ## Methods
+
+    def _encode(self, operation: int, user_id: int) -> bytes:
+        payload = self.PAYLOAD.pack(operation, user_id)
+        return self.RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+    def _replay(self, data: bytes) -> tuple[set[int], int]:
+        '''Replays the journal's records, and returns the queued user ids and the length of the intact records'''
+
+        user_ids = set()
+        offset = len(self.MAGIC)
+        while (offset + self.RECORD_HEADER.size <= len(data)):
+            length, checksum = self.RECORD_HEADER.unpack_from(data, offset)
+            payload = data[offset + self.RECORD_HEADER.size:offset + self.RECORD_HEADER.size + length]
+            if (len(payload) != length or zlib.crc32(payload) != checksum or length != self.PAYLOAD.size):
+                break
+
+            operation, user_id = self.PAYLOAD.unpack(payload)
+            if (operation == self.ADD):
+                user_ids.add(user_id)
+            elif (operation == self.REMOVE):
+                user_ids.discard(user_id)
+
+            offset += self.RECORD_HEADER.size + length
+
+        return user_ids, offset
+
+
+    def _write_journal(self, user_ids: Iterable[int]):
+        '''Atomically replaces the journal with one that holds just the given user ids'''
+
+        temp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(temp_path, 'wb') as fd:
+            fd.write(self.MAGIC + b"".join(self._encode(self.ADD, user_id) for user_id in user_ids))
+            fd.flush()
+            os.fsync(fd.fileno())
+
+        os.replace(temp_path, self.path)
+
+
+    def load(self) -> set[int]:
+        '''
+        Loads the queued user ids from the journal. Any torn records at the end of the journal are dropped, and older
+        plain text queues (one id per line) are converted into a journal.
+        '''
+
+        data = self.path.read_bytes() if self.path.is_file() else b""
+
+        if (not data.startswith(self.MAGIC)):
+            user_ids = {int(line) for line in data.decode().split()}
+            self._write_journal(user_ids)
+            if (user_ids):
+                LOGGER.info(f"Converted the plain text delete request queue with {len(user_ids)} ids into a journal")
+
+            return user_ids
+
+        user_ids, intact_length = self._replay(data)
+        if (intact_length < len(data)):
+            LOGGER.warning(f"Dropping {len(data) - intact_length} bytes of torn records from the end of {self.path}")
+            self._write_journal(user_ids)
+
+        return user_ids
+
+
+    def _append_and_sync(self, data: bytes):
+        with open(self.path, 'ab') as fd:
+            fd.write(data)
+            fd.flush()
+            os.fsync(fd.fileno())
+
+
+    async def _flush_pending(self):
+        async with self._write_lock:
+            while (self._pending):
+                batch, self._pending = self._pending, []
+
+                try:
+                    await asyncio.get_running_loop().run_in_executor(
+                        None,
+                        self._append_and_sync,
+                        b"".join(records for records, _ in batch)
+                    )
+                except Exception as e:
+                    for _, future in batch:
+                        if (not future.done()):
+                            future.set_exception(e)
+                else:
+                    for _, future in batch:
+                        if (not future.done()):
+                            future.set_result(None)
+
+
+    async def _append(self, records: bytes):
+        '''Appends the records to the journal, and returns once they've been durably written'''
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((records, future))
+
+        if (self._flush_task is None or self._flush_task.done()):
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_pending())
+
+        await future
+
+
+    async def add(self, user_id: int):
+        await self._append(self._encode(self.ADD, user_id))
+
+
+    async def remove(self, user_ids: Iterable[int]):
+        await self._append(b"".join(self._encode(self.REMOVE, user_id) for user_id in user_ids))
+
+
+    async def compact(self, user_ids: Iterable[int]):
+        '''
+        Replaces the journal with one that holds just the given (still queued) user ids. Pass in the live collection of
+        queued ids, since it's only copied once any in-progress writes have finished, so no newer ids are lost.
+        '''
+
+        async with self._write_lock:
+            user_ids = list(user_ids)
+            await asyncio.get_running_loop().run_in_executor(None, self._write_journal, user_ids)
@@ -0,0 +1,185 @@
+import asyncio
+import collections
+import datetime
+import logging
+import math
+import sys
+import threading
+import time
+import traceback
+
+from common.configuration import Configuration
+from common.logging import Logging
+from common.metrics.models.histogram import Histogram
+
+## Config & logging
+CONFIG_OPTIONS = Configuration.load_config()
+LOGGER = Logging.initialize_logging(logging.getLogger(__name__))
+
+
+class SlowCallbackEvent:
+    '''A single occurrence of the event loop being blocked for longer than the threshold'''
+
+    def __init__(self, occurred_at: datetime.datetime, task_name: str | None, stack: list[str]):
+        self.occurred_at = occurred_at
+        self.task_name = task_name
+        self.stack = stack
+        self.blocked_seconds: float = None    # Filled in once the loop is unblocked
+
+
+    def __str__(self):
+        blocked = f"{self.blocked_seconds * 1000:.0f}ms" if self.blocked_seconds is not None else "ongoing"
+        return f"{self.occurred_at.strftime('%Y-%m-%d %H:%M:%S')} UTC, blocked {blocked}, in {self.task_name or 'a non-task callback'}"
+
+
+class LoopLagMonitor:
+    '''
+    Measures the event loop's scheduling lag with a heartbeat task, and uses a watchdog thread to sample the loop
+    thread's stack while it's blocked. Sampling during the stall (rather than after it) means the stack points right at
+    the synchronous code that's hogging the loop.
+    '''
+
+    def __init__(
+            self,
+            lag_histogram: Histogram,
+            sample_interval_seconds: float,
+            threshold_seconds: float,
+            max_samples: int = 2048,
+            max_events: int = 25
+    ):
+        self.lag_histogram = lag_histogram
+        self.sample_interval_seconds = sample_interval_seconds
+        self.threshold_seconds = threshold_seconds
+
+        self._lock = threading.Lock()
+        self._samples = collections.deque(maxlen=max_samples)
+        self._events: collections.deque[SlowCallbackEvent] = collections.deque(maxlen=max_events)
+
+        self._loop: asyncio.AbstractEventLoop = None
+        self._loop_thread_id: int = None
+        self._heartbeat_task: asyncio.Task = None
+        self._watchdog_thread: threading.Thread = None
+        self._stop_event: threading.Event = None
+
+        ## State shared between the heartbeat and the watchdog
+        self._expected_wake_time: float = None
+        self._current_event: SlowCallbackEvent = None
+
+    ## Properties
+
+    @property
+    def is_running(self) -> bool:
+        return self._heartbeat_task is not None
+
+    ## Methods
+
+    def start(self):
+        '''Starts monitoring the currently running event loop'''
+
+        if (self.is_running):
+            return
+
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        ## Each watchdog gets its own stop event, so a quick stop() and start() can't revive the old watchdog alongside
+        ## the new one
+        self._stop_event = threading.Event()
+
+        self._heartbeat_task = self._loop.create_task(self._heartbeat())
+        self._watchdog_thread = threading.Thread(
+            target=self._watchdog,
+            args=(self._stop_event,),
+            name="LoopLagWatchdog",
+            daemon=True
+        )
+        self._watchdog_thread.start()
+
+
+    def stop(self):
+        if (not self.is_running):
+            return
+
+        self._heartbeat_task.cancel()
+        self._heartbeat_task = None
+        self._stop_event.set()
+        self._stop_event = None
+        self._watchdog_thread = None
+
+
+    async def _heartbeat(self):
+        while (True):
+            with self._lock:
+                self._expected_wake_time = time.monotonic() + self.sample_interval_seconds
+
+            await asyncio.sleep(self.sample_interval_seconds)
+
+            with self._lock:
+                lag = max(time.monotonic() - self._expected_wake_time, 0.0)
+                self._expected_wake_time = None
+                self._samples.append(lag)
+
+                ## The loop is free again, so the watchdog's ongoing event (if any) now knows how long it lasted
+                if (self._current_event is not None):
+                    self._current_event.blocked_seconds = lag
+                    LOGGER.warning(
+                        f"Event loop was blocked for {lag * 1000:.0f}ms by {self._current_event.task_name or 'a non-task callback'}:\n"
+                        f"{''.join(self._current_event.stack)}"
+                    )
+                    self._current_event = None
+
+            self.lag_histogram.observe(lag)
+
+
+    def _watchdog(self, stop_event: threading.Event):
+        poll_interval = max(self.threshold_seconds / 2, 0.01)
+
+        while (not stop_event.wait(poll_interval)):
+            with self._lock:
+                expected_wake_time = self._expected_wake_time
+                if (expected_wake_time is None or self._current_event is not None):
+                    continue
+
+                if (time.monotonic() - expected_wake_time < self.threshold_seconds):
+                    continue
+
+                event = self._sample_loop_thread()
+                self._current_event = event
+                self._events.append(event)
+
+
+    def _sample_loop_thread(self) -> SlowCallbackEvent:
+        '''Captures the loop thread's current stack, and the task that it's running (if any)'''
+
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = traceback.format_stack(frame, limit=20) if frame is not None else []
+
+        task_name = None
+        try:
+            task = asyncio.current_task(self._loop)
+            if (task is not None):
+                coroutine = task.get_coro()
+                task_name = f"{task.get_name()} ({getattr(coroutine, '__qualname__', coroutine)})"
+        except Exception:
+            ## Peeking at another thread's loop is best effort
+            pass
+
+        return SlowCallbackEvent(datetime.datetime.now(datetime.timezone.utc), task_name, stack)
+
+
+    def get_percentiles(self, quantiles: tuple[float, ...] = (0.5, 0.9, 0.99, 1.0)) -> dict[float, float]:
+        '''Calculates the given quantiles of the recently sampled lag, in seconds'''
+
+        with self._lock:
+            samples = sorted(self._samples)
+
+        if (not samples):
+            return {quantile: math.nan for quantile in quantiles}
+
+        return {quantile: samples[min(int(quantile * len(samples)), len(samples) - 1)] for quantile in quantiles}
+
+
+    def get_events(self) -> list[SlowCallbackEvent]:
+        '''Returns the recent slow callback events, newest first'''
+
+        with self._lock:
+            return list(reversed(self._events))
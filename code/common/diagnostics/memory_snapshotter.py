@@ -0,0 +1,114 @@
+import collections
+import gc
+import os
+import threading
+import tracemalloc
+
+
+class MemorySnapshotDiff:
+    '''The difference between two MemorySnapshotter snapshots'''
+
+    def __init__(
+            self,
+            traced_memory: tuple[int, int],
+            top_statistics: list[tracemalloc.StatisticDiff],
+            object_counts: dict[str, int],
+            object_count_deltas: dict[str, int],
+            is_baseline: bool
+    ):
+        self.traced_memory = traced_memory
+        self.top_statistics = top_statistics
+        self.object_counts = object_counts
+        self.object_count_deltas = object_count_deltas
+        self.is_baseline = is_baseline
+
+
+class MemorySnapshotter:
+    '''
+    Takes tracemalloc snapshots and diffs each one against the one before it, so that memory growth can be attributed
+    to the lines that allocated it. Tracing is started on the first snapshot, so that first one just acts as a baseline.
+    '''
+
+    ## Types that are known to accumulate over the lifetime of the bot
+    DEFAULT_TRACKED_TYPE_NAMES = ("ServerStateManager", "AudioPlayRequest", "Clip", "DetailedItem")
+
+
+    def __init__(self, frame_depth: int = 1, tracked_type_names: tuple[str, ...] = None):
+        self.frame_depth = frame_depth
+        self.tracked_type_names = set(tracked_type_names or self.DEFAULT_TRACKED_TYPE_NAMES)
+
+        self._lock = threading.Lock()
+        self._previous_snapshot: tracemalloc.Snapshot = None
+        self._previous_object_counts: dict[str, int] = {}
+
+    ## Properties
+
+    @property
+    def is_tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    ## Methods
+
+    def count_objects(self) -> dict[str, int]:
+        '''Counts the live instances of each of the tracked types'''
+
+        counts = collections.Counter({type_name: 0 for type_name in self.tracked_type_names})
+        for obj in gc.get_objects():
+            type_name = type(obj).__name__
+            if (type_name in self.tracked_type_names):
+                counts[type_name] += 1
+
+        return dict(counts)
+
+
+    def take_snapshot(self, limit: int = 10) -> MemorySnapshotDiff:
+        '''Takes a new snapshot, and diffs it against the previous one. This can take a while, so run it in a thread.'''
+
+        with self._lock:
+            if (not tracemalloc.is_tracing()):
+                tracemalloc.start(self.frame_depth)
+                self._previous_snapshot = None
+
+            ## Ignore the memory used by tracemalloc itself
+            snapshot = tracemalloc.take_snapshot().filter_traces((
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>")
+            ))
+            object_counts = self.count_objects()
+
+            is_baseline = self._previous_snapshot is None
+            if (is_baseline):
+                top_statistics = []
+            else:
+                top_statistics = snapshot.compare_to(self._previous_snapshot, "lineno")[:limit]
+
+            object_count_deltas = {
+                type_name: count - self._previous_object_counts.get(type_name, 0)
+                for type_name, count in object_counts.items()
+            }
+
+            self._previous_snapshot = snapshot
+            self._previous_object_counts = object_counts
+
+            return MemorySnapshotDiff(tracemalloc.get_traced_memory(), top_statistics, object_counts, object_count_deltas, is_baseline)
+
+
+    def stop(self):
+        '''Stops tracing, and drops the previous snapshot'''
+
+        with self._lock:
+            tracemalloc.stop()
+            self._previous_snapshot = None
+            self._previous_object_counts = {}
+
+
+    @staticmethod
+    def get_rss_bytes() -> int | None:
+        '''Gets the process' resident set size, if the platform exposes it'''
+
+        try:
+            with open("/proc/self/statm") as fd:
+                return int(fd.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError, IndexError, AttributeError):
+            return None
@@ -0,0 +1,114 @@
+import collections
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from types import FrameType
+
+
+class ProfileResult:
+    '''The aggregated samples from a SamplingProfiler run'''
+
+    def __init__(self, duration_seconds: float, sample_count: int, collapsed_stacks: collections.Counter):
+        self.duration_seconds = duration_seconds
+        self.sample_count = sample_count
+        self.collapsed_stacks = collapsed_stacks
+
+
+    def get_top_frames(self, limit: int = 10) -> list[tuple[str, int, int]]:
+        '''
+        Returns the frames that were most often on top of the stack, as a list of (frame, self samples, total samples)
+        tuples. Self samples count the times the frame was the innermost one, and total samples count the times it
+        appeared anywhere in a stack.
+        '''
+
+        self_counts = collections.Counter()
+        total_counts = collections.Counter()
+        for stack, count in self.collapsed_stacks.items():
+            frames = stack.split(";")
+            self_counts[frames[-1]] += count
+            ## Recursive functions should only be counted once per stack
+            for frame in set(frames[1:]):
+                total_counts[frame] += count
+
+        return [(frame, count, total_counts[frame]) for frame, count in self_counts.most_common(limit)]
+
+
+    def write_collapsed(self, path: Path):
+        '''Writes the samples in the collapsed stack format, which flamegraph.pl, speedscope, etc can all read'''
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w') as fd:
+            for stack, count in sorted(self.collapsed_stacks.items()):
+                fd.write(f"{stack} {count}\n")
+
+
+class SamplingProfiler:
+    '''
+    Low overhead statistical profiler. Rather than tracing every call, it periodically grabs the current stack of every
+    thread in the process, which is cheap enough to run against the live bot.
+    '''
+
+    def __init__(self, interval_seconds: float = 0.01, max_depth: int = 64):
+        self.interval_seconds = interval_seconds
+        self.max_depth = max_depth
+
+        self._lock = threading.Lock()
+
+    ## Properties
+
+    @property
+    def is_running(self) -> bool:
+        return self._lock.locked()
+
+    ## Methods
+
+    @staticmethod
+    def _format_frame(frame: FrameType) -> str:
+        code = frame.f_code
+        ## Semicolons separate frames in the collapsed format, so they can't show up in the frame names
+        return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(";", ":")
+
+
+    def _collapse_stack(self, thread_name: str, frame: FrameType) -> str:
+        frames = []
+        while (frame is not None and len(frames) < self.max_depth):
+            frames.append(self._format_frame(frame))
+            frame = frame.f_back
+
+        frames.append(thread_name.replace(";", ":").replace(" ", "_"))
+        return ";".join(reversed(frames))
+
+
+    def profile(self, duration_seconds: float) -> ProfileResult:
+        '''
+        Samples every thread (other than the profiler's) for the given number of seconds. This blocks, so it should be
+        run in its own thread. Raises RuntimeError if a profile is already running.
+        '''
+
+        if (not self._lock.acquire(blocking=False)):
+            raise RuntimeError("A profile is already running")
+
+        try:
+            profiler_thread_id = threading.get_ident()
+            collapsed_stacks = collections.Counter()
+            sample_count = 0
+
+            start = time.monotonic()
+            end = start + duration_seconds
+            while (time.monotonic() < end):
+                thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+
+                for thread_id, frame in sys._current_frames().items():
+                    if (thread_id == profiler_thread_id):
+                        continue
+
+                    collapsed_stacks[self._collapse_stack(thread_names.get(thread_id, str(thread_id)), frame)] += 1
+
+                sample_count += 1
+                time.sleep(self.interval_seconds)
+
+            return ProfileResult(time.monotonic() - start, sample_count, collapsed_stacks)
+        finally:
+            self._lock.release()
@@ -90,3 +90,19 @@ class ModuleLoadException(RuntimeError):
     @property
     def cause(self):
         return self._cause
+
+
+class ExecutorPoolFullException(RuntimeError):
+    '''
+    Exception that's thrown when the executor pool already has the maximum number of tasks queued up.
+    '''
+
+    def __init__(self, message: str, task_name: str):
+        super().__init__(message)
+
+        self._task_name = task_name
+
+
+    @property
+    def task_name(self) -> str:
+        return self._task_name
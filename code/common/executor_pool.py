@@ -0,0 +1,122 @@
+import os
+import asyncio
+import logging
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable
+
+from common.configuration import Configuration
+from common.exceptions import ExecutorPoolFullException
+from common.logging import Logging
+from common.metrics.metrics_manager import MetricsManager
+from common.module.module import Module
+
+## Config & logging
+CONFIG_OPTIONS = Configuration.load_config()
+LOGGER = Logging.initialize_logging(logging.getLogger(__name__))
+
+
+def _timed_call(function: Callable, *args, **kwargs) -> tuple[Any, float, float]:
+    '''
+    Runs the function inside of the worker, and returns its result along with when it started and finished. This lives
+    at the module level so that it can be pickled for process pools.
+    '''
+
+    started = time.monotonic()
+    result = function(*args, **kwargs)
+
+    return (result, started, time.monotonic())
+
+
+class ExecutorPool(Module):
+    """Shared pool for running CPU heavy (or otherwise blocking) work off of the event loop"""
+
+    ## Keys
+    EXECUTOR_POOL_TYPE_KEY = "executor_pool_type"
+    EXECUTOR_POOL_MAX_WORKERS_KEY = "executor_pool_max_workers"
+    EXECUTOR_POOL_MAX_QUEUED_KEY = "executor_pool_max_queued"
+
+    ## Pool types
+    THREAD_POOL_TYPE = "thread"
+    PROCESS_POOL_TYPE = "process"
+
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.metrics_manager: MetricsManager = kwargs.get('dependencies', {}).get('MetricsManager')
+        assert (self.metrics_manager is not None)
+
+        self.pool_type = CONFIG_OPTIONS.get(self.EXECUTOR_POOL_TYPE_KEY, self.THREAD_POOL_TYPE)
+        self.max_workers = int(CONFIG_OPTIONS.get(self.EXECUTOR_POOL_MAX_WORKERS_KEY) or min(os.cpu_count() or 1, 4))
+        self.max_queued = int(CONFIG_OPTIONS.get(self.EXECUTOR_POOL_MAX_QUEUED_KEY, 64))
+
+        ## Unpicklable work (anything touching discord.py objects, for example) always needs a thread, so there's always
+        ## a thread pool available, even when the main pool is made of processes.
+        self._thread_executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="ExecutorPool")
+        if (self.pool_type == self.PROCESS_POOL_TYPE):
+            self._executor: Executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        else:
+            if (self.pool_type != self.THREAD_POOL_TYPE):
+                LOGGER.warning(f"Unknown executor pool type '{self.pool_type}', falling back to '{self.THREAD_POOL_TYPE}'")
+                self.pool_type = self.THREAD_POOL_TYPE
+            self._executor: Executor = self._thread_executor
+
+        self._pending_count = 0
+
+        ## Metrics
+        self.pending_tasks_gauge = self.metrics_manager.gauge("executor_pending_tasks", "Number of tasks queued or running in the executor pool")
+        self.rejected_tasks_counter = self.metrics_manager.counter("executor_rejected_tasks_total", "Number of tasks rejected because the executor pool was full", ("task",))
+        self.task_wait_histogram = self.metrics_manager.histogram("executor_task_wait_seconds", "Seconds that tasks waited for an executor pool worker", ("task",))
+        self.task_run_histogram = self.metrics_manager.histogram("executor_task_run_seconds", "Seconds that tasks spent running in the executor pool", ("task",))
+
+        LOGGER.info(f"Started {self.pool_type} executor pool with {self.max_workers} workers, and room for {self.max_queued} queued tasks")
+
+    ## Properties
+
+    @property
+    def pending_count(self) -> int:
+        return self._pending_count
+
+    ## Methods
+
+    async def _run(self, executor: Executor, task_name: str, function: Callable, *args, **kwargs) -> Any:
+        if (self._pending_count >= self.max_queued):
+            self.rejected_tasks_counter.inc(task=task_name)
+            raise ExecutorPoolFullException(f"Unable to run '{task_name}', the executor pool is full", task_name)
+
+        self._pending_count += 1
+        self.pending_tasks_gauge.set(self._pending_count)
+        try:
+            submitted = time.monotonic()
+            result, started, finished = await asyncio.get_running_loop().run_in_executor(
+                executor,
+                partial(_timed_call, function, *args, **kwargs)
+            )
+        finally:
+            self._pending_count -= 1
+            self.pending_tasks_gauge.set(self._pending_count)
+
+        self.task_wait_histogram.observe(max(started - submitted, 0.0), task=task_name)
+        self.task_run_histogram.observe(max(finished - started, 0.0), task=task_name)
+
+        return result
+
+
+    async def run(self, task_name: str, function: Callable, *args, **kwargs) -> Any:
+        '''
+        Runs the function in the configured pool, and returns its result. If the pool is made of processes, then the
+        function and its arguments must be picklable. Raises ExecutorPoolFullException if too much work is queued.
+        '''
+
+        return await self._run(self._executor, task_name, function, *args, **kwargs)
+
+
+    async def run_in_thread(self, task_name: str, function: Callable, *args, **kwargs) -> Any:
+        '''
+        Runs the function in the thread pool, regardless of the configured pool type, and returns its result. Raises
+        ExecutorPoolFullException if too much work is queued.
+        '''
+
+        return await self._run(self._thread_executor, task_name, function, *args, **kwargs)
@@ -0,0 +1,133 @@
+import heapq
+import random
+from array import array
+from typing import Hashable
+
+
+class CountMinSketch:
+    '''
+    A fixed size, probabilistic counter for a stream of keys. Each key is counted in one cell of every row, and its
+    count is estimated as the smallest of those cells, so estimates can be too high (when keys collide) but never too
+    low. Memory use is depth * width counters, no matter how many distinct keys are seen.
+    '''
+
+    MAX_COUNT = 0xFFFFFFFF
+    HASH_PRIME = (1 << 61) - 1  # Mersenne prime for the rows' universal hash functions
+
+    def __init__(self, width: int = 1024, depth: int = 4):
+        self.width = max(width, 1)
+        self.depth = max(depth, 1)
+        self._rows = [array('I', bytes(4 * self.width)) for _ in range(self.depth)]
+        ## Each row gets its own (a * x + b) mod p hash function. Hashing (row, key) tuples instead leaves the rows so
+        ## correlated that keys which collide in one row tend to collide in all of them.
+        self._hash_parameters = [
+            (random.randrange(1, self.HASH_PRIME), random.randrange(self.HASH_PRIME)) for _ in range(self.depth)
+        ]
+
+    ## Methods
+
+    def _get_indexes(self, key: Hashable) -> list[int]:
+        key_hash = hash(key) & 0xFFFFFFFFFFFFFFFF
+
+        return [((a * key_hash + b) % self.HASH_PRIME) % self.width for a, b in self._hash_parameters]
+
+
+    def add(self, key: Hashable, count: int = 1) -> int:
+        '''Counts the key, and returns its new estimated count'''
+
+        indexes = self._get_indexes(key)
+        estimate = min(self.MAX_COUNT, min(row[index] for row, index in zip(self._rows, indexes)) + count)
+
+        ## Conservative update, only raise the cells that are below the new estimate. This keeps collisions from
+        ## inflating the other keys' counts as much.
+        for row, index in zip(self._rows, indexes):
+            if (row[index] < estimate):
+                row[index] = estimate
+
+        return estimate
+
+
+    def estimate(self, key: Hashable) -> int:
+        return min(row[index] for row, index in zip(self._rows, self._get_indexes(key)))
+
+
+    def decay(self):
+        '''Halves every count, so that older activity counts for less than newer activity'''
+
+        for row in self._rows:
+            for index, count in enumerate(row):
+                if (count):
+                    row[index] = count >> 1
+
+
+class TopKCounter:
+    '''
+    Tracks the (approximately) k most frequent keys in a stream, with their counts estimated by a CountMinSketch. The
+    current top k are kept in a min-heap, so each new count only has to be compared against the smallest of them.
+    '''
+
+    def __init__(self, k: int, sketch_width: int = 1024, sketch_depth: int = 4):
+        self.k = max(k, 1)
+        self.sketch = CountMinSketch(sketch_width, sketch_depth)
+        self._counts: dict[Hashable, int] = {}
+        ## (count, key) pairs for the keys in _counts. Entries go stale when a key's count changes or it's evicted, and
+        ## are skipped (or compacted away) rather than being searched for and removed.
+        self._heap: list[tuple[int, Hashable]] = []
+
+    ## Magic Methods
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    ## Methods
+
+    def _pop_stale_entries(self):
+        while (self._heap and self._counts.get(self._heap[0][1]) != self._heap[0][0]):
+            heapq.heappop(self._heap)
+
+
+    def _compact(self):
+        self._heap = [(count, key) for key, count in self._counts.items()]
+        heapq.heapify(self._heap)
+
+
+    def add(self, key: Hashable, count: int = 1) -> int:
+        '''Counts the key, and returns its new estimated count'''
+
+        estimate = self.sketch.add(key, count)
+
+        if (key not in self._counts):
+            if (len(self._counts) >= self.k):
+                self._pop_stale_entries()
+                smallest_count, smallest_key = self._heap[0]
+                if (estimate <= smallest_count):
+                    return estimate
+
+                heapq.heappop(self._heap)
+                del self._counts[smallest_key]
+
+        self._counts[key] = estimate
+        heapq.heappush(self._heap, (estimate, key))
+
+        if (len(self._heap) > 4 * self.k):
+            self._compact()
+
+        return estimate
+
+
+    def estimate(self, key: Hashable) -> int:
+        return self.sketch.estimate(key)
+
+
+    def get_top(self) -> list[tuple[Hashable, int]]:
+        '''Gets the top keys and their estimated counts, most frequent first'''
+
+        return sorted(self._counts.items(), key=lambda item: item[1], reverse=True)
+
+
+    def decay(self):
+        '''Halves every count, so that older activity counts for less than newer activity'''
+
+        self.sketch.decay()
+        self._counts = {key: count >> 1 for key, count in self._counts.items() if count >> 1}
+        self._compact()
@@ -9,6 +9,9 @@ CONFIG_OPTIONS = Configuration.load_config()
 
 
 class MessageParser(Module):
+    ## Matches inline mentions (ex: <@1234567890>, <@!1234567890>, <#1234567890>, or <@&1234567890>), or else bare ids
+    MENTION_REGEX = re.compile(r"<([@#][!&]?)(\d+)>|(\d+)")
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -36,20 +39,6 @@ class MessageParser(Module):
     ):
         """Replaces raw mentions with their human readable version (ex: <@1234567890> -> name OR <@name>)"""
 
-        ## In string, replace instances of discord_id with replacement
-        def replace_id_with_string(string, discord_id, replacement):
-            match = re.search(f"<[@|#][!|&]?({discord_id})>", string)
-            if(match):
-                if (hide_mention_formatting):
-                    start, end = match.span(0)
-                else:
-                    start, end = match.span(1)
-
-                string = string[:start] + replacement + string[end:]
-
-            return string
-
-
         id_mapping = {}
         unique_mention_counter = 0
 
@@ -66,16 +55,29 @@ class MessageParser(Module):
         for role in interaction_data.get("resolved", {}).get("roles", {}).values():
             id_mapping[role["id"]] = f"role{unique_mention_counter}" if anonymize_mentions else role["name"]
 
-        ## Perform the replacement!
-        for discord_id, replacement in id_mapping.items():
+        if (not id_mapping):
+            return message
+
+
+        def replace_match(match: re.Match) -> str:
+            prefix, mention_id, bare_id = match.groups()
+
             ## Replace any inline mentions (ex: <@1234567890>)
-            message = replace_id_with_string(message, discord_id, replacement)
+            if (mention_id is not None):
+                replacement = id_mapping.get(mention_id)
+                if (replacement is None):
+                    return match.group(0)
+
+                return replacement if hide_mention_formatting else f"<{prefix}{replacement}>"
 
             ## Hide any option mentions (ex: 1234567890), as it's almost certainly a 'meta' command.
             ## Todo: improve this, it's kind of janky right now
-            if (hide_meta_mentions):
-                message = message.replace(discord_id, "")
-            else:
-                message = message.replace(discord_id, replacement)
+            replacement = id_mapping.get(bare_id)
+            if (replacement is None):
+                return bare_id
 
-        return message
+            return "" if hide_meta_mentions else replacement
+
+
+        ## Perform the replacement, in a single pass over the message
+        return self.MENTION_REGEX.sub(replace_match, message)
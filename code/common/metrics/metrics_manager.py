@@ -0,0 +1,140 @@
+import logging
+import math
+import threading
+from typing import Callable
+
+from common.configuration import Configuration
+from common.logging import Logging
+from common.metrics.models.counter import Counter
+from common.metrics.models.gauge import Gauge
+from common.metrics.models.histogram import Histogram, HistogramSeries
+from common.metrics.models.metric import Metric
+from common.module.module import Module
+
+## Config & logging
+CONFIG_OPTIONS = Configuration.load_config()
+LOGGER = Logging.initialize_logging(logging.getLogger(__name__))
+
+
+class MetricsManager(Module):
+    """Central registry for the bot's runtime metrics"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.prefix = CONFIG_OPTIONS.get("name", "bot").lower()
+
+        self._lock = threading.Lock()
+        self._metrics: dict[str, Metric] = {}
+        self._collectors: list[Callable[[], None]] = []
+
+    ## Methods
+
+    def _get_or_create(self, cls: type, name: str, description: str, label_names: tuple[str, ...], **kwargs) -> Metric:
+        full_name = f"{self.prefix}_{name}"
+
+        with self._lock:
+            metric = self._metrics.get(full_name)
+            if (metric is None):
+                metric = cls(full_name, description, label_names, **kwargs)
+                self._metrics[full_name] = metric
+            elif (not isinstance(metric, cls) or metric.label_names != tuple(label_names)):
+                raise ValueError(f"Metric '{full_name}' has already been registered with a different type or labels")
+
+        return metric
+
+
+    def counter(self, name: str, description: str, label_names: tuple[str, ...] = ()) -> Counter:
+        '''Gets the counter with the given name, creating it if it doesn't exist yet'''
+
+        return self._get_or_create(Counter, name, description, label_names)
+
+
+    def gauge(self, name: str, description: str, label_names: tuple[str, ...] = ()) -> Gauge:
+        '''Gets the gauge with the given name, creating it if it doesn't exist yet'''
+
+        return self._get_or_create(Gauge, name, description, label_names)
+
+
+    def histogram(self, name: str, description: str, label_names: tuple[str, ...] = (), buckets: tuple[float, ...] = None) -> Histogram:
+        '''Gets the histogram with the given name, creating it if it doesn't exist yet'''
+
+        return self._get_or_create(Histogram, name, description, label_names, buckets=buckets)
+
+
+    def register_collector(self, collector: Callable[[], None]):
+        '''
+        Registers a callable that'll be invoked right before the metrics are exported. This is handy for values that
+        are cheaper to read on demand (ex: queue sizes) than to keep updated constantly.
+        '''
+
+        self._collectors.append(collector)
+
+
+    def unregister_collector(self, collector: Callable[[], None]):
+        if (collector in self._collectors):
+            self._collectors.remove(collector)
+
+
+    def collect(self) -> list[Metric]:
+        '''Runs the registered collectors, and returns all of the metrics sorted by name'''
+
+        for collector in list(self._collectors):
+            try:
+                collector()
+            except Exception as e:
+                LOGGER.exception("Exception while running metrics collector", exc_info=e)
+
+        with self._lock:
+            return [self._metrics[name] for name in sorted(self._metrics.keys())]
+
+
+    def export(self) -> dict:
+        '''Exports all of the metrics into a JSON friendly dict'''
+
+        return {metric.name: metric.to_json() for metric in self.collect()}
+
+
+    def render_prometheus(self) -> str:
+        '''Renders all of the metrics in the Prometheus text exposition format'''
+
+        def format_value(value: float) -> str:
+            if (math.isinf(value)):
+                return "+Inf" if value > 0 else "-Inf"
+            elif (math.isnan(value)):
+                return "NaN"
+
+            return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+        def format_labels(label_names: tuple[str, ...], label_values: tuple, extra_labels: dict = None) -> str:
+            labels = list(zip(label_names, label_values)) + list((extra_labels or {}).items())
+            if (not labels):
+                return ""
+
+            escaped_labels = []
+            for name, value in labels:
+                escaped_value = str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+                escaped_labels.append(f'{name}="{escaped_value}"')
+
+            return "{" + ",".join(escaped_labels) + "}"
+
+
+        lines = []
+        for metric in self.collect():
+            lines.append(f"# HELP {metric.name} {metric.description}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+
+            for label_values, value in sorted(metric.get_series().items()):
+                if (isinstance(value, HistogramSeries)):
+                    for bound, count in zip(value.buckets + (math.inf,), value.get_cumulative_counts()):
+                        labels = format_labels(metric.label_names, label_values, {"le": format_value(bound)})
+                        lines.append(f"{metric.name}_bucket{labels} {count}")
+
+                    labels = format_labels(metric.label_names, label_values)
+                    lines.append(f"{metric.name}_sum{labels} {format_value(value.sum)}")
+                    lines.append(f"{metric.name}_count{labels} {value.count}")
+                else:
+                    lines.append(f"{metric.name}{format_labels(metric.label_names, label_values)} {format_value(value)}")
+
+        return "\n".join(lines) + "\n"
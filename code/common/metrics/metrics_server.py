@@ -0,0 +1,65 @@
+import logging
+
+from aiohttp import web
+
+from common.configuration import Configuration
+from common.logging import Logging
+from common.metrics.metrics_manager import MetricsManager
+
+## Config & logging
+CONFIG_OPTIONS = Configuration.load_config()
+LOGGER = Logging.initialize_logging(logging.getLogger(__name__))
+
+
+class MetricsServer:
+    '''Small embedded HTTP server that exposes the MetricsManager's metrics for Prometheus to scrape'''
+
+    CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+    def __init__(self, metrics_manager: MetricsManager, host: str, port: int, path: str = "/metrics"):
+        self.metrics_manager = metrics_manager
+        self.host = host
+        self.port = port
+        self.path = path
+
+        self._runner: web.AppRunner = None
+
+    ## Properties
+
+    @property
+    def is_running(self) -> bool:
+        return self._runner is not None
+
+    ## Methods
+
+    async def _handle_metrics(self, request: web.Request) -> web.Response:
+        return web.Response(body=self.metrics_manager.render_prometheus().encode("utf-8"), headers={"Content-Type": self.CONTENT_TYPE})
+
+
+    async def start(self):
+        if (self.is_running):
+            return
+
+        app = web.Application()
+        app.router.add_get(self.path, self._handle_metrics)
+
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        try:
+            await web.TCPSite(runner, self.host, self.port).start()
+        except Exception:
+            await runner.cleanup()
+            raise
+
+        self._runner = runner
+        LOGGER.info(f"Serving metrics at http://{self.host}:{self.port}{self.path}")
+
+
+    async def stop(self):
+        if (not self.is_running):
+            return
+
+        await self._runner.cleanup()
+        self._runner = None
+        LOGGER.info("Stopped serving metrics")
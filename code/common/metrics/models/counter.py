@@ -0,0 +1,37 @@
+from common.metrics.models.metric import Metric
+
+
+class Counter(Metric):
+    '''A monotonically increasing value, like the number of times a command has been invoked'''
+
+    ## Properties
+
+    @property
+    def type_name(self) -> str:
+        return "counter"
+
+    ## Methods
+
+    def inc(self, amount: float = 1, **labels):
+        if (amount < 0):
+            raise ValueError(f"Counter '{self.name}' can only be incremented by non-negative amounts")
+
+        label_values = self._build_label_values(labels)
+        with self._lock:
+            self._series[label_values] = self._series.get(label_values, 0) + amount
+
+
+    def get(self, **labels) -> float:
+        with self._lock:
+            return self._series.get(self._build_label_values(labels), 0)
+
+
+    def to_json(self) -> dict:
+        return {
+            "type": self.type_name,
+            "description": self.description,
+            "series": [
+                {"labels": dict(zip(self.label_names, label_values)), "value": value}
+                for label_values, value in self.get_series().items()
+            ]
+        }
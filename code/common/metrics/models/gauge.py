@@ -0,0 +1,44 @@
+from common.metrics.models.metric import Metric
+
+
+class Gauge(Metric):
+    '''A value that can go up and down, like the number of connected voice clients'''
+
+    ## Properties
+
+    @property
+    def type_name(self) -> str:
+        return "gauge"
+
+    ## Methods
+
+    def set(self, value: float, **labels):
+        label_values = self._build_label_values(labels)
+        with self._lock:
+            self._series[label_values] = value
+
+
+    def inc(self, amount: float = 1, **labels):
+        label_values = self._build_label_values(labels)
+        with self._lock:
+            self._series[label_values] = self._series.get(label_values, 0) + amount
+
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+
+    def get(self, **labels) -> float:
+        with self._lock:
+            return self._series.get(self._build_label_values(labels), 0)
+
+
+    def to_json(self) -> dict:
+        return {
+            "type": self.type_name,
+            "description": self.description,
+            "series": [
+                {"labels": dict(zip(self.label_names, label_values)), "value": value}
+                for label_values, value in self.get_series().items()
+            ]
+        }
@@ -0,0 +1,129 @@
+import bisect
+import math
+
+from common.metrics.models.metric import Metric
+
+
+class HistogramSeries:
+    '''The bucketed observations for a single labelled series of a Histogram'''
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        self.bucket_counts = [0] * (len(buckets) + 1)   # The extra bucket holds everything above the last bound (+Inf)
+        self.count = 0
+        self.sum = 0.0
+
+
+    def observe(self, value: float):
+        self.bucket_counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+
+    def copy(self) -> "HistogramSeries":
+        series = HistogramSeries(self.buckets)
+        series.bucket_counts = list(self.bucket_counts)
+        series.count = self.count
+        series.sum = self.sum
+
+        return series
+
+
+    def get_cumulative_counts(self) -> list[int]:
+        cumulative_counts = []
+        running_count = 0
+        for count in self.bucket_counts:
+            running_count += count
+            cumulative_counts.append(running_count)
+
+        return cumulative_counts
+
+
+    def quantile(self, quantile: float) -> float:
+        '''
+        Estimates the given quantile (0.0 - 1.0) by linearly interpolating inside of the bucket that it falls into,
+        which is the same approach that Prometheus' histogram_quantile takes.
+        '''
+
+        if (self.count == 0):
+            return math.nan
+
+        rank = quantile * self.count
+        running_count = 0
+        for index, count in enumerate(self.bucket_counts):
+            if (running_count + count >= rank and count > 0):
+                ## Values above the last bound can't be interpolated, so just report the last bound
+                if (index == len(self.buckets)):
+                    return self.buckets[-1]
+
+                lower_bound = self.buckets[index - 1] if index > 0 else 0.0
+                upper_bound = self.buckets[index]
+
+                return lower_bound + (upper_bound - lower_bound) * ((rank - running_count) / count)
+
+            running_count += count
+
+        return self.buckets[-1]
+
+
+class Histogram(Metric):
+    '''Tracks the distribution of observed values (usually durations in seconds) in a fixed set of buckets'''
+
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+    def __init__(self, name: str, description: str, label_names: tuple[str, ...] = (), buckets: tuple[float, ...] = None):
+        super().__init__(name, description, label_names)
+
+        self.buckets = tuple(sorted(buckets or self.DEFAULT_BUCKETS))
+
+    ## Properties
+
+    @property
+    def type_name(self) -> str:
+        return "histogram"
+
+    ## Methods
+
+    def observe(self, value: float, **labels):
+        label_values = self._build_label_values(labels)
+        with self._lock:
+            series = self._series.get(label_values)
+            if (series is None):
+                series = HistogramSeries(self.buckets)
+                self._series[label_values] = series
+
+            series.observe(value)
+
+
+    def get_series(self) -> dict[tuple, HistogramSeries]:
+        ## Copy the series too, so that they can't be changed out from under the caller
+        with self._lock:
+            return {label_values: series.copy() for label_values, series in self._series.items()}
+
+
+    def get(self, **labels) -> HistogramSeries | None:
+        with self._lock:
+            series = self._series.get(self._build_label_values(labels))
+            return series.copy() if series is not None else None
+
+
+    def to_json(self) -> dict:
+        series_json = []
+        for label_values, series in self.get_series().items():
+            quantiles = {f"p{int(quantile * 100)}": series.quantile(quantile) for quantile in (0.5, 0.9, 0.99)}
+
+            series_json.append({
+                "labels": dict(zip(self.label_names, label_values)),
+                "count": series.count,
+                "sum": series.sum,
+                "buckets": {str(bound): count for bound, count in zip(self.buckets + (math.inf,), series.get_cumulative_counts())},
+                ## NaN isn't valid JSON, so empty quantiles are just left out
+                **{key: value for key, value in quantiles.items() if not math.isnan(value)}
+            })
+
+        return {
+            "type": self.type_name,
+            "description": self.description,
+            "series": series_json
+        }
@@ -0,0 +1,60 @@
+import threading
+from abc import ABCMeta, abstractmethod
+
+
+class Metric(metaclass=ABCMeta):
+    '''
+    Base class for a named metric, optionally split up into labelled series. Values may be updated from the audio
+    player's threads as well as the event loop, so all access to the series goes through a lock.
+    '''
+
+    def __init__(self, name: str, description: str, label_names: tuple[str, ...] = ()):
+        self.name = name
+        self.description = description
+        self.label_names = tuple(label_names)
+
+        self._lock = threading.Lock()
+        self._series: dict[tuple, object] = {}
+
+    ## Properties
+
+    @property
+    @abstractmethod
+    def type_name(self) -> str:
+        raise NotImplementedError(f"The abstract {Metric.type_name.__name__} property hasn't been implemented yet!")
+
+    ## Methods
+
+    def _build_label_values(self, labels: dict) -> tuple:
+        '''Turns the given label kwargs into a tuple of values, ordered to match label_names'''
+
+        if (set(labels.keys()) != set(self.label_names)):
+            raise ValueError(f"Metric '{self.name}' expects labels {self.label_names}, got {tuple(labels.keys())}")
+
+        return tuple(str(labels[name]) for name in self.label_names)
+
+
+    def clear(self):
+        '''Removes all of the series from this metric'''
+
+        with self._lock:
+            self._series = {}
+
+
+    def remove(self, **labels):
+        '''Removes the series matching the given labels, if it exists'''
+
+        with self._lock:
+            self._series.pop(self._build_label_values(labels), None)
+
+
+    def get_series(self) -> dict[tuple, object]:
+        '''Returns a snapshot of the metric's series, keyed by their label values'''
+
+        with self._lock:
+            return dict(self._series)
+
+
+    @abstractmethod
+    def to_json(self) -> dict:
+        return
@@ -0,0 +1,139 @@
+import os
+import math
+import time
+
+from common.metrics.metrics_manager import MetricsManager
+
+from discord import Interaction
+
+
+class PlayLatencyTimeline:
+    '''
+    Records monotonic timestamps for the stages that a single play request passes through, from the interaction being
+    received up until the audio finishes playing.
+    '''
+
+    ## Stages
+    RECEIVED = "received"
+    SOURCE_BUILD_STARTED = "source_build_started"
+    SOURCE_BUILT = "source_built"
+    ENQUEUED = "enqueued"
+    DEQUEUED = "dequeued"
+    CONNECTED = "connected"
+    FIRST_FRAME = "first_frame"
+    FINISHED = "finished"
+
+
+    def __init__(self, play_path: str):
+        self.play_path = play_path
+        self.marks: dict[str, float] = {}
+        self.recorded = False
+
+
+    def mark(self, stage: str, timestamp: float = None):
+        '''Marks the time that the given stage happened at. Only the first mark for each stage is kept.'''
+
+        self.marks.setdefault(stage, timestamp if timestamp is not None else time.perf_counter())
+
+
+    def get_duration(self, start_stage: str | None, end_stage: str) -> float | None:
+        '''
+        Gets the seconds between the start and end stages, or None if either hasn't been marked. A start_stage of None
+        refers to the earliest mark in the timeline.
+        '''
+
+        end = self.marks.get(end_stage)
+        if (end is None):
+            return None
+
+        if (start_stage is None):
+            start = min(self.marks.values())
+        else:
+            start = self.marks.get(start_stage)
+            if (start is None):
+                return None
+
+        return max(end - start, 0.0)
+
+
+class PlayLatencyTracker:
+    '''Aggregates PlayLatencyTimelines into per-stage latency histograms'''
+
+    ## Play paths
+    INTERACTION_PLAY_PATH = "interaction"
+    SIGN_OFF_PLAY_PATH = "sign_off"
+
+    ## Stage names, along with the marks that they span between
+    STAGES = (
+        ("receipt_to_enqueue", PlayLatencyTimeline.RECEIVED, PlayLatencyTimeline.ENQUEUED),
+        ("source_build", PlayLatencyTimeline.SOURCE_BUILD_STARTED, PlayLatencyTimeline.SOURCE_BUILT),
+        ("queue_wait", PlayLatencyTimeline.ENQUEUED, PlayLatencyTimeline.DEQUEUED),
+        ("voice_connect", PlayLatencyTimeline.DEQUEUED, PlayLatencyTimeline.CONNECTED),
+        ("connect_to_first_frame", PlayLatencyTimeline.CONNECTED, PlayLatencyTimeline.FIRST_FRAME),
+        ("playback", PlayLatencyTimeline.FIRST_FRAME, PlayLatencyTimeline.FINISHED),
+        ("total_to_first_frame", None, PlayLatencyTimeline.FIRST_FRAME)
+    )
+
+    ## Playback can run for minutes, so the buckets need to stretch a lot further than the default ones
+    BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+
+    def __init__(self, metrics_manager: MetricsManager):
+        self.histogram = metrics_manager.histogram(
+            "play_latency_seconds",
+            "Seconds spent in each stage of playing audio, from the interaction being received to playback finishing",
+            ("stage", "path"),
+            buckets=self.BUCKETS
+        )
+
+    ## Methods
+
+    def create_timeline(self, play_path: str, interaction: Interaction = None) -> PlayLatencyTimeline:
+        '''Starts a new timeline, backdated to when the interaction was created (if one was provided)'''
+
+        timeline = PlayLatencyTimeline(play_path)
+
+        if (interaction is not None):
+            ## The interaction's creation time comes from its snowflake, so translate it from wall clock time into the
+            ## monotonic clock that the rest of the timeline uses. This also captures the gateway's delivery time.
+            seconds_since_created = max(time.time() - interaction.created_at.timestamp(), 0.0)
+            timeline.mark(PlayLatencyTimeline.RECEIVED, time.perf_counter() - seconds_since_created)
+
+        return timeline
+
+
+    def record(self, timeline: PlayLatencyTimeline | None):
+        '''Observes all of the stages that the given timeline has marks for. Timelines are only recorded once.'''
+
+        if (timeline is None or timeline.recorded):
+            return
+        timeline.recorded = True
+
+        for stage_name, start_stage, end_stage in self.STAGES:
+            duration = timeline.get_duration(start_stage, end_stage)
+            if (duration is not None):
+                self.histogram.observe(duration, stage=stage_name, path=timeline.play_path)
+
+
+    def build_summary(self) -> str:
+        '''Builds a human readable table of the per-stage latencies, for each play path'''
+
+        def format_milliseconds(seconds: float) -> str:
+            return "-" if math.isnan(seconds) else f"{seconds * 1000:.0f}"
+
+
+        series = self.histogram.get_series()
+        if (not series):
+            return "No play latencies have been recorded yet."
+
+        stage_order = {stage_name: index for index, (stage_name, _, _) in enumerate(self.STAGES)}
+        lines = [f"{'path':<12}{'stage':<24}{'count':>7}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}"]
+        for (stage_name, play_path), stage_series in sorted(series.items(), key=lambda item: (item[0][1], stage_order.get(item[0][0], 0))):
+            lines.append(
+                f"{play_path:<12}{stage_name:<24}{stage_series.count:>7}"
+                f"{format_milliseconds(stage_series.quantile(0.5)):>9}"
+                f"{format_milliseconds(stage_series.quantile(0.9)):>9}"
+                f"{format_milliseconds(stage_series.quantile(0.99)):>9}"
+            )
+
+        return os.linesep.join(lines)
@@ -1,38 +1,170 @@
+import logging
 from difflib import SequenceMatcher
+from typing import Callable, Sequence
 
 from common.configuration import Configuration
+from common.logging import Logging
 
-## Config
+## Config & logging
 CONFIG_OPTIONS = Configuration.load_config()
+LOGGER = Logging.initialize_logging(logging.getLogger(__name__))
+
+
+## These live at the module level (rather than inside of StringSimilarity), so that a StringSimilarity instance can be
+## pickled and handed off to a process pool.
+
+def difflib_batch_similarity(query: str, candidates: Sequence[str]) -> list[float]:
+    ## SequenceMatcher caches its analysis of the second sequence, so analyze the query once and reuse it
+    sequence_matcher = SequenceMatcher(None)
+    sequence_matcher.set_seq2(query)
+
+    similarities = []
+    for candidate in candidates:
+        sequence_matcher.set_seq1(candidate)
+        similarities.append(sequence_matcher.ratio())
+
+    return similarities
+
+
+def _jaro_winkler_similarity(query: str, query_positions: dict[str, list[int]], candidate: str) -> float:
+    if (query == candidate):
+        return 1.0
+
+    query_length = len(query)
+    candidate_length = len(candidate)
+    if (query_length == 0 or candidate_length == 0):
+        return 0.0
+
+    match_distance = max(max(query_length, candidate_length) // 2 - 1, 0)
+
+    ## Match each of the candidate's characters to the first unmatched occurrence in the query within the window
+    query_matched = [False] * query_length
+    candidate_matches = []
+    for candidate_index, character in enumerate(candidate):
+        for query_index in query_positions.get(character, ()):
+            if (query_index > candidate_index + match_distance):
+                break
+            if (query_index >= candidate_index - match_distance and not query_matched[query_index]):
+                query_matched[query_index] = True
+                candidate_matches.append(character)
+                break
+
+    matches = len(candidate_matches)
+    if (matches == 0):
+        return 0.0
+
+    query_matches = [character for character, matched in zip(query, query_matched) if matched]
+    transpositions = sum(a != b for a, b in zip(query_matches, candidate_matches)) / 2
+
+    jaro = (matches / query_length + matches / candidate_length + (matches - transpositions) / matches) / 3
+
+    ## Boost strings that share a common prefix (of up to 4 characters)
+    prefix_length = 0
+    for a, b in zip(query[:4], candidate[:4]):
+        if (a != b):
+            break
+        prefix_length += 1
+
+    return jaro + prefix_length * 0.1 * (1 - jaro)
+
+
+def jaro_winkler_batch_similarity(query: str, candidates: Sequence[str]) -> list[float]:
+    ## Index the query's character positions once, rather than scanning the query for every candidate character
+    query_positions: dict[str, list[int]] = {}
+    for index, character in enumerate(query):
+        query_positions.setdefault(character, []).append(index)
+
+    return [_jaro_winkler_similarity(query, query_positions, candidate) for candidate in candidates]
+
+
+def damerau_levenshtein_batch_similarity(query: str, candidates: Sequence[str]) -> list[float]:
+    '''
+    Scores the candidates by their optimal string alignment (restricted Damerau-Levenshtein) distance to the query. This
+    uses Hyyrö's bit-parallel algorithm, where the query is encoded as a set of bit vectors once, and then each
+    candidate is scored in a single pass with a handful of integer operations per character.
+    '''
+
+    query_length = len(query)
+    if (query_length == 0):
+        return [1.0 if len(candidate) == 0 else 0.0 for candidate in candidates]
+
+    ## Bit i of a character's match vector is set if query[i] is that character
+    match_vectors: dict[str, int] = {}
+    for index, character in enumerate(query):
+        match_vectors[character] = match_vectors.get(character, 0) | (1 << index)
+
+    mask = (1 << query_length) - 1
+    last_bit = 1 << (query_length - 1)
+
+    similarities = []
+    for candidate in candidates:
+        positive_vertical = mask
+        negative_vertical = 0
+        diagonal = 0
+        previous_match_vector = 0
+        distance = query_length
+
+        for character in candidate:
+            match_vector = match_vectors.get(character, 0)
+            transposition = (((~diagonal) & match_vector) << 1) & previous_match_vector
+            diagonal = ((((match_vector & positive_vertical) + positive_vertical) ^ positive_vertical) | match_vector | negative_vertical | transposition) & mask
+            positive_horizontal = (negative_vertical | ~(diagonal | positive_vertical)) & mask
+            negative_horizontal = diagonal & positive_vertical
+
+            if (positive_horizontal & last_bit):
+                distance += 1
+            elif (negative_horizontal & last_bit):
+                distance -= 1
+
+            shifted = ((positive_horizontal << 1) | 1) & mask
+            negative_vertical = shifted & diagonal
+            positive_vertical = ((negative_horizontal << 1) | ~(shifted | diagonal)) & mask
+            previous_match_vector = match_vector
+
+        similarities.append(1 - distance / max(query_length, len(candidate)))
+
+    return similarities
 
 
 class StringSimilarity:
     ## https://stackoverflow.com/questions/17388213/find-the-similarity-metric-between-two-strings
     ## https://stackoverflow.com/questions/6690739/fuzzy-string-comparison-in-python-confused-with-which-library-to-use
 
-    @staticmethod
-    def _calcJaroWinkleDistance(stringA, stringB):
-        raise NotImplementedError(
-            "Jaro-Winkle distance calculation hasn't been implemented. Use difflib implementation"
-        )
-
-    @staticmethod
-    def _calcDamerauLevenshteinDistance(stringA, stringB):
-        raise NotImplementedError(
-            "Damerau-Levenshtein distance calculation hasn't been implemented. Use difflib implementation"
-        )
-
-    @staticmethod
-    def _calcDifflibDistance(stringA, stringB):
-        return SequenceMatcher(None, stringA, stringB).ratio()
-
-    @staticmethod
-    def similarity(stringA, stringB):
-        similarity_algorithm = CONFIG_OPTIONS.get("string_similarity_algorithm")
-
-        if (similarity_algorithm == "jaro-winkler"):
-            return StringSimilarity._calcJaroWinkleDistance(stringA, stringB)
-        elif (similarity_algorithm == "damerau–levenshtein"):
-            return StringSimilarity._calcDamerauLevenshteinDistance(stringA, stringB)
-        else:
-            return StringSimilarity._calcDifflibDistance(stringA, stringB)
\ No newline at end of file
+    ## Algorithms
+    DIFFLIB = "difflib"
+    JARO_WINKLER = "jaro-winkler"
+    DAMERAU_LEVENSHTEIN = "damerau-levenshtein"
+
+    BATCH_SIMILARITY_FUNCTIONS: dict[str, Callable[[str, Sequence[str]], list[float]]] = {
+        DIFFLIB: difflib_batch_similarity,
+        JARO_WINKLER: jaro_winkler_batch_similarity,
+        DAMERAU_LEVENSHTEIN: damerau_levenshtein_batch_similarity
+    }
+
+
+    def __init__(self, algorithm: str = None):
+        '''Resolves the similarity algorithm once. If no algorithm is provided, then the configured one will be used.'''
+
+        algorithm = algorithm or CONFIG_OPTIONS.get("string_similarity_algorithm", self.DIFFLIB)
+        ## Older configs spell Damerau–Levenshtein with an en dash
+        algorithm = algorithm.lower().replace("–", "-")
+
+        if (algorithm not in self.BATCH_SIMILARITY_FUNCTIONS):
+            LOGGER.warning(f"Unknown string similarity algorithm '{algorithm}', falling back to {self.DIFFLIB}")
+            algorithm = self.DIFFLIB
+
+        self.algorithm = algorithm
+        self._batch_similarity = self.BATCH_SIMILARITY_FUNCTIONS[algorithm]
+
+    ## Methods
+
+    def similarity(self, stringA: str, stringB: str) -> float:
+        '''Gets the similarity between the two strings, from 0 (nothing alike) to 1 (identical)'''
+
+        return self._batch_similarity(stringA, (stringB,))[0]
+
+
+    def batch_similarity(self, query: str, candidates: Sequence[str]) -> list[float]:
+        '''Gets the similarity between the query and each of the candidates, in the same order as the candidates'''
+
+        return self._batch_similarity(query, candidates)
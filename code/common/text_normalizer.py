@@ -0,0 +1,130 @@
+import re
+import unicodedata
+
+
+class TextNormalizer:
+    '''
+    Normalizes text so that loose spellings of the same thing compare as equal. Text is lowercased, accent folded,
+    stripped of anything that isn't alphanumeric or whitespace, and has its runs of repeated letters collapsed (ex.
+    "yeeeee" => "ye", or "reeeeeboot" => "rebot"). Normalized text can also be reduced to a phonetic key, so that words
+    that sound alike (ex. "fone" and "phone") share the same key.
+    '''
+
+    REPEATED_LETTERS_REGEX = re.compile(r"([^\W\d_])\1+")
+    NON_ALPHANUMERIC_REGEX = re.compile(r"[^\w\s]|_")
+    VOWELS = frozenset("aeiou")
+    FRONT_VOWELS = frozenset("eiy")
+    H_SILENCING_LETTERS = frozenset("cgpst")    # Letters that combine with a following 'h' (ex. "ch", "sh", "th")
+
+    ## Methods
+
+    def fold_accents(self, text: str) -> str:
+        '''Strips the accents from the text's characters (ex. "café" => "cafe")'''
+
+        decomposed = unicodedata.normalize("NFKD", text)
+        return "".join(character for character in decomposed if not unicodedata.combining(character))
+
+
+    def collapse_repeated_letters(self, text: str) -> str:
+        return self.REPEATED_LETTERS_REGEX.sub(r"\1", text)
+
+
+    def normalize(self, text: str) -> str:
+        '''Runs the text through the whole normalization pipeline'''
+
+        text = self.fold_accents(text.lower())
+        text = self.NON_ALPHANUMERIC_REGEX.sub("", text)
+        text = " ".join(text.split())
+
+        return self.collapse_repeated_letters(text)
+
+
+    def _build_word_phonetic_key(self, word: str) -> str:
+        ## A simplified take on the original Metaphone rules, which is plenty for short clip names
+        for prefix in ("kn", "gn", "pn", "ae", "wr"):
+            if (word.startswith(prefix)):
+                word = word[1:]
+                break
+        if (word.startswith("x")):
+            word = "s" + word[1:]
+        elif (word.startswith("wh")):
+            word = "w" + word[2:]
+
+        key = []
+        length = len(word)
+        for index, character in enumerate(word):
+            previous = word[index - 1] if index > 0 else ""
+            following = word[index + 1] if index + 1 < length else ""
+            after_following = word[index + 2] if index + 2 < length else ""
+
+            if (character in self.VOWELS):
+                if (index == 0):
+                    key.append("a")
+            elif (character == "b"):
+                if (not (previous == "m" and following == "")):
+                    key.append("b")
+            elif (character == "c"):
+                if (following == "h" or (following == "i" and after_following == "a")):
+                    key.append("k" if previous == "s" else "x")
+                elif (following in self.FRONT_VOWELS):
+                    if (previous != "s"):
+                        key.append("s")
+                else:
+                    key.append("k")
+            elif (character == "d"):
+                key.append("j" if (following == "g" and after_following in self.FRONT_VOWELS) else "t")
+            elif (character == "g"):
+                if (following == "h" and after_following not in self.VOWELS):
+                    continue
+                if (following == "n" and after_following == ""):
+                    continue
+                if (previous == "d" and following in self.FRONT_VOWELS):
+                    continue
+                key.append("j" if following in self.FRONT_VOWELS else "k")
+            elif (character == "h"):
+                if (previous in self.H_SILENCING_LETTERS):
+                    continue
+                if (previous in self.VOWELS and following not in self.VOWELS):
+                    continue
+                key.append("h")
+            elif (character == "k"):
+                if (previous != "c"):
+                    key.append("k")
+            elif (character == "p"):
+                key.append("f" if following == "h" else "p")
+            elif (character == "q"):
+                key.append("k")
+            elif (character == "s"):
+                if (following == "h" or (following == "i" and after_following in ("o", "a"))):
+                    key.append("x")
+                else:
+                    key.append("s")
+            elif (character == "t"):
+                if (following == "i" and after_following in ("o", "a")):
+                    key.append("x")
+                elif (following == "h"):
+                    key.append("0")
+                elif (not (following == "c" and after_following == "h")):
+                    key.append("t")
+            elif (character == "v"):
+                key.append("f")
+            elif (character in ("w", "y")):
+                if (following in self.VOWELS):
+                    key.append(character)
+            elif (character == "x"):
+                key.append("ks")
+            elif (character == "z"):
+                key.append("s")
+            elif (character.isalpha() and character.isascii()):
+                key.append(character)
+            elif (character.isdigit()):
+                key.append(character)
+
+        ## Different spellings can produce the same letter twice in a row (ex. "ck"), so collapse those as well
+        return self.collapse_repeated_letters("".join(key))
+
+
+    def phonetic_key(self, normalized_text: str) -> str:
+        '''Builds a phonetic key for the (already normalized) text, word by word'''
+
+        return " ".join(filter(None, (self._build_word_phonetic_key(word) for word in normalized_text.split())))
@@ -0,0 +1,79 @@
+import time
+from collections import OrderedDict
+from typing import Hashable
+
+
+class TokenBucketRateLimiter:
+    '''
+    A set of token buckets, one per key. Each bucket holds up to capacity tokens, and refills at a steady rate. Buckets
+    are created on demand, and are forgotten once they've been idle long enough to have completely refilled (since a
+    full bucket is no different from a new one). The number of buckets is also capped, and the least recently used
+    bucket is forgotten early if there's too many.
+    '''
+
+    def __init__(self, capacity: float, refill_per_second: float, max_buckets: int = 10000):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.max_buckets = max(max_buckets, 1)
+        self._buckets: OrderedDict[Hashable, list[float]] = OrderedDict()    # key -> [tokens, updated at]
+
+    ## Magic Methods
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    ## Methods
+
+    def _expire_idle_buckets(self, now: float):
+        ## Buckets are ordered by last use, so stop at the first one that hasn't refilled yet
+        while (self._buckets):
+            tokens, updated_at = next(iter(self._buckets.values()))
+            if (tokens + (now - updated_at) * self.refill_per_second < self.capacity):
+                break
+
+            self._buckets.popitem(last=False)
+
+
+    def _get_tokens(self, key: Hashable, now: float) -> float:
+        bucket = self._buckets.get(key)
+        if (bucket is None):
+            return self.capacity
+
+        tokens, updated_at = bucket
+        return min(self.capacity, tokens + (now - updated_at) * self.refill_per_second)
+
+
+    def get_retry_after(self, key: Hashable, cost: float = 1) -> float:
+        '''Gets the number of seconds until the key's bucket will have enough tokens, or 0 if it already does'''
+
+        missing = cost - self._get_tokens(key, time.monotonic())
+        if (missing <= 0):
+            return 0.0
+        if (self.refill_per_second <= 0):
+            return float("inf")
+
+        return missing / self.refill_per_second
+
+
+    def consume(self, key: Hashable, cost: float = 1):
+        '''Takes tokens from the key's bucket, whether or not it has enough of them'''
+
+        now = time.monotonic()
+        tokens = self._get_tokens(key, now) - cost
+
+        self._buckets[key] = [tokens, now]
+        self._buckets.move_to_end(key)
+
+        self._expire_idle_buckets(now)
+        while (len(self._buckets) > self.max_buckets):
+            self._buckets.popitem(last=False)
+
+
+    def try_acquire(self, key: Hashable, cost: float = 1) -> bool:
+        '''Takes tokens from the key's bucket if it has enough of them, and returns whether or not it did'''
+
+        if (self.get_retry_after(key, cost) > 0):
+            return False
+
+        self.consume(key, cost)
+        return True
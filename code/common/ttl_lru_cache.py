@@ -0,0 +1,54 @@
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+
+class TtlLruCache:
+    '''
+    A size bounded, least recently used cache, whose entries also expire after a time to live. Not thread safe, it's
+    meant to be used from the event loop.
+    '''
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max(max_size, 0)
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()    # key -> (expiry time, value)
+
+    ## Magic Methods
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    ## Methods
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        '''Gets the value for the key (and marks it as recently used), or the default if it's missing or expired'''
+
+        entry = self._entries.get(key)
+        if (entry is None):
+            return default
+
+        expires_at, value = entry
+        if (expires_at <= time.monotonic()):
+            del self._entries[key]
+            return default
+
+        self._entries.move_to_end(key)
+        return value
+
+
+    def set(self, key: Hashable, value: Any):
+        '''Stores the value for the key, evicting the least recently used entry if the cache is full'''
+
+        if (self.max_size == 0):
+            return
+
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+
+        while (len(self._entries) > self.max_size):
+            self._entries.popitem(last=False)
+
+
+    def clear(self):
+        self._entries.clear()
@@ -23,8 +23,14 @@ def load_json(path: Path) -> dict:
 
 
 def save_json(path: Path, data: dict):
-    with open(path, 'w') as fd:
+    ## Write to a temporary file and swap it in, so a crash mid-write can't leave a truncated file behind
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w') as fd:
         json.dump(data, fd)
+        fd.flush()
+        os.fsync(fd.fileno())
+
+    os.replace(temp_path, path)
 
 
 def is_linux():
@@ -1,12 +1,16 @@
+import io
+import json
 import logging
 
 from clipster import Clipster
 from common.configuration import Configuration
 from common.database.database_manager import DatabaseManager
 from common.logging import Logging
+from common.metrics.metrics_manager import MetricsManager
 from common.module.module import Cog
 from common.module.module_initialization_container import ModuleInitializationContainer
 
+import discord
 from discord.ext import commands
 from discord.ext.commands import Bot, Context, errors
 
@@ -28,6 +32,8 @@ class AdminCog(Cog):
 
         self.database_manager: DatabaseManager = kwargs.get('dependencies', {}).get('DatabaseManager')
         assert (self.database_manager is not None)
+        self.metrics_manager: MetricsManager = kwargs.get('dependencies', {}).get('MetricsManager')
+        assert (self.metrics_manager is not None)
 
         self.admins = CONFIG_OPTIONS.get(self.ADMINS_KEY, [])
         self.announce_updates = CONFIG_OPTIONS.get(self.ANNOUNCE_UPDATES_KEY, False)
@@ -95,6 +101,16 @@ class AdminCog(Cog):
         return (count >= 0)
 
 
+    @admin.command()
+    async def export_metrics(self, ctx: Context):
+        """Exports the bot's runtime metrics as a JSON file"""
+
+        await self.database_manager.store(ctx)
+
+        metrics_json = json.dumps(self.metrics_manager.export(), indent=4)
+        await ctx.reply(file=discord.File(io.BytesIO(metrics_json.encode("utf-8")), filename="metrics.json"))
+
+
     async def cog_command_error(self, ctx: Context, error: Exception) -> None:
         if (isinstance(error, errors.NotOwner)):
             await self.database_manager.store(ctx, valid=False)
@@ -7,6 +7,8 @@ from functools import reduce
 from common.audio_player import AudioPlayer
 from common.configuration import Configuration
 from common.database.database_manager import DatabaseManager
+from common.exceptions import ExecutorPoolFullException
+from common.executor_pool import ExecutorPool
 from common.logging import Logging
 from common.module.module import Cog
 from common.ui.component_factory import ComponentFactory
@@ -41,6 +43,8 @@ class HelpCog(Cog):
         assert(self.component_factory is not None)
         self.database_manager: DatabaseManager = kwargs.get('dependencies', {}).get('DatabaseManager')
         assert (self.database_manager is not None)
+        self.executor_pool: ExecutorPool = kwargs.get('dependencies', {}).get('ExecutorPool')
+        assert (self.executor_pool is not None)
 
         self.name = CONFIG_OPTIONS.get("name", "help").capitalize()
         self.version = CONFIG_OPTIONS.get("version", "1.0.0")
@@ -53,9 +57,9 @@ class HelpCog(Cog):
         ## Similar to the cog_command_tree, but with a focus on commands and grouping
         self.command_tree = self.build_command_tree(self.cog_command_tree)
 
-        ## Ensure the clip groups get added to the clips
-        for clip in self.clips_cog.clip_groups.values():
-            self.command_tree[1][self.clips_cog.__class__.__name__.lower()][clip.key] = clip
+        ## Ensure the clip groups get added to the clips, and kept up to date as they're (re)loaded in the background
+        self.refresh_clip_groups()
+        self.clips_cog.clip_groups_changed_listeners.append(self.refresh_clip_groups)
 
 
         ## Add the help command
@@ -79,8 +83,31 @@ class HelpCog(Cog):
         self.cog_command_tree[HelpCog.__name__] = {self.help_command.name: self.help_command}
         self.command_tree[0][self.help_command.name] = self.help_command
 
+    ## Lifecycle
+
+    async def cog_unload(self):
+        await super().cog_unload()
+
+        if (self.refresh_clip_groups in self.clips_cog.clip_groups_changed_listeners):
+            self.clips_cog.clip_groups_changed_listeners.remove(self.refresh_clip_groups)
+
     ## Methods
 
+    def refresh_clip_groups(self):
+        """Replaces the clip groups in the command tree with the clips cog's current clip groups"""
+
+        clips_command_map = self.command_tree[1].get(self.clips_cog.__class__.__name__.lower())
+        if (clips_command_map is None):
+            return
+
+        for key, item in list(clips_command_map.items()):
+            if (isinstance(item, ClipGroup)):
+                del clips_command_map[key]
+
+        for clip_group in self.clips_cog.clip_groups.values():
+            clips_command_map[clip_group.key] = clip_group
+
+
     def build_cog_command_tree(self) -> dict[str, dict[str, app_commands.Command]]:
         result = {}
 
@@ -241,10 +268,10 @@ class HelpCog(Cog):
     def build_clips_help_embed(self, clip_group: ClipGroup, limit: int = None) -> Embed:
         clip_groups: set[ClipGroup] = set(self.clips_cog.clip_groups.values())
         if (limit is None):
-            clip_groups.remove(clip_group)
-        clips = list(clip_group.clips.values())
-        random.shuffle(clips)
-        clips = clips[:limit]
+            clip_groups.discard(clip_group)
+        ## Only sample as many clips as will be shown, rather than shuffling the whole group
+        clips = clip_group.clips
+        clips = random.sample(clips, len(clips) if limit is None else min(limit, len(clips)))
 
         clip_signatures = {clip.name: self.clips_cog.build_clip_command_string(clip) for clip in clips}
         longest_clip_length = reduce(lambda length, clip: max(length, len(clip)), clip_signatures.values(), 0)
@@ -390,7 +417,13 @@ class HelpCog(Cog):
             if (isinstance(target_subcommand, app_commands.Command)):
                 embeds = [self.build_command_help_embed(target_subcommand)]
             else:
-                embeds = [self.build_clips_help_embed(target_subcommand)]
+                ## A full clip group listing can get big, so build it off of the event loop
+                try:
+                    embeds = [await self.executor_pool.run_in_thread("help_clips_embed", self.build_clips_help_embed, target_subcommand)]
+                except ExecutorPoolFullException:
+                    await self.database_manager.store(interaction, valid=False)
+                    await interaction.response.send_message(f"Sorry <@{interaction.user.id}>, I'm a bit busy right now. Try again in a moment.", ephemeral=True)
+                    return
 
             await self.database_manager.store(interaction)
             await interaction.response.send_message(embeds=embeds, ephemeral=True)
@@ -402,7 +435,13 @@ class HelpCog(Cog):
             return
 
         else:
+            try:
+                embeds = await self.executor_pool.run_in_thread("help_embeds", self.build_help_embeds)
+            except ExecutorPoolFullException:
+                await self.database_manager.store(interaction, valid=False)
+                await interaction.response.send_message(f"Sorry <@{interaction.user.id}>, I'm a bit busy right now. Try again in a moment.", ephemeral=True)
+                return
+
             await self.database_manager.store(interaction)
-            embeds = self.build_help_embeds()
             await interaction.response.send_message(embeds=embeds)
             return
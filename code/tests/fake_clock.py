@@ -0,0 +1,9 @@
+class FakeClock:
+    '''Stands in for the time module, so tests can move time.monotonic() forwards by hand'''
+
+    def __init__(self):
+        self.now = 1000.0
+
+
+    def monotonic(self) -> float:
+        return self.now
@@ -0,0 +1,47 @@
+import random
+import unittest
+from collections import Counter
+
+from common.alias_sampler import AliasSampler
+
+
+class TestAliasSampler(unittest.TestCase):
+    def sample_frequencies(self, weights: list[float], samples: int = 100000) -> list[float]:
+        rng = random.Random(1234)
+        sampler = AliasSampler(weights)
+        counts = Counter(sampler.sample(rng) for _ in range(samples))
+
+        return [counts[index] / samples for index in range(len(weights))]
+
+
+    def test_matches_the_weights(self):
+        weights = [1, 2, 3, 4]
+        frequencies = self.sample_frequencies(weights)
+
+        for weight, frequency in zip(weights, frequencies):
+            self.assertAlmostEqual(frequency, weight / sum(weights), delta=0.01)
+
+
+    def test_zero_weights_are_never_sampled(self):
+        frequencies = self.sample_frequencies([0, 1, 0, 1], 10000)
+
+        self.assertEqual(frequencies[0], 0)
+        self.assertEqual(frequencies[2], 0)
+
+
+    def test_single_weight(self):
+        sampler = AliasSampler([0.5])
+
+        self.assertEqual(len(sampler), 1)
+        self.assertEqual({sampler.sample(random.Random(index)) for index in range(100)}, {0})
+
+
+    def test_invalid_weights(self):
+        for weights in ([], [0, 0], [1, -1]):
+            with self.subTest(weights=weights):
+                with self.assertRaises(ValueError):
+                    AliasSampler(weights)
+
+
+if (__name__ == '__main__'):
+    unittest.main()
@@ -0,0 +1,124 @@
+import asyncio
+import tempfile
+import unittest
+from pathlib import Path
+
+from common.delete_request_journal import DeleteRequestJournal
+
+
+class TestDeleteRequestJournal(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = Path(self.directory.name) / "delete_requests.txt"
+
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+
+    def build_journal(self) -> DeleteRequestJournal:
+        journal = DeleteRequestJournal(self.path)
+        journal.load()
+
+        return journal
+
+    ## Loading
+
+    def test_load_missing_journal(self):
+        self.assertEqual(DeleteRequestJournal(self.path).load(), set())
+        self.assertEqual(self.path.read_bytes(), DeleteRequestJournal.MAGIC)
+
+
+    def test_load_converts_plain_text_queue(self):
+        self.path.write_text("123\n456\n\n123\n")
+
+        self.assertEqual(DeleteRequestJournal(self.path).load(), {123, 456})
+        self.assertTrue(self.path.read_bytes().startswith(DeleteRequestJournal.MAGIC))
+        self.assertEqual(DeleteRequestJournal(self.path).load(), {123, 456})
+
+    ## Appending
+
+    async def test_add_and_remove_are_replayed(self):
+        journal = self.build_journal()
+        await journal.add(1)
+        await journal.add(2)
+        await journal.add(3)
+        await journal.remove([2, 4])
+
+        self.assertEqual(DeleteRequestJournal(self.path).load(), {1, 3})
+
+
+    async def test_concurrent_adds_are_all_written(self):
+        journal = self.build_journal()
+        await asyncio.gather(*(journal.add(user_id) for user_id in range(100)))
+
+        self.assertEqual(DeleteRequestJournal(self.path).load(), set(range(100)))
+
+
+    async def test_compact_keeps_only_the_given_ids(self):
+        journal = self.build_journal()
+        for user_id in range(10):
+            await journal.add(user_id)
+        await journal.compact({7, 8})
+
+        self.assertEqual(DeleteRequestJournal(self.path).load(), {7, 8})
+        record_size = DeleteRequestJournal.RECORD_HEADER.size + DeleteRequestJournal.PAYLOAD.size
+        self.assertEqual(self.path.stat().st_size, len(DeleteRequestJournal.MAGIC) + 2 * record_size)
+
+    ## Recovery
+
+    async def test_torn_tail_is_dropped(self):
+        journal = self.build_journal()
+        await journal.add(1)
+        await journal.add(2)
+        intact_size = self.path.stat().st_size
+
+        ## Simulate a crash part way through appending a record
+        torn_record = journal._encode(DeleteRequestJournal.ADD, 3)[:-4]
+        with open(self.path, 'ab') as fd:
+            fd.write(torn_record)
+
+        self.assertEqual(DeleteRequestJournal(self.path).load(), {1, 2})
+        self.assertEqual(self.path.stat().st_size, intact_size)
+
+
+    async def test_appends_after_recovery_are_kept(self):
+        journal = self.build_journal()
+        await journal.add(1)
+        with open(self.path, 'ab') as fd:
+            fd.write(b"\x00\x00")
+
+        journal = self.build_journal()
+        await journal.add(2)
+
+        self.assertEqual(DeleteRequestJournal(self.path).load(), {1, 2})
+
+
+    async def test_corrupt_record_drops_it_and_everything_after(self):
+        journal = self.build_journal()
+        await journal.add(1)
+        await journal.add(2)
+        await journal.add(3)
+
+        ## Flip a bit in the second record's payload, so its checksum no longer matches
+        data = bytearray(self.path.read_bytes())
+        record_size = DeleteRequestJournal.RECORD_HEADER.size + DeleteRequestJournal.PAYLOAD.size
+        data[len(DeleteRequestJournal.MAGIC) + record_size + DeleteRequestJournal.RECORD_HEADER.size + 1] ^= 0x01
+        self.path.write_bytes(bytes(data))
+
+        self.assertEqual(DeleteRequestJournal(self.path).load(), {1})
+
+
+    async def test_removals_are_not_lost_to_recovery(self):
+        journal = self.build_journal()
+        await journal.add(1)
+        await journal.add(2)
+        await journal.remove([1])
+        with open(self.path, 'ab') as fd:
+            fd.write(b"\xff")
+
+        self.assertEqual(DeleteRequestJournal(self.path).load(), {2})
+
+
+if (__name__ == '__main__'):
+    unittest.main()
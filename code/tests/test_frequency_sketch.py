@@ -0,0 +1,87 @@
+import random
+import unittest
+from collections import Counter
+
+from common.frequency_sketch import CountMinSketch, TopKCounter
+
+
+class TestCountMinSketch(unittest.TestCase):
+    def test_estimates_never_undercount(self):
+        rng = random.Random(42)
+        sketch = CountMinSketch(width=32, depth=3)
+        counts = Counter(rng.randrange(200) for _ in range(5000))
+        for key, count in counts.items():
+            sketch.add(key, count)
+
+        for key, count in counts.items():
+            self.assertGreaterEqual(sketch.estimate(key), count)
+
+
+    def test_exact_without_collisions(self):
+        sketch = CountMinSketch(width=4096, depth=4)
+        for _ in range(5):
+            sketch.add("a")
+        sketch.add("b", 2)
+
+        self.assertEqual(sketch.estimate("a"), 5)
+        self.assertEqual(sketch.estimate("b"), 2)
+        self.assertEqual(sketch.estimate("c"), 0)
+
+
+    def test_decay_halves_counts(self):
+        sketch = CountMinSketch(width=4096, depth=4)
+        sketch.add("a", 9)
+        sketch.decay()
+
+        self.assertEqual(sketch.estimate("a"), 4)
+
+
+    def test_counts_saturate(self):
+        sketch = CountMinSketch(width=16, depth=2)
+        sketch.add("a", CountMinSketch.MAX_COUNT)
+        sketch.add("a", 10)
+
+        self.assertEqual(sketch.estimate("a"), CountMinSketch.MAX_COUNT)
+
+
+class TestTopKCounter(unittest.TestCase):
+    def test_finds_the_heavy_hitters(self):
+        rng = random.Random(7)
+        counter = TopKCounter(3)
+        stream = ["a"] * 300 + ["b"] * 200 + ["c"] * 100 + [f"noise{index}" for index in range(500)]
+        rng.shuffle(stream)
+        for key in stream:
+            counter.add(key)
+
+        self.assertEqual([key for key, _ in counter.get_top()], ["a", "b", "c"])
+
+
+    def test_keeps_at_most_k_keys(self):
+        counter = TopKCounter(2)
+        for key in ("a", "a", "b", "c", "c", "c"):
+            counter.add(key)
+
+        self.assertEqual(len(counter), 2)
+        self.assertEqual(counter.get_top()[0], ("c", 3))
+
+
+    def test_decay_drops_keys_that_reach_zero(self):
+        counter = TopKCounter(3)
+        counter.add("a", 4)
+        counter.add("b")
+        counter.decay()
+
+        self.assertEqual(counter.get_top(), [("a", 2)])
+
+
+    def test_heap_stays_bounded(self):
+        counter = TopKCounter(2)
+        for _ in range(100):
+            counter.add("a")
+            counter.add("b")
+
+        self.assertLessEqual(len(counter._heap), 4 * counter.k + 1)
+
+
+if (__name__ == '__main__'):
+    unittest.main()
@@ -0,0 +1,226 @@
+import datetime
+import json
+import tempfile
+import types
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from common.cogs import privacy_management_cog
+from common.cogs.privacy_management_cog import PrivacyManagementCog
+from common.delete_request_journal import DeleteRequestJournal
+from common.metrics.metrics_manager import MetricsManager
+
+
+class FakeDatetime(datetime.datetime):
+    '''A datetime whose now() is set by hand'''
+
+    current = datetime.datetime(2026, 10, 21, 12, 0, tzinfo=datetime.timezone.utc)     ## A Wednesday
+
+    @classmethod
+    def now(cls, tz=None):
+        return cls.current
+
+
+class FakeDatabaseManager:
+    '''Holds a table of documents in memory, and scans it a page at a time like DynamoDB would'''
+
+    def __init__(self, documents: list[dict]):
+        self.documents = documents
+        self.start_keys = []
+
+
+    async def store(self, *args, **kwargs):
+        pass
+
+
+    async def get_detailed_item_count(self) -> int:
+        return len(self.documents)
+
+
+    async def delete_users_page(self, user_ids: set[int], start_key: dict = None, page_size: int = None) -> tuple[int, dict]:
+        self.start_keys.append(start_key)
+
+        start = start_key['index'] if start_key else 0
+        page = self.documents[start:start + page_size]
+        deleted = [document for document in page if document['user_id'] in user_ids and not document.get('deleted')]
+        for document in deleted:
+            document['deleted'] = True
+
+        end = start + page_size
+        return len(deleted), ({'index': end} if end < len(self.documents) else None)
+
+
+class TestPrivacyManagementCog(unittest.IsolatedAsyncioTestCase):
+    ## Monday at midnight
+    SCHEDULE = {'delete_request_weekday_to_process': 0, 'delete_request_time_to_process': "T00:00:00Z"}
+
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.journal_path = Path(self.directory.name) / "delete_requests.txt"
+        self.meta_path = Path(self.directory.name) / "meta.json"
+
+        FakeDatetime.current = datetime.datetime(2026, 10, 21, 12, 0, tzinfo=datetime.timezone.utc)
+        fake_datetime_module = types.SimpleNamespace(
+            datetime=FakeDatetime,
+            timedelta=datetime.timedelta,
+            timezone=datetime.timezone
+        )
+        patcher = patch.object(privacy_management_cog, "datetime", fake_datetime_module)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.database_manager = FakeDatabaseManager([{'user_id': index % 10} for index in range(23)])
+
+
+    def build_cog(self, **config) -> PrivacyManagementCog:
+        config = {
+            'privacy_policy_url': None,
+            'delete_request_queue_file_path': str(self.journal_path),
+            'delete_request_meta_file_path': str(self.meta_path),
+            'delete_request_scan_page_size': 5,
+            'delete_request_scan_interval_seconds': 10,
+            'delete_request_scan_max_pages': 3,
+            **self.SCHEDULE,
+            **config
+        }
+
+        with patch.dict(privacy_management_cog.CONFIG_OPTIONS, config):
+            return PrivacyManagementCog(MagicMock(), dependencies={
+                'ComponentFactory': MagicMock(),
+                'DatabaseManager': self.database_manager,
+                'MetricsManager': MetricsManager()
+            })
+
+
+    def set_last_process_time(self, cog: PrivacyManagementCog, last_process_time: datetime.datetime):
+        cog.metadata['last_process_time'] = str(last_process_time)
+
+    ## Deadline
+
+    def test_due_when_never_processed(self):
+        self.assertEqual(self.build_cog().get_seconds_until_process_delete_request_queue_is_due(), 0)
+
+
+    def test_not_due_when_processed_since_the_last_scheduled_time(self):
+        cog = self.build_cog()
+        self.set_last_process_time(cog, datetime.datetime(2026, 10, 19, 1, 0, tzinfo=datetime.timezone.utc))
+
+        ## Wednesday noon until the next Monday at midnight
+        self.assertEqual(cog.get_seconds_until_process_delete_request_queue_is_due(), (4 * 24 + 12) * 60 * 60)
+
+
+    def test_due_when_not_processed_since_the_last_scheduled_time(self):
+        cog = self.build_cog()
+        self.set_last_process_time(cog, datetime.datetime(2026, 10, 18, 23, 0, tzinfo=datetime.timezone.utc))
+
+        self.assertEqual(cog.get_seconds_until_process_delete_request_queue_is_due(), 0)
+
+
+    def test_scheduled_weekday_after_the_scheduled_time(self):
+        FakeDatetime.current = datetime.datetime(2026, 10, 19, 18, 0, tzinfo=datetime.timezone.utc)
+        cog = self.build_cog()
+
+        self.set_last_process_time(cog, datetime.datetime(2026, 10, 19, 0, 30, tzinfo=datetime.timezone.utc))
+        self.assertEqual(cog.get_seconds_until_process_delete_request_queue_is_due(), (6 * 24 + 6) * 60 * 60)
+
+        self.set_last_process_time(cog, datetime.datetime(2026, 10, 18, 12, 0, tzinfo=datetime.timezone.utc))
+        self.assertEqual(cog.get_seconds_until_process_delete_request_queue_is_due(), 0)
+
+
+    def test_scheduled_weekday_before_the_scheduled_time(self):
+        FakeDatetime.current = datetime.datetime(2026, 10, 19, 6, 0, tzinfo=datetime.timezone.utc)
+        cog = self.build_cog(delete_request_time_to_process="T12:00:00Z")
+
+        ## Processed after last week's scheduled time, so it's due at noon today
+        self.set_last_process_time(cog, datetime.datetime(2026, 10, 12, 13, 0, tzinfo=datetime.timezone.utc))
+        self.assertEqual(cog.get_seconds_until_process_delete_request_queue_is_due(), 6 * 60 * 60)
+
+        self.set_last_process_time(cog, datetime.datetime(2026, 10, 12, 11, 0, tzinfo=datetime.timezone.utc))
+        self.assertEqual(cog.get_seconds_until_process_delete_request_queue_is_due(), 0)
+
+    ## Pacing
+
+    def test_scans_a_page_per_interval_when_there_is_time(self):
+        cog = self.build_cog()
+        self.set_last_process_time(cog, datetime.datetime(2026, 10, 19, 1, 0, tzinfo=datetime.timezone.utc))
+
+        delete_pass = cog.start_delete_pass(100000)
+        self.assertEqual(cog.get_delete_request_scan_pages_per_interval(delete_pass), 1)
+
+
+    def test_scan_rate_rises_to_meet_the_deadline(self):
+        FakeDatetime.current = datetime.datetime(2026, 10, 25, 23, 59, 30, tzinfo=datetime.timezone.utc)
+        cog = self.build_cog()
+        self.set_last_process_time(cog, datetime.datetime(2026, 10, 19, 1, 0, tzinfo=datetime.timezone.utc))
+
+        ## 30 seconds (3 intervals) left to scan 5 pages
+        delete_pass = cog.start_delete_pass(25)
+        self.assertEqual(cog.get_delete_request_scan_pages_per_interval(delete_pass), 2)
+
+
+    def test_scan_rate_is_capped_when_overdue(self):
+        cog = self.build_cog()
+
+        delete_pass = cog.start_delete_pass(100000)
+        self.assertEqual(cog.get_delete_request_scan_pages_per_interval(delete_pass), 3)
+
+    ## Delete passes
+
+    async def test_pass_checkpoints_and_resumes(self):
+        cog = self.build_cog()
+        self.set_last_process_time(cog, datetime.datetime(2026, 10, 19, 1, 0, tzinfo=datetime.timezone.utc))
+        for user_id in (1, 3):
+            await cog.store_user_id_for_batch_delete(user_id)
+
+        await cog.process_delete_request_scan_pages()
+        self.assertEqual(self.database_manager.start_keys, [None])
+        self.assertEqual(json.loads(self.meta_path.read_text())['delete_pass']['start_key'], {'index': 5})
+
+        ## A restarted cog picks the pass up from its checkpoint, and requests made since then wait for the next pass
+        cog = self.build_cog()
+        await cog.store_user_id_for_batch_delete(7)
+        for _ in range(4):
+            await cog.process_delete_request_scan_pages()
+
+        self.assertEqual(self.database_manager.start_keys, [None] + [{'index': index} for index in range(5, 25, 5)])
+        self.assertEqual({document['user_id'] for document in self.database_manager.documents if document.get('deleted')}, {1, 3})
+        self.assertEqual(cog.queued_user_ids, {7})
+        self.assertEqual(DeleteRequestJournal(self.journal_path).load(), {7})
+
+        metadata = json.loads(self.meta_path.read_text())
+        self.assertNotIn('delete_pass', metadata)
+        self.assertEqual(metadata['last_process_time'], str(FakeDatetime.current))
+
+
+    async def test_pass_compacts_the_journal_while_requests_are_queued(self):
+        cog = self.build_cog()
+        self.set_last_process_time(cog, datetime.datetime(2026, 10, 19, 1, 0, tzinfo=datetime.timezone.utc))
+        await cog.store_user_id_for_batch_delete(1)
+        await cog.process_delete_request_scan_pages()
+        await cog.store_user_id_for_batch_delete(2)
+        for _ in range(4):
+            await cog.process_delete_request_scan_pages()
+
+        ## Only the still queued request's record is left behind
+        journal = cog.delete_request_journal
+        self.assertEqual(self.journal_path.read_bytes(), journal.MAGIC + journal._encode(journal.ADD, 2))
+
+
+    async def test_empty_queue_only_records_the_process_time_when_due(self):
+        cog = self.build_cog()
+        self.set_last_process_time(cog, datetime.datetime(2026, 10, 19, 1, 0, tzinfo=datetime.timezone.utc))
+
+        await cog.process_delete_request_scan_pages()
+        self.assertFalse(self.meta_path.read_text())
+
+        self.set_last_process_time(cog, datetime.datetime(2026, 10, 18, 1, 0, tzinfo=datetime.timezone.utc))
+        await cog.process_delete_request_scan_pages()
+        self.assertEqual(json.loads(self.meta_path.read_text())['last_process_time'], str(FakeDatetime.current))
+        self.assertEqual(self.database_manager.start_keys, [])
+
+
+if (__name__ == '__main__'):
+    unittest.main()
@@ -0,0 +1,91 @@
+import random
+import unittest
+
+from common.string_similarity import (
+    StringSimilarity,
+    damerau_levenshtein_batch_similarity,
+    difflib_batch_similarity,
+    jaro_winkler_batch_similarity
+)
+
+
+def optimal_string_alignment_distance(a: str, b: str) -> int:
+    '''The textbook dynamic programming version of the restricted Damerau-Levenshtein distance, for reference'''
+
+    distances = [[0] * (len(b) + 1) for _ in range(len(a) + 1)]
+    for i in range(len(a) + 1):
+        distances[i][0] = i
+    for j in range(len(b) + 1):
+        distances[0][j] = j
+
+    for i in range(1, len(a) + 1):
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            distances[i][j] = min(distances[i - 1][j] + 1, distances[i][j - 1] + 1, distances[i - 1][j - 1] + cost)
+            if (i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                distances[i][j] = min(distances[i][j], distances[i - 2][j - 2] + 1)
+
+    return distances[len(a)][len(b)]
+
+
+class TestJaroWinkler(unittest.TestCase):
+    def test_known_values(self):
+        for query, candidate, expected in (
+                ("martha", "marhta", 0.961),
+                ("dwayne", "duane", 0.84),
+                ("dixon", "dicksonx", 0.813)
+        ):
+            with self.subTest(query=query, candidate=candidate):
+                self.assertAlmostEqual(jaro_winkler_batch_similarity(query, [candidate])[0], expected, places=3)
+
+
+    def test_identical_and_disjoint(self):
+        self.assertEqual(jaro_winkler_batch_similarity("abc", ["abc", "xyz", ""]), [1.0, 0.0, 0.0])
+
+
+class TestDamerauLevenshtein(unittest.TestCase):
+    def test_transposition_costs_one(self):
+        self.assertAlmostEqual(damerau_levenshtein_batch_similarity("abcd", ["abdc"])[0], 0.75)
+
+
+    def test_matches_the_reference_implementation(self):
+        rng = random.Random(99)
+        for _ in range(300):
+            query = "".join(rng.choice("abcd") for _ in range(rng.randrange(1, 12)))
+            candidate = "".join(rng.choice("abcd") for _ in range(rng.randrange(0, 12)))
+
+            expected = 1 - optimal_string_alignment_distance(query, candidate) / max(len(query), len(candidate))
+            with self.subTest(query=query, candidate=candidate):
+                self.assertAlmostEqual(damerau_levenshtein_batch_similarity(query, [candidate])[0], expected)
+
+
+    def test_empty_query(self):
+        self.assertEqual(damerau_levenshtein_batch_similarity("", ["", "a"]), [1.0, 0.0])
+
+
+class TestStringSimilarity(unittest.TestCase):
+    def test_batch_matches_single(self):
+        candidates = ["hello", "help", "yellow", ""]
+        for algorithm in StringSimilarity.BATCH_SIMILARITY_FUNCTIONS:
+            string_similarity = StringSimilarity(algorithm)
+            with self.subTest(algorithm=algorithm):
+                self.assertEqual(
+                    string_similarity.batch_similarity("hello", candidates),
+                    [string_similarity.similarity("hello", candidate) for candidate in candidates]
+                )
+
+
+    def test_difflib_reuses_the_query(self):
+        self.assertEqual(difflib_batch_similarity("abc", ["abc", "abd"]), [1.0, 2 / 3])
+
+
+    def test_algorithm_names_are_normalized(self):
+        self.assertEqual(StringSimilarity("Damerau–Levenshtein").algorithm, StringSimilarity.DAMERAU_LEVENSHTEIN)
+
+
+    def test_unknown_algorithm_falls_back_to_difflib(self):
+        self.assertEqual(StringSimilarity("nope").algorithm, StringSimilarity.DIFFLIB)
+
+
+if (__name__ == '__main__'):
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+
+from common.text_normalizer import TextNormalizer
+
+
+class TestTextNormalizer(unittest.TestCase):
+    def setUp(self):
+        self.text_normalizer = TextNormalizer()
+
+
+    def assert_same_phonetic_key(self, first: str, second: str):
+        normalize = self.text_normalizer.normalize
+        phonetic_key = self.text_normalizer.phonetic_key
+
+        self.assertEqual(phonetic_key(normalize(first)), phonetic_key(normalize(second)))
+
+    ## Normalization
+
+    def test_normalize_lowercases_and_folds_accents(self):
+        self.assertEqual(self.text_normalizer.normalize("Café OLÉ"), "cafe ole")
+
+
+    def test_normalize_strips_punctuation_and_underscores(self):
+        self.assertEqual(self.text_normalizer.normalize("it's-a me_mario!"), "itsa memario")
+
+
+    def test_normalize_collapses_whitespace(self):
+        self.assertEqual(self.text_normalizer.normalize("  lots \t of\n space  "), "lots of space")
+
+
+    def test_normalize_collapses_repeated_letters(self):
+        self.assertEqual(self.text_normalizer.normalize("yeeeee"), "ye")
+        self.assertEqual(self.text_normalizer.normalize("reeeeeboot"), "rebot")
+
+
+    def test_normalize_keeps_repeated_digits(self):
+        self.assertEqual(self.text_normalizer.normalize("over 9000"), "over 9000")
+
+
+    def test_normalize_empty(self):
+        self.assertEqual(self.text_normalizer.normalize(""), "")
+
+    ## Phonetic keys
+
+    def test_word_initial_h_is_kept(self):
+        phonetic_key = self.text_normalizer.phonetic_key
+
+        self.assertEqual(phonetic_key("hat"), "ht")
+        self.assertEqual(phonetic_key("horse"), "hrs")
+        self.assertEqual(phonetic_key("hi"), "h")
+
+
+    def test_h_after_consonant_pairs_is_silent(self):
+        phonetic_key = self.text_normalizer.phonetic_key
+
+        self.assertEqual(phonetic_key("ship"), "xp")
+        self.assertEqual(phonetic_key("thumb"), "0m")
+        self.assertEqual(phonetic_key("phone"), "fn")
+
+
+    def test_silent_leading_letters(self):
+        phonetic_key = self.text_normalizer.phonetic_key
+
+        self.assertEqual(phonetic_key("knight"), phonetic_key("night"))
+        self.assertEqual(phonetic_key("wrap"), "rp")
+        self.assertEqual(phonetic_key("gnome"), "nm")
+
+
+    def test_sound_alike_spellings_share_a_key(self):
+        self.assert_same_phonetic_key("phone", "fone")
+        self.assert_same_phonetic_key("cheese", "cheeeeese")
+        self.assert_same_phonetic_key("xylophone", "zylofone")
+
+
+    def test_different_words_have_different_keys(self):
+        phonetic_key = self.text_normalizer.phonetic_key
+
+        self.assertNotEqual(phonetic_key("hat"), phonetic_key("cat"))
+        self.assertNotEqual(phonetic_key("horse"), phonetic_key("rs"))
+
+
+    def test_phonetic_key_is_built_word_by_word(self):
+        phonetic_key = self.text_normalizer.phonetic_key
+
+        self.assertEqual(phonetic_key("phone home"), "fn hm")
+        self.assertEqual(phonetic_key(""), "")
+
+
+if (__name__ == '__main__'):
+    unittest.main()
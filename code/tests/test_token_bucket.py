@@ -0,0 +1,86 @@
+import unittest
+from unittest.mock import patch
+
+from common import token_bucket
+from common.token_bucket import TokenBucketRateLimiter
+from fake_clock import FakeClock
+
+
+class TestTokenBucketRateLimiter(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = patch.object(token_bucket, "time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+    def test_burst_then_limited(self):
+        limiter = TokenBucketRateLimiter(3, 1)
+
+        self.assertEqual([limiter.try_acquire("key") for _ in range(4)], [True, True, True, False])
+        self.assertAlmostEqual(limiter.get_retry_after("key"), 1.0)
+
+
+    def test_refills_over_time(self):
+        limiter = TokenBucketRateLimiter(2, 0.5)
+        limiter.try_acquire("key")
+        limiter.try_acquire("key")
+
+        self.clock.now += 1
+        self.assertFalse(limiter.try_acquire("key"))
+        self.clock.now += 1
+        self.assertTrue(limiter.try_acquire("key"))
+
+
+    def test_refill_is_capped_at_capacity(self):
+        limiter = TokenBucketRateLimiter(2, 1)
+        limiter.try_acquire("key")
+
+        self.clock.now += 100
+        self.assertEqual([limiter.try_acquire("key") for _ in range(3)], [True, True, False])
+
+
+    def test_keys_are_independent(self):
+        limiter = TokenBucketRateLimiter(1, 1)
+
+        self.assertTrue(limiter.try_acquire("a"))
+        self.assertFalse(limiter.try_acquire("a"))
+        self.assertTrue(limiter.try_acquire("b"))
+
+
+    def test_consume_can_go_into_debt(self):
+        limiter = TokenBucketRateLimiter(1, 1)
+        limiter.consume("key", 3)
+
+        self.assertAlmostEqual(limiter.get_retry_after("key"), 3.0)
+
+
+    def test_no_refill_never_recovers(self):
+        limiter = TokenBucketRateLimiter(1, 0)
+        limiter.try_acquire("key")
+
+        self.assertEqual(limiter.get_retry_after("key"), float("inf"))
+
+
+    def test_idle_buckets_expire(self):
+        limiter = TokenBucketRateLimiter(2, 1)
+        limiter.try_acquire("a")
+
+        self.clock.now += 5
+        limiter.try_acquire("b")
+
+        self.assertEqual(len(limiter), 1)
+
+
+    def test_bucket_count_is_capped(self):
+        limiter = TokenBucketRateLimiter(5, 0.001, max_buckets=2)
+        for key in ("a", "b", "c"):
+            limiter.try_acquire(key)
+
+        self.assertEqual(len(limiter), 2)
+        ## The least recently used bucket was forgotten, so it starts out full again
+        self.assertEqual(limiter.get_retry_after("a", 5), 0)
+
+
+if (__name__ == '__main__'):
+    unittest.main()
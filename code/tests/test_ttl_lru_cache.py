@@ -0,0 +1,83 @@
+import unittest
+from unittest.mock import patch
+
+from common import ttl_lru_cache
+from common.ttl_lru_cache import TtlLruCache
+from fake_clock import FakeClock
+
+
+class TestTtlLruCache(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = patch.object(ttl_lru_cache, "time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+    def test_get_and_set(self):
+        cache = TtlLruCache(2, 10)
+        cache.set("a", 1)
+
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("b", "default"), "default")
+
+
+    def test_entries_expire(self):
+        cache = TtlLruCache(2, 10)
+        cache.set("a", 1)
+
+        self.clock.now += 9
+        self.assertEqual(cache.get("a"), 1)
+        self.clock.now += 1
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(len(cache), 0)
+
+
+    def test_least_recently_used_is_evicted(self):
+        cache = TtlLruCache(2, 10)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), 3)
+
+
+    def test_set_refreshes_expiry(self):
+        cache = TtlLruCache(2, 10)
+        cache.set("a", 1)
+
+        self.clock.now += 5
+        cache.set("a", 2)
+        self.clock.now += 9
+
+        self.assertEqual(cache.get("a"), 2)
+
+
+    def test_falsy_values_are_cached(self):
+        cache = TtlLruCache(2, 10)
+        cache.set("a", ())
+
+        self.assertEqual(cache.get("a", None), ())
+
+
+    def test_zero_size_stores_nothing(self):
+        cache = TtlLruCache(0, 10)
+        cache.set("a", 1)
+
+        self.assertIsNone(cache.get("a"))
+
+
+    def test_clear(self):
+        cache = TtlLruCache(2, 10)
+        cache.set("a", 1)
+        cache.clear()
+
+        self.assertEqual(len(cache), 0)
+
+
+if (__name__ == '__main__'):
+    unittest.main()
@@ -0,0 +1,212 @@
+from typing import Iterator
+
+from common.text_normalizer import TextNormalizer
+from modules.clips.models.clip import Clip
+
+
+class ClipCatalog:
+    '''
+    Holds every loaded Clip, and assigns each one a dense integer id. Those ids index straight into the catalog's list,
+    so search indexes and caches can refer to clips with small ints rather than names or object references. Removed
+    clips leave a hole that the next added clip will fill, which keeps the ids dense across incremental reloads.
+
+    The catalog also keeps each clip's normalized search text, and an index of normalized and phonetic name keys to
+    clip ids. Both are maintained as clips are added and removed, so only changed clips are ever normalized. Clips'
+    aliases and tags are kept in a separate index of their own, so that they can be resolved exactly.
+    '''
+
+    ## Phonetic keys shorter than this match far too many clips to be useful
+    MINIMUM_PHONETIC_KEY_LENGTH = 2
+    TAG_PREFIX = "#"
+
+    def __init__(self, text_normalizer: TextNormalizer = None):
+        self.text_normalizer = text_normalizer or TextNormalizer()
+
+        self._clips: list[Clip | None] = []
+        self._ids_by_name: dict[str, int] = {}
+        self._free_ids: list[int] = []
+        self._live_clips: list[Clip] | None = None  # Lazily built list of the clips, without any holes
+        self._search_texts: list[tuple[str, str | None] | None] = []    # Normalized (name, description), by clip id
+        self._clip_ids_by_key: dict[str, set[int]] = {}
+        self._clip_ids_by_label: dict[str, set[int]] = {}  # Aliases and (prefixed) tags, to the ids of their clips
+
+    ## Magic Methods
+
+    def __len__(self) -> int:
+        return len(self._ids_by_name)
+
+
+    def __iter__(self) -> Iterator[Clip]:
+        return iter(self.get_clips())
+
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._ids_by_name
+
+    ## Methods
+
+    def add(self, clip: Clip) -> int:
+        '''Adds the clip to the catalog, assigns it an id, and returns that id. Clip names must be unique.'''
+
+        if (clip.name in self._ids_by_name):
+            raise ValueError(f"A clip named '{clip.name}' has already been loaded")
+
+        search_text = (
+            self.text_normalizer.normalize(clip.name),
+            self.text_normalizer.normalize(clip.description) if clip.description is not None else None
+        )
+
+        if (self._free_ids):
+            clip.id = self._free_ids.pop()
+            self._clips[clip.id] = clip
+            self._search_texts[clip.id] = search_text
+        else:
+            clip.id = len(self._clips)
+            self._clips.append(clip)
+            self._search_texts.append(search_text)
+
+        self._ids_by_name[clip.name] = clip.id
+        self._live_clips = None
+
+        for key in self._build_clip_keys(clip, search_text[0]):
+            self._clip_ids_by_key.setdefault(key, set()).add(clip.id)
+
+        for label in self._build_labels(clip):
+            self._clip_ids_by_label.setdefault(label, set()).add(clip.id)
+
+        return clip.id
+
+
+    def remove(self, clip: Clip) -> bool:
+        '''Removes the clip from the catalog, and frees up its id. Returns True if the clip was in the catalog.'''
+
+        clip_id = self._ids_by_name.get(clip.name)
+        if (clip_id is None or self._clips[clip_id] is not clip):
+            return False
+
+        for index, keys in (
+                (self._clip_ids_by_key, self._build_clip_keys(clip, self._search_texts[clip_id][0])),
+                (self._clip_ids_by_label, self._build_labels(clip))
+        ):
+            for key in keys:
+                clip_ids = index.get(key)
+                if (clip_ids is not None):
+                    clip_ids.discard(clip_id)
+                    if (not clip_ids):
+                        del index[key]
+
+        del self._ids_by_name[clip.name]
+        self._clips[clip_id] = None
+        self._search_texts[clip_id] = None
+        self._free_ids.append(clip_id)
+        self._live_clips = None
+
+        return True
+
+
+    def _build_keys(self, normalized_name: str) -> set[str]:
+        '''Builds the lookup keys for a normalized clip name. Phonetic keys are prefixed to keep them separate.'''
+
+        keys = {normalized_name}
+
+        phonetic_key = self.text_normalizer.phonetic_key(normalized_name)
+        if (len(phonetic_key) >= self.MINIMUM_PHONETIC_KEY_LENGTH):
+            keys.add(f"~{phonetic_key}")
+
+        return keys
+
+
+    def _build_clip_keys(self, clip: Clip, normalized_name: str) -> set[str]:
+        '''Builds the lookup keys for the clip's name, and its aliases'''
+
+        keys = self._build_keys(normalized_name)
+        for alias in clip.aliases:
+            keys.update(self._build_keys(self.text_normalizer.normalize(alias)))
+
+        return keys
+
+
+    def _normalize_label(self, label: str) -> str:
+        return " ".join(label.lower().split())
+
+
+    def _build_labels(self, clip: Clip) -> set[str]:
+        labels = {self._normalize_label(alias) for alias in clip.aliases}
+        labels.update(f"{self.TAG_PREFIX}{self._normalize_label(tag.lstrip(self.TAG_PREFIX))}" for tag in clip.tags)
+
+        return labels
+
+
+    def get(self, name: str) -> Clip | None:
+        '''Gets the clip with the given name, if it exists'''
+
+        clip_id = self._ids_by_name.get(name)
+        if (clip_id is None):
+            return None
+
+        return self._clips[clip_id]
+
+
+    def get_by_id(self, clip_id: int) -> Clip | None:
+        '''Gets the clip with the given id, if it exists'''
+
+        if (0 <= clip_id < len(self._clips)):
+            return self._clips[clip_id]
+
+        return None
+
+
+    def get_clips(self) -> list[Clip]:
+        '''Gets all of the clips, ordered by id. Don't modify the returned list!'''
+
+        if (self._live_clips is None):
+            self._live_clips = [clip for clip in self._clips if clip is not None]
+
+        return self._live_clips
+
+
+    def get_search_text(self, clip_id: int) -> tuple[str, str | None] | None:
+        '''Gets the clip's normalized (name, description), if it exists'''
+
+        if (0 <= clip_id < len(self._search_texts)):
+            return self._search_texts[clip_id]
+
+        return None
+
+
+    def build_search_texts(self) -> tuple[tuple[str, str | None] | None, ...]:
+        '''
+        Builds a tuple of each clip's normalized (name, description), indexed by clip id. Holes are left as None. Each
+        entry is the same object that get_search_text() returns, so they can be compared by identity to check whether
+        an id still refers to the same clip.
+        '''
+
+        return tuple(self._search_texts)
+
+
+    def resolve(self, name: str) -> list[Clip]:
+        '''
+        Gets the clip with the given name, or failing that, the clip(s) with the given alias, or the clips with the given
+        tag (with or without its leading '#'). Ordered by id.
+        '''
+
+        if ((clip := self.get(name)) is not None):
+            return [clip]
+
+        label = self._normalize_label(name)
+        clip_ids = (
+            self._clip_ids_by_label.get(label) or
+            self._clip_ids_by_label.get(f"{self.TAG_PREFIX}{label.lstrip(self.TAG_PREFIX)}", ())
+        )
+
+        return [self._clips[clip_id] for clip_id in sorted(clip_ids)]
+
+
+    def lookup(self, normalized_query: str) -> set[int]:
+        '''Gets the ids of the clips whose normalized name, or phonetic key, matches the (already normalized) query'''
+
+        clip_ids = set()
+        for key in self._build_keys(normalized_query):
+            clip_ids.update(self._clip_ids_by_key.get(key, ()))
+
+        return clip_ids
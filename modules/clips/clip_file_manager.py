@@ -1,12 +1,19 @@
+import hashlib
 import json
 import logging
 import os
+import pickle
 import re
+import struct
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List
 
 from common.configuration import Configuration
 from common.logging import Logging
+from modules.clips.clip_catalog import ClipCatalog
+from modules.clips.clip_search_index import TfidfClipSearchIndex
+from modules.clips.random_clip_picker import RandomClipPicker
 from modules.clips.models.clip import Clip
 from modules.clips.models.clip_group import ClipGroup
 
@@ -15,7 +22,77 @@ CONFIG_OPTIONS = Configuration.load_config(Path(__file__).parent)
 LOGGER = Logging.initialize_logging(logging.getLogger(__name__))
 
 
+class ManifestState:
+    '''A snapshot of a manifest file's stats and contents hash, used to tell if it's changed between reloads'''
+
+    def __init__(self, path: Path, mtime_ns: int, size: int, digest: str):
+        self.path = path
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.digest = digest
+
+
+    def has_same_stats(self, mtime_ns: int, size: int) -> bool:
+        return (self.mtime_ns == mtime_ns and self.size == size)
+
+
+class ClipGroupChanges:
+    '''The result of scanning the clips folder for manifests that have been added, changed, or removed'''
+
+    def __init__(
+            self,
+            manifest_states: dict[Path, ManifestState],
+            loaded_clip_groups: dict[Path, ClipGroup | None],
+            removed_paths: list[Path]
+    ):
+        self.manifest_states = manifest_states
+        self.loaded_clip_groups = loaded_clip_groups    # Freshly loaded groups for new or changed manifests (None if they failed to load)
+        self.removed_paths = removed_paths
+
+    ## Properties
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(self.loaded_clip_groups or self.removed_paths)
+
+
+class ClipCatalogSnapshot:
+    '''
+    Everything needed to restore the clip catalog without parsing the manifests or rebuilding its indexes: the built
+    catalog (with its normalized search texts and key indexes), the loaded clip groups, the search index and random clip
+    picker (if they were built), and the states of the manifests they were loaded from (which are used to tell if the
+    snapshot is still valid). It's all pickled together, so the clips are shared between them rather than duplicated.
+    '''
+
+    def __init__(
+            self,
+            clips_folder_path: Path,
+            manifest_states: dict[Path, ManifestState],
+            clip_groups_by_path: dict[Path, ClipGroup],
+            clip_groups: dict[str, ClipGroup],
+            shadowed_clips: dict[str, list[tuple[Path, Clip]]],
+            catalog: ClipCatalog,
+            search_index: TfidfClipSearchIndex = None,
+            random_clip_picker: RandomClipPicker = None,
+            random_clip_weighting: str = None
+    ):
+        self.clips_folder_path = clips_folder_path
+        self.manifest_states = manifest_states
+        self.clip_groups_by_path = clip_groups_by_path
+        self.clip_groups = clip_groups
+        self.shadowed_clips = shadowed_clips
+        self.catalog = catalog
+        self.search_index = search_index
+        self.random_clip_picker = random_clip_picker
+        self.random_clip_weighting = random_clip_weighting    # The weighting that the random clip picker was built with
+
+
 class ClipFileManager:
+    ## Snapshots start with a magic string and a version, so stale or foreign files can be skipped without unpickling
+    SNAPSHOT_MAGIC = b"CLIPSNAP"
+    SNAPSHOT_VERSION = 4
+    SNAPSHOT_HEADER = struct.Struct(">8sH")
+
     def __init__(self):
         self.clips_manifest_file_name = CONFIG_OPTIONS.get('clips_manifest_file_name', 'manifest.json')
         self.non_letter_regex = re.compile('\W+')   # Compile a regex for filtering non-letter characters
@@ -26,14 +103,62 @@ class ClipFileManager:
         else:
             self.clips_folder_path = Path.joinpath(Path(__file__).parent, CONFIG_OPTIONS.get('clips_folder', 'clips'))
 
+        clips_snapshot_file_path = CONFIG_OPTIONS.get('clips_snapshot_file_path')
+        if (clips_snapshot_file_path):
+            self.clips_snapshot_file_path = Path(clips_snapshot_file_path)
+        else:
+            self.clips_snapshot_file_path = Path.joinpath(Path(__file__).parent, 'clips.snapshot')
+
+        ## Manifests are mostly waiting on the filesystem (especially network storage), so they're loaded in parallel.
+        ## The pool is shared by every scan, since the watcher can scan pretty often.
+        self.clips_load_max_workers = max(int(CONFIG_OPTIONS.get('clips_load_max_workers', 8)), 1)
+        self._load_executor = ThreadPoolExecutor(max_workers=self.clips_load_max_workers, thread_name_prefix="clip_loader")
+
+    ## Methods
+
+    def shutdown(self):
+        '''Shuts down the pool that manifests are loaded in, without waiting on any scan that's in progress'''
+
+        self._load_executor.shutdown(wait=False)
+
+
+    def _list_group_directories(self, path_to_scan: Path) -> List[Path]:
+        '''Lists the directories in the clips folder, each of which can potentially contain a clip group'''
+
+        try:
+            with os.scandir(path_to_scan) as entries:
+                return [Path(entry.path) for entry in entries if entry.is_dir()]
+        except FileNotFoundError:
+            LOGGER.warning(f"Clips folder '{path_to_scan}' doesn't exist, so no clips will be loaded.")
+            return []
+
+
+    def _list_directory(self, path: Path) -> frozenset[str]:
+        '''Lists the names of the files in the given directory, so their existence can be checked in one go'''
+
+        try:
+            with os.scandir(path) as entries:
+                return frozenset(entry.name for entry in entries)
+        except OSError:
+            return frozenset()
+
+
+    def _clip_file_exists(self, path: Path, directory_listings: dict[Path, frozenset[str]]) -> bool:
+        '''Checks the clip's existence against a single (cached) listing of its directory, rather than a stat per clip'''
+
+        if (path.parent not in directory_listings):
+            directory_listings[path.parent] = self._list_directory(path.parent)
+
+        return path.name in directory_listings[path.parent]
+
 
     def discover_clip_groups(self, path_to_scan: Path) -> List[Path]:
         '''Searches the clips folder for .json files that can potentially contain clip groups & clips'''
 
         clip_files = []
-        for directory in os.listdir(path_to_scan):
-            file_path: Path = path_to_scan / directory / self.clips_manifest_file_name
-            if (file_path.exists()):
+        for directory in self._list_group_directories(path_to_scan):
+            file_path: Path = directory / self.clips_manifest_file_name
+            if (file_path.is_file()):
                 clip_files.append(file_path)
 
         return clip_files
@@ -45,6 +170,8 @@ class ClipFileManager:
         it, and return that list
         '''
 
+        directory_listings: dict[Path, frozenset[str]] = {}
+
         ## Insert source[key] (if it exists) into target[key], else insert a default string
         def insert_if_exists(target, source, key, default=None):
             if(key in source):
@@ -57,7 +184,7 @@ class ClipFileManager:
                 name = clip_raw['name']
 
                 path = clip_directory_path / clip_raw['path']
-                if (not path.exists()):
+                if (not self._clip_file_exists(path, directory_listings)):
                     raise FileNotFoundError(f"Clip {name}'s path doesn't exist! {path}")
 
                 kwargs = {}
@@ -66,6 +193,11 @@ class ClipFileManager:
                 help_value = clip_raw.get('help')  # fallback for the help submenus
                 kwargs = insert_if_exists(kwargs, clip_raw, 'help')
                 kwargs = insert_if_exists(kwargs, clip_raw, 'brief', help_value)
+                for key in ('aliases', 'tags'):
+                    values = clip_raw.get(key, [])
+                    if (not isinstance(values, list) or not all(isinstance(value, str) for value in values)):
+                        raise ValueError(f"Clip {name}'s '{key}' must be a list of strings")
+                    kwargs[key] = values
 
                 clip = Clip(name, path, **kwargs)
                 clips.append(clip)
@@ -79,6 +211,22 @@ class ClipFileManager:
         return sorted(clips, key=lambda clip: clip.name)
 
 
+    def get_manifest_state(self, path: Path, previous_state: ManifestState = None) -> ManifestState:
+        '''
+        Gets the current state of the given manifest. If the manifest's stats match the previous state's, then the
+        previous state is reused, otherwise the manifest is hashed so that touched-but-unchanged files can be ignored.
+        '''
+
+        stat = path.stat()
+        if (previous_state is not None and previous_state.has_same_stats(stat.st_mtime_ns, stat.st_size)):
+            return previous_state
+
+        with open(path, 'rb') as fd:
+            digest = hashlib.sha1(fd.read()).hexdigest()
+
+        return ManifestState(path, stat.st_mtime_ns, stat.st_size, digest)
+
+
     def load_clip_group(self, path: Path) -> ClipGroup:
         '''
         Loads a ClipGroup from a given clip file json path.
@@ -126,6 +274,83 @@ class ClipFileManager:
                 return None
 
 
+    def _scan_clip_group_directory(
+            self,
+            directory: Path,
+            previous_states: dict[Path, ManifestState]
+    ) -> tuple[ManifestState, ClipGroup | None, bool] | None:
+        '''
+        Gets the state of the directory's manifest, and loads its clip group if it's new or has changed. Returns the
+        manifest's state, the clip group, and whether or not the group was (re)loaded. Returns None if there's no
+        manifest.
+        '''
+
+        path = directory / self.clips_manifest_file_name
+        previous_state = previous_states.get(path)
+        try:
+            manifest_state = self.get_manifest_state(path, previous_state)
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            LOGGER.warning(f"Unable to read clip group manifest at '{path}'. Skipping...", exc_info=e)
+            return None
+
+        if (previous_state is not None and previous_state.digest == manifest_state.digest):
+            return (manifest_state, None, False)
+
+        try:
+            return (manifest_state, self.load_clip_group(path), True)
+        except Exception as e:
+            ## Likely a half-written manifest, it'll be picked up again once it changes
+            LOGGER.warning(f"Unable to load clip group manifest at '{path}'. Skipping...", exc_info=e)
+            return (manifest_state, None, True)
+
+
+    def scan_clip_groups(self, path_to_scan: Path, previous_states: dict[Path, ManifestState] = None) -> ClipGroupChanges:
+        '''
+        Discovers the manifests in the given folder, and compares them against their previous states. Only the clip
+        groups for manifests that are new or have changed are loaded, and they're loaded in parallel. This only touches
+        the filesystem.
+        '''
+
+        previous_states = previous_states or {}
+        group_directories = self._list_group_directories(path_to_scan)
+
+        manifest_states = {}
+        loaded_clip_groups = {}
+        results = self._load_executor.map(
+            lambda directory: self._scan_clip_group_directory(directory, previous_states),
+            group_directories
+        )
+
+        for result in results:
+            if (result is None):
+                continue
+
+            manifest_state, clip_group, loaded = result
+            manifest_states[manifest_state.path] = manifest_state
+            if (loaded):
+                loaded_clip_groups[manifest_state.path] = clip_group
+
+        removed_paths = [path for path in previous_states if path not in manifest_states]
+
+        return ClipGroupChanges(manifest_states, loaded_clip_groups, removed_paths)
+
+
+    def find_clip_groups_with_missing_files(self, clip_groups_by_path: dict[Path, ClipGroup]) -> list[Path]:
+        '''
+        Finds the (manifest paths of the) clip groups that have a clip whose audio file no longer exists. Snapshots
+        skip loading the manifests, so they need their clips' files checked separately.
+        '''
+
+        directory_listings: dict[Path, frozenset[str]] = {}
+
+        return [
+            path for path, clip_group in clip_groups_by_path.items()
+            if not all(self._clip_file_exists(clip.path, directory_listings) for clip in clip_group.clips)
+        ]
+
+
     def save_clip_group(self, path: Path, clip_group: ClipGroup):
         '''Saves the given ClipGroup as a JSON object at the given path.'''
 
@@ -133,3 +358,55 @@ class ClipFileManager:
 
         with open(path, 'w') as fd:
             json.dump(data, fd, indent=4, ensure_ascii=False)
+
+
+    def save_snapshot(self, snapshot: ClipCatalogSnapshot, path: Path = None):
+        '''Saves the given snapshot of the clip catalog, replacing any existing snapshot atomically'''
+
+        path = path or self.clips_snapshot_file_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        data = self.SNAPSHOT_HEADER.pack(self.SNAPSHOT_MAGIC, self.SNAPSHOT_VERSION)
+        data += pickle.dumps(snapshot, protocol=pickle.HIGHEST_PROTOCOL)
+
+        temp_path = path.with_name(path.name + '.tmp')
+        with open(temp_path, 'wb') as fd:
+            fd.write(data)
+        os.replace(temp_path, path)
+
+
+    def load_snapshot(self, clips_folder_path: Path, path: Path = None) -> ClipCatalogSnapshot | None:
+        '''
+        Loads the snapshot of the clip catalog in a single read. Returns None if there isn't a snapshot, or if it's from
+        a different version or clips folder. Note that the snapshot's manifest states still need to be validated.
+        '''
+
+        path = path or self.clips_snapshot_file_path
+
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            LOGGER.warning(f"Unable to read the clip catalog snapshot at '{path}'", exc_info=e)
+            return None
+
+        if (len(data) < self.SNAPSHOT_HEADER.size):
+            return None
+
+        magic, version = self.SNAPSHOT_HEADER.unpack_from(data)
+        if (magic != self.SNAPSHOT_MAGIC or version != self.SNAPSHOT_VERSION):
+            LOGGER.info(f"Ignoring the clip catalog snapshot at '{path}', as it's from a different version")
+            return None
+
+        try:
+            snapshot: ClipCatalogSnapshot = pickle.loads(memoryview(data)[self.SNAPSHOT_HEADER.size:])
+        except Exception as e:
+            LOGGER.warning(f"Unable to load the clip catalog snapshot at '{path}'", exc_info=e)
+            return None
+
+        if (snapshot.clips_folder_path != clips_folder_path):
+            LOGGER.info(f"Ignoring the clip catalog snapshot at '{path}', as it's from a different clips folder")
+            return None
+
+        return snapshot
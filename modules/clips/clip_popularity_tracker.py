@@ -0,0 +1,70 @@
+from collections import OrderedDict
+
+from common.frequency_sketch import TopKCounter
+
+
+class ClipPopularityTracker:
+    '''
+    Tracks how often each clip is played, globally and per guild, in a fixed amount of memory. Clips are tracked by name
+    (rather than by id), so their counts survive reloads. Only the most recently active guilds are tracked, and the
+    least recently active guild is forgotten once there's too many.
+    '''
+
+    GLOBAL_SKETCH_WIDTH = 4096
+    GUILD_SKETCH_WIDTH = 256
+    SKETCH_DEPTH = 4
+
+    def __init__(self, top_k: int, max_guilds: int):
+        self.top_k = top_k
+        self.max_guilds = max(max_guilds, 0)
+        self._global_counter = TopKCounter(top_k, self.GLOBAL_SKETCH_WIDTH, self.SKETCH_DEPTH)
+        self._guild_counters: OrderedDict[int, TopKCounter] = OrderedDict()
+
+    ## Methods
+
+    def record_play(self, clip_name: str, guild_id: int = None):
+        self._global_counter.add(clip_name)
+
+        if (guild_id is None or self.max_guilds == 0):
+            return
+
+        guild_counter = self._guild_counters.get(guild_id)
+        if (guild_counter is None):
+            guild_counter = TopKCounter(self.top_k, self.GUILD_SKETCH_WIDTH, self.SKETCH_DEPTH)
+            self._guild_counters[guild_id] = guild_counter
+
+            while (len(self._guild_counters) > self.max_guilds):
+                self._guild_counters.popitem(last=False)
+        else:
+            self._guild_counters.move_to_end(guild_id)
+
+        guild_counter.add(clip_name)
+
+
+    def get_play_count(self, clip_name: str) -> int:
+        '''Gets the (estimated) number of times that the clip has been played, across every guild'''
+
+        return self._global_counter.estimate(clip_name)
+
+
+    def get_global_top(self) -> list[str]:
+        '''Gets the names of the most played clips, most played first'''
+
+        return [clip_name for clip_name, _ in self._global_counter.get_top()]
+
+
+    def get_guild_tops(self) -> dict[int, list[str]]:
+        '''Gets the names of each tracked guild's most played clips, most played first'''
+
+        return {
+            guild_id: [clip_name for clip_name, _ in guild_counter.get_top()]
+            for guild_id, guild_counter in self._guild_counters.items()
+        }
+
+
+    def decay(self):
+        '''Halves every play count, so that recent plays outweigh older ones'''
+
+        self._global_counter.decay()
+        for guild_counter in self._guild_counters.values():
+            guild_counter.decay()
@@ -0,0 +1,99 @@
+import heapq
+import math
+from array import array
+from collections import Counter
+from typing import Iterable
+
+
+class TfidfClipSearchIndex:
+    '''
+    A sparse character trigram TF-IDF matrix over the clips' names and descriptions. Each trigram's column is stored
+    as a posting list of (clip id, weight) pairs, with the clips' rows already normalized, so scoring a query against
+    every clip is a single sparse matrix-vector product that yields the cosine similarities directly.
+    '''
+
+    NGRAM_SIZE = 3
+
+    def __init__(self, clip_texts: tuple[tuple[str, str | None] | None, ...]):
+        self.clip_texts = clip_texts    # The (name, description) pairs the index was built from, indexed by clip id
+
+        ## Count each clip's trigrams, and how many clips each trigram appears in
+        clip_ngram_counts: dict[int, Counter] = {}
+        document_frequencies = Counter()
+        for clip_id, clip_text in enumerate(clip_texts):
+            if (clip_text is None):
+                continue
+
+            name, description = clip_text
+            ngram_counts = self._count_ngrams(f"{name} {description}" if description else name)
+            clip_ngram_counts[clip_id] = ngram_counts
+            document_frequencies.update(ngram_counts.keys())
+
+        ## Smoothed inverse document frequencies, so unseen and ubiquitous trigrams don't blow up or zero out
+        document_count = len(clip_ngram_counts)
+        self._idf: dict[str, float] = {
+            ngram: math.log((1 + document_count) / (1 + frequency)) + 1
+            for ngram, frequency in document_frequencies.items()
+        }
+
+        ## Build the normalized rows, and transpose them into per-trigram posting lists
+        postings: dict[str, tuple[array, array]] = {}
+        for clip_id, ngram_counts in clip_ngram_counts.items():
+            for ngram, weight in self._build_vector(ngram_counts).items():
+                if (ngram not in postings):
+                    postings[ngram] = (array('I'), array('f'))
+
+                clip_ids, weights = postings[ngram]
+                clip_ids.append(clip_id)
+                weights.append(weight)
+
+        self._postings = postings
+
+    ## Methods
+
+    def _count_ngrams(self, text: str) -> Counter:
+        '''Counts the character trigrams in the text, padding it so that the start and end of words are captured'''
+
+        text = f" {' '.join(text.lower().split())} "
+        return Counter(text[index:index + self.NGRAM_SIZE] for index in range(len(text) - self.NGRAM_SIZE + 1))
+
+
+    def _build_vector(self, ngram_counts: Counter) -> dict[str, float]:
+        '''Builds a unit length TF-IDF vector from the trigram counts. Trigrams that aren't in the index are dropped.'''
+
+        vector = {}
+        for ngram, count in ngram_counts.items():
+            idf = self._idf.get(ngram)
+            if (idf is not None):
+                vector[ngram] = (1 + math.log(count)) * idf
+
+        norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+        if (norm == 0):
+            return {}
+
+        return {ngram: weight / norm for ngram, weight in vector.items()}
+
+
+    def search(self, query: str, limit: int = 1) -> list[tuple[int, float]]:
+        '''Scores the query against every clip, and returns the (clip id, cosine similarity) of the best matches'''
+
+        scores: dict[int, float] = {}
+        for ngram, query_weight in self._build_vector(self._count_ngrams(query)).items():
+            clip_ids, weights = self._postings[ngram]
+            for clip_id, weight in zip(clip_ids, weights):
+                scores[clip_id] = scores.get(clip_id, 0.0) + query_weight * weight
+
+        return heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+
+
+    def score(self, query: str, clip_ids: Iterable[int]) -> list[tuple[int, float]]:
+        '''Scores the query against just the given clips, and returns the (clip id, cosine similarity) of each match'''
+
+        clip_ids = set(clip_ids)
+        scores: dict[int, float] = {}
+        for ngram, query_weight in self._build_vector(self._count_ngrams(query)).items():
+            for clip_id, weight in zip(*self._postings[ngram]):
+                if (clip_id in clip_ids):
+                    scores[clip_id] = scores.get(clip_id, 0.0) + query_weight * weight
+
+        return list(scores.items())
@@ -1,25 +1,40 @@
+import asyncio
+import heapq
 import logging
 import random
+import time
 from pathlib import Path
+from typing import Callable, Iterable
 
 from common.audio_player import AudioPlayer
 from common.command_management.invoked_command import InvokedCommand
 from common.command_management.invoked_command_handler import InvokedCommandHandler
+from common.command_management.command_rate_limiter import CommandRateLimiter
 from common.command_management.command_reconstructor import CommandReconstructor
 from common.configuration import Configuration
 from common.database.database_manager import DatabaseManager
-from common.exceptions import NoVoiceChannelAvailableException, UnableToConnectToVoiceChannelException
+from common.exceptions import ExecutorPoolFullException, NoVoiceChannelAvailableException, UnableToConnectToVoiceChannelException
+from common.executor_pool import ExecutorPool
 from common.logging import Logging
+from common.metrics.metrics_manager import MetricsManager
 from common.string_similarity import StringSimilarity
+from common.text_normalizer import TextNormalizer
+from common.ttl_lru_cache import TtlLruCache
 from common.module.discoverable_module import DiscoverableCog
 from common.module.module_initialization_container import ModuleInitializationContainer
-from modules.clips.clip_file_manager import ClipFileManager
+from modules.clips.clip_catalog import ClipCatalog
+from modules.clips.clip_popularity_tracker import ClipPopularityTracker
+from modules.clips.clip_search_index import TfidfClipSearchIndex
+from modules.clips.find_results_view import FindResultsView
+from modules.clips.random_clip_picker import RandomClipPicker
+from modules.clips.clip_file_manager import ClipCatalogSnapshot, ClipFileManager, ClipGroupChanges, ManifestState
 from modules.clips.models.clip_group import ClipGroup
 from modules.clips.models.clip import Clip
 
 import discord
 from discord import Interaction, Member
 from discord.app_commands import autocomplete, Choice, describe
+from discord.ext import commands
 from discord.ext.commands import Context, Bot
 
 ## Config & logging
@@ -27,12 +42,90 @@ CONFIG_OPTIONS = Configuration.load_config(Path(__file__).parent)
 LOGGER = Logging.initialize_logging(logging.getLogger(__name__))
 
 
+def calculate_substring_score(message: str, description: str) -> float:
+    """
+    Scores a given string (message) based on how many of it's words exist in another string (description). Both strings
+    should already be normalized (see TextNormalizer), so that repeated letters and accents don't get in the way.
+    """
+
+    message_split = message.split(' ')
+    word_frequency = sum(word in description.split(' ') for word in message_split)
+
+    return word_frequency / len(message_split)
+
+
+def score_clips(
+        search: str,
+        clip_texts: tuple[tuple[str, str | None] | None, ...],
+        string_similarity: StringSimilarity,
+        clip_ids: Iterable[int] = None
+) -> list[float | None]:
+    """
+    Scores the search string against each clip's (name, description) pair, and returns the scores indexed by clip id
+    (with None for any holes left by removed clips, or clips that weren't scored). Each field is batch scored against
+    the search in a single call. If clip_ids are provided, then only those clips are scored.
+    """
+
+    if (clip_ids is None):
+        clip_ids = range(len(clip_texts))
+    clip_ids = [clip_id for clip_id in clip_ids if clip_texts[clip_id] is not None]
+    names = [clip_texts[clip_id][0] for clip_id in clip_ids]
+    name_similarities = string_similarity.batch_similarity(search, names)
+
+    described_clip_ids = [clip_id for clip_id in clip_ids if clip_texts[clip_id][1] is not None]
+    descriptions = [clip_texts[clip_id][1] for clip_id in described_clip_ids]
+    description_similarities = dict(zip(described_clip_ids, string_similarity.batch_similarity(search, descriptions)))
+
+    scores: list[float | None] = [None] * len(clip_texts)
+    for clip_id, name, name_similarity in zip(clip_ids, names, name_similarities):
+        name_score = calculate_substring_score(search, name) + name_similarity / 2
+
+        description_similarity = description_similarities.get(clip_id)
+        if (description_similarity is None):
+            scores[clip_id] = name_score
+        else:
+            description_score = calculate_substring_score(search, clip_texts[clip_id][1]) + description_similarity / 2
+            scores[clip_id] = (name_score + description_score) / 2
+
+    return scores
+
+
+def find_similar_clips(
+        search: str,
+        clip_texts: tuple[tuple[str, str | None] | None, ...],
+        string_similarity: StringSimilarity,
+        limit: int = 1,
+        clip_ids: Iterable[int] = None
+) -> list[tuple[int, float]]:
+    """
+    Scores the search string against each clip (or just the given clip_ids), and returns the index (which is also the
+    clip's id) and score of the best matches, best first. This is kept separate from the cog (and only takes plain data)
+    so that it can run on the executor pool's threads.
+    """
+
+    scores = score_clips(search, clip_texts, string_similarity, clip_ids)
+
+    ## Only keep the best matches around in a bounded heap, rather than sorting every clip's score
+    return heapq.nlargest(
+        limit,
+        ((clip_id, score) for clip_id, score in enumerate(scores) if score is not None and score > 0),
+        key=lambda result: result[1]
+    )
+
+
 class Clips(DiscoverableCog):
     CLIPS_NAME = "clips"
     CLIP_COMMAND_NAME = "clip"
     RANDOM_COMMAND_NAME = "random"
     FIND_COMMAND_NAME = "find"
 
+    ## Search backends for the find command
+    SIMILARITY_SEARCH_BACKEND = "similarity"
+    TFIDF_SEARCH_BACKEND = "tfidf"
+    UNIFORM_RANDOM_WEIGHTING = "uniform"
+    GROUP_RANDOM_WEIGHTING = "group"
+    POPULARITY_RANDOM_WEIGHTING = "popularity"
+
     def __init__(self, bot: Bot, *args, **kwargs):
         super().__init__(bot, *args, **kwargs)
 
@@ -48,30 +141,113 @@ class Clips(DiscoverableCog):
         assert (self.database_manager is not None)
         self.command_reconstructor: CommandReconstructor = kwargs.get('dependencies', {}).get('CommandReconstructor')
         assert (self.command_reconstructor is not None)
+        self.executor_pool: ExecutorPool = kwargs.get('dependencies', {}).get('ExecutorPool')
+        assert (self.executor_pool is not None)
+        self.metrics_manager: MetricsManager = kwargs.get('dependencies', {}).get('MetricsManager')
+        assert (self.metrics_manager is not None)
+        self.command_rate_limiter: CommandRateLimiter = kwargs.get('dependencies', {}).get('CommandRateLimiter')
+        assert (self.command_rate_limiter is not None)
 
         self.clip_file_manager = ClipFileManager()
 
-        self.clips: dict[str, Clip] = {}
+        self.text_normalizer = TextNormalizer()
+        self.catalog = ClipCatalog(self.text_normalizer)
         self.clip_groups: dict[str, ClipGroup] = {}
-        self.find_command_minimum_similarity = float(CONFIG_OPTIONS.get('find_command_minimum_similarity', 0.5))
+        ## Loaded clip groups and the state of their manifests, keyed by manifest path. Used for incremental reloads.
+        self._clip_groups_by_path: dict[Path, ClipGroup] = {}
+        self._manifest_states: dict[Path, ManifestState] = {}
+        ## Clips that were skipped because another group already had a clip with the same name, by name. They're
+        ## restored when that other clip is removed.
+        self._shadowed_clips: dict[str, list[tuple[Path, Clip]]] = {}
+        self._reload_lock = asyncio.Lock()
+        self._watch_task: asyncio.Task = None
+        self.clips_watch_interval_seconds = float(CONFIG_OPTIONS.get('clips_watch_interval_seconds', 0))
+        self.clips_snapshot_enable = CONFIG_OPTIONS.get('clips_snapshot_enable', True)
+        ## Failed background loads are retried, backing off exponentially between each attempt
+        self.clips_load_retry_seconds = max(float(CONFIG_OPTIONS.get('clips_load_retry_seconds', 5)), 0.1)
+        self.clips_load_max_retry_seconds = max(float(CONFIG_OPTIONS.get('clips_load_max_retry_seconds', 300)), self.clips_load_retry_seconds)
+        ## Flattened clip data for searching (indexed by clip id), which can be handed off to the executor pool
+        self._searchable_clip_texts: tuple[tuple[str, str | None], ...] = ()
+        self.string_similarity = StringSimilarity()
+        self.find_command_search_backend = CONFIG_OPTIONS.get('find_command_search_backend', Clips.SIMILARITY_SEARCH_BACKEND)
+        self.search_index: TfidfClipSearchIndex = None
+        self.find_command_result_count = max(int(CONFIG_OPTIONS.get('find_command_result_count', 5)), 1)
+        ## Each backend scores on its own scale (cosine similarities run a fair bit lower), so each has its own cut-offs
+        if (self.find_command_search_backend == Clips.TFIDF_SEARCH_BACKEND):
+            self.find_command_minimum_similarity = float(CONFIG_OPTIONS.get('find_command_tfidf_minimum_similarity', 0.25))
+            self.find_command_close_score_margin = float(CONFIG_OPTIONS.get('find_command_tfidf_close_score_margin', 0.03))
+        else:
+            self.find_command_minimum_similarity = float(CONFIG_OPTIONS.get('find_command_minimum_similarity', 0.5))
+            self.find_command_close_score_margin = float(CONFIG_OPTIONS.get('find_command_close_score_margin', 0.05))
+        ## Caches of the ranked clip ids for recent find and autocomplete queries. The generation is bumped whenever the
+        ## catalog changes, so that searches that straddle a reload don't store results for the old catalog.
+        search_cache_max_size = int(CONFIG_OPTIONS.get('search_cache_max_size', 1024))
+        search_cache_ttl_seconds = float(CONFIG_OPTIONS.get('search_cache_ttl_seconds', 300))
+        self._find_cache = TtlLruCache(search_cache_max_size, search_cache_ttl_seconds)
+        self._autocomplete_cache = TtlLruCache(search_cache_max_size, search_cache_ttl_seconds)
+        self._search_cache_generation = 0
+        ## Play counts for ranking autocomplete results, and the trending clips (by name) that are built from them
+        self.popularity_tracker = ClipPopularityTracker(
+            max(int(CONFIG_OPTIONS.get('clip_popularity_top_k', 10)), 1),
+            int(CONFIG_OPTIONS.get('clip_popularity_max_guilds', 1000))
+        )
+        self.clip_trending_refresh_interval_seconds = float(CONFIG_OPTIONS.get('clip_trending_refresh_interval_seconds', 60))
+        self.clip_popularity_decay_interval_seconds = float(CONFIG_OPTIONS.get('clip_popularity_decay_interval_seconds', 86400))
+        self._trending_clip_names: tuple[str, ...] = ()
+        self._guild_trending_clip_names: dict[int, tuple[str, ...]] = {}
+        self._trending_task: asyncio.Task = None
+        self.random_clip_weighting = CONFIG_OPTIONS.get('random_clip_weighting', Clips.UNIFORM_RANDOM_WEIGHTING)
+        self.random_clip_picker = RandomClipPicker(int(CONFIG_OPTIONS.get('random_clip_recent_repeat_window', 5)))
+
+        ## Metrics
+        self.find_searches_counter = self.metrics_manager.counter(
+            "find_searches_total",
+            "Number of find command searches, by whether they found no match, a single match, or showed a menu of close matches",
+            ("outcome",)
+        )
+        self.find_menu_selections_counter = self.metrics_manager.counter(
+            "find_menu_selections_total",
+            "Number of selections from the find command's menu, by the rank of the selected clip ('none' if it timed out)",
+            ("rank",)
+        )
+        self.find_key_lookups_counter = self.metrics_manager.counter(
+            "find_key_lookups_total",
+            "Number of find command searches that did (or didn't) get extra candidates from the normalized and phonetic key index",
+            ("result",)
+        )
+        self.find_top_score_histogram = self.metrics_manager.histogram(
+            "find_top_score",
+            "Score of the best match for each find command search",
+            buckets=(0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0, 1.25, 1.5)
+        )
+        self.search_cache_requests_counter = self.metrics_manager.counter(
+            "clip_search_cache_requests_total",
+            "Number of find and autocomplete queries that were (or weren't) answered from the search cache",
+            ("cache", "result")
+        )
         self.clips_folder_path = self.clip_file_manager.clips_folder_path
         self.channel_timeout_clip_paths = self.gather_channel_timeout_clip_paths()
         self.audio_player_cog.channel_timeout_handler = self.play_random_channel_timeout_clip
 
-        ## Load and add the clips
-        self.init_clips()
-        self.add_clip_commands()
+        ## The clips themselves are loaded in the background once the bot is ready, see start_loading(). Until then, the
+        ## clip commands are registered up front so that they can let users know that the bot is still warming up.
+        self.is_loaded = False
+        self._load_task: asyncio.Task = None
+        self._load_failures = 0
+        self._clip_commands_registered = False
+        self.clip_groups_changed_listeners: list[Callable[[], None]] = []
+        self.sync_clip_commands()
 
         self.successful = True
 
         ## This decorator needs to reference the injected dependency, thus we're declaring the command here.
         @self.admin_cog.admin.command(no_pm=True)
-        async def reload_clips(ctx: Context):
-            """Reloads the bot's list of clips"""
+        async def reload_clips(ctx: Context, force: bool = False):
+            """Reloads the bot's list of clips. Only changed clip groups are reloaded, unless forced."""
 
             await self.database_manager.store(ctx)
 
-            count = self.reload_clips()
+            count = await self.reload_clips(force)
 
             loaded_clips_string = "Loaded {} clip{}.".format(count, "s" if count != 1 else "")
             await ctx.reply(loaded_clips_string)
@@ -80,68 +256,403 @@ class Clips(DiscoverableCog):
 
     ## Lifecycle-ish
 
+    async def cog_load(self):
+        ## Modules are (re)loaded before the bot's event loop is running at startup, so wait for on_ready in that case
+        if (self.bot.is_ready()):
+            self.start_loading()
+
+
+    async def load_clips(self) -> int:
+        """Loads the clips (off of the event loop), registers the clip commands, and marks the cog as loaded"""
+
+        timings: dict[str, float] = {}
+        started_at = time.perf_counter()
+
+        ## Start from the snapshot if there is one, so that only the manifests that changed since it was taken need to
+        ## be parsed by the reload below
+        if (self.clips_snapshot_enable):
+            phase_started_at = time.perf_counter()
+            snapshot: ClipCatalogSnapshot = await self.executor_pool.run_in_thread(
+                "load_clips_snapshot",
+                self.clip_file_manager.load_snapshot,
+                self.clips_folder_path
+            )
+            timings["snapshot_read"] = time.perf_counter() - phase_started_at
+
+            if (snapshot is not None):
+                phase_started_at = time.perf_counter()
+                async with self._reload_lock:
+                    stale_paths = await self.executor_pool.run_in_thread(
+                        "validate_clips_snapshot",
+                        self.clip_file_manager.find_clip_groups_with_missing_files,
+                        snapshot.clip_groups_by_path
+                    )
+                    await self.restore_snapshot(snapshot, stale_paths)
+                timings["snapshot_apply"] = time.perf_counter() - phase_started_at
+
+        count = await self.reload_clips(timings=timings)
+        self.is_loaded = True
+        self.sync_clip_commands()
+
+        phases = ", ".join(f"{phase}: {seconds:.3f}s" for phase, seconds in timings.items())
+        LOGGER.info(f"Loaded {count} clips in {time.perf_counter() - started_at:.3f}s ({phases})")
+
+        return count
+
+
+    def start_loading(self):
+        """Starts loading the clips in the background, and then watching them for changes. Safe to call more than once."""
+
+        if (self.is_loaded):
+            self.start_watching()
+            self.start_refreshing_trending()
+            return
+
+        if (self._load_task is None or self._load_task.done()):
+            self._load_task = asyncio.get_running_loop().create_task(self._load_clips_in_background())
+
+
+    async def _load_clips_in_background(self):
+        ## Keep trying until the clips load, otherwise every clip command would be stuck warming up until the bot reconnects
+        while (True):
+            try:
+                await self.load_clips()
+                break
+            except Exception as e:
+                self._load_failures += 1
+                retry_seconds = min(
+                    self.clips_load_retry_seconds * 2 ** (self._load_failures - 1),
+                    self.clips_load_max_retry_seconds
+                )
+                LOGGER.exception(f"Unable to load the clips, retrying in {retry_seconds:.0f}s", exc_info=e)
+                await asyncio.sleep(retry_seconds)
+
+        self._load_failures = 0
+        self.start_watching()
+        self.start_refreshing_trending()
+
+
     def cog_unload(self):
         """Removes all existing clips when the cog is unloaded"""
 
+        if (self._load_task is not None):
+            self._load_task.cancel()
+            self._load_task = None
+
+        self.stop_watching()
+        self.stop_refreshing_trending()
+        self.clip_file_manager.shutdown()
+        self.is_loaded = False
         self.remove_clips()
         self.remove_clip_commands()
 
 
-    def reload_clips(self):
-        """Unloads all clip commands from the bot, then reloads all of the clips, and reapplies them to the bot"""
+    async def reload_clips(self, force: bool = False, timings: dict[str, float] = None) -> int:
+        """
+        Reloads the clip groups whose manifests have been added, changed, or removed since the last load, and returns the
+        number of loaded clips. If forced, then every clip group is reloaded. The time spent in each phase of the reload
+        is added to timings, if provided.
+        """
 
-        self.remove_clips()
-        self.remove_clip_commands()
+        timings = timings if timings is not None else {}
+
+        async with self._reload_lock:
+            previous_states = {} if force else dict(self._manifest_states)
+
+            ## Scan the manifests off of the event loop, so other guilds' audio isn't held up by a big reload
+            phase_started_at = time.perf_counter()
+            changes: ClipGroupChanges = await self.executor_pool.run_in_thread(
+                "reload_clips",
+                self.clip_file_manager.scan_clip_groups,
+                self.clips_folder_path,
+                previous_states
+            )
+            timings["scan"] = time.perf_counter() - phase_started_at
+
+            if (not changes.has_changes):
+                return len(self.catalog)
+
+            phase_started_at = time.perf_counter()
+            if (force):
+                self.remove_clips()
+            self.apply_clip_group_changes(changes)
+            timings["apply"] = time.perf_counter() - phase_started_at
+
+            if (self.find_command_search_backend == Clips.TFIDF_SEARCH_BACKEND):
+                phase_started_at = time.perf_counter()
+                await self.rebuild_search_index()
+                timings["search_index"] = time.perf_counter() - phase_started_at
+
+            phase_started_at = time.perf_counter()
+            await self.save_snapshot()
+            timings["snapshot_save"] = time.perf_counter() - phase_started_at
+
+            ## The clip commands' signatures don't depend on the clips themselves, so they only need to be touched when
+            ## there's a change in whether or not any clips are available.
+            self.sync_clip_commands()
+
+            return len(self.catalog)
+
+
+    async def rebuild_search_index(self):
+        """Rebuilds the find command's TF-IDF search index (off of the event loop), if that backend is being used"""
+
+        if (self.find_command_search_backend != Clips.TFIDF_SEARCH_BACKEND):
+            return
+
+        self.search_index = await self.executor_pool.run_in_thread(
+            "build_clip_search_index",
+            TfidfClipSearchIndex,
+            self._searchable_clip_texts
+        )
+        ## Searches that ran against the old index may have missed the newest clips
+        self.invalidate_search_caches()
+
+
+    async def restore_snapshot(self, snapshot: ClipCatalogSnapshot, stale_paths: Iterable[Path] = ()):
+        """
+        Restores the catalog (and its indexes) from the snapshot. The clip groups at the stale paths are left in place
+        for now, but their manifest states are dropped so that the next reload will load them again from scratch.
+        """
+
+        self.catalog = snapshot.catalog
+        self.clip_groups = snapshot.clip_groups
+        self._clip_groups_by_path = snapshot.clip_groups_by_path
+        self._shadowed_clips = snapshot.shadowed_clips
+        self._manifest_states = snapshot.manifest_states
+        self._searchable_clip_texts = self.catalog.build_search_texts()
+        self.invalidate_search_caches()
+
+        for path in stale_paths:
+            LOGGER.info(f"Clip group at '{path}' is missing some of its clips' files, so it'll be reloaded")
+            self._manifest_states.pop(path, None)
+
+        if (self.find_command_search_backend == Clips.TFIDF_SEARCH_BACKEND and snapshot.search_index is not None):
+            self.search_index = snapshot.search_index
+        else:
+            await self.rebuild_search_index()
+
+        ## Popularity weights change as clips are played, so those pickers are always rebuilt
+        if (
+            snapshot.random_clip_picker is not None and
+            snapshot.random_clip_weighting == self.random_clip_weighting and
+            self.random_clip_weighting != Clips.POPULARITY_RANDOM_WEIGHTING
+        ):
+            snapshot.random_clip_picker.recent_repeat_window = self.random_clip_picker.recent_repeat_window
+            self.random_clip_picker = snapshot.random_clip_picker
+        else:
+            self.rebuild_random_clip_picker()
+
+        self.notify_clip_groups_changed()
+        LOGGER.info(f"Restored {len(self.catalog)} clips from the snapshot")
+
+
+    async def save_snapshot(self):
+        """Saves a snapshot of the catalog and its indexes (off of the event loop), for a faster start next time"""
+
+        if (not self.clips_snapshot_enable):
+            return
+
+        save_random_clip_picker = (self.random_clip_weighting != Clips.POPULARITY_RANDOM_WEIGHTING)
+        snapshot = ClipCatalogSnapshot(
+            self.clips_folder_path,
+            dict(self._manifest_states),
+            dict(self._clip_groups_by_path),
+            dict(self.clip_groups),
+            {name: list(shadowed_clips) for name, shadowed_clips in self._shadowed_clips.items()},
+            self.catalog,
+            self.search_index,
+            self.random_clip_picker if save_random_clip_picker else None,
+            self.random_clip_weighting if save_random_clip_picker else None
+        )
+
+        try:
+            await self.executor_pool.run_in_thread("save_clips_snapshot", self.clip_file_manager.save_snapshot, snapshot)
+        except Exception as e:
+            LOGGER.warning("Unable to save the clip catalog snapshot", exc_info=e)
+
+
+    def start_watching(self):
+        """Starts polling the clips folder for manifest changes, if enabled. Safe to call more than once."""
+
+        if (self.clips_watch_interval_seconds <= 0):
+            return
+
+        if (self._watch_task is None or self._watch_task.done()):
+            self._watch_task = asyncio.get_running_loop().create_task(self._watch_clips())
+
+
+    def stop_watching(self):
+        if (self._watch_task is not None):
+            self._watch_task.cancel()
+            self._watch_task = None
+
+
+    async def _watch_clips(self):
+        while (True):
+            await asyncio.sleep(self.clips_watch_interval_seconds)
+
+            try:
+                await self.reload_clips()
+            except Exception as e:
+                LOGGER.exception("Unable to reload the clips while watching for changes", exc_info=e)
+
+
+    def refresh_trending(self):
+        """Rebuilds the trending clips from the play counts. Each guild's own favorites come before the global ones."""
+
+        top_k = self.popularity_tracker.top_k
+        global_top = self.popularity_tracker.get_global_top()
+
+        self._trending_clip_names = tuple(global_top)
+        self._guild_trending_clip_names = {
+            guild_id: tuple(dict.fromkeys([*guild_top, *global_top]))[:top_k]
+            for guild_id, guild_top in self.popularity_tracker.get_guild_tops().items()
+        }
+
+        if (self.random_clip_weighting == Clips.POPULARITY_RANDOM_WEIGHTING):
+            self.rebuild_random_clip_picker()
+
+
+    def rebuild_random_clip_picker(self):
+        """Rebuilds the random clip picker with the configured weighting"""
+
+        if (self.random_clip_weighting == Clips.GROUP_RANDOM_WEIGHTING):
+            ## Every group is equally likely to be picked from (unless its manifest has a 'random_weight'), no matter
+            ## how many clips it has
+            weighted_clips = (
+                (clip, float(clip_group.kwargs.get('random_weight', 1)) / len(clip_group.clips))
+                for clip_group in self._clip_groups_by_path.values()
+                for clip in clip_group.clips if self.catalog.get(clip.name) is clip
+            )
+        elif (self.random_clip_weighting == Clips.POPULARITY_RANDOM_WEIGHTING):
+            weighted_clips = (
+                (clip, 1 + self.popularity_tracker.get_play_count(clip.name)) for clip in self.catalog.get_clips()
+            )
+        else:
+            weighted_clips = ((clip, 1) for clip in self.catalog.get_clips())
+
+        self.random_clip_picker.rebuild(self.catalog, weighted_clips)
+
+
+    def get_trending_clips(self, guild_id: int = None) -> list[Clip]:
+        """Gets the trending clips for the guild (or globally), most popular first"""
+
+        clip_names = self._guild_trending_clip_names.get(guild_id, self._trending_clip_names)
+
+        ## Trending clips may have been removed since the last refresh
+        return [clip for clip_name in clip_names if (clip := self.catalog.get(clip_name)) is not None]
 
-        loaded_clips = self.init_clips()
-        self.add_clip_commands()
 
-        return loaded_clips
+    def start_refreshing_trending(self):
+        """Starts periodically refreshing the trending clips, if enabled. Safe to call more than once."""
+
+        if (self.clip_trending_refresh_interval_seconds <= 0):
+            return
+
+        if (self._trending_task is None or self._trending_task.done()):
+            self._trending_task = asyncio.get_running_loop().create_task(self._refresh_trending_periodically())
+
+
+    def stop_refreshing_trending(self):
+        if (self._trending_task is not None):
+            self._trending_task.cancel()
+            self._trending_task = None
+
+
+    async def _refresh_trending_periodically(self):
+        last_decayed_at = time.monotonic()
+
+        while (True):
+            await asyncio.sleep(self.clip_trending_refresh_interval_seconds)
+
+            try:
+                ## Older plays are worth less and less, so that the trending clips reflect what's been played lately
+                if (
+                    self.clip_popularity_decay_interval_seconds > 0 and
+                    time.monotonic() - last_decayed_at >= self.clip_popularity_decay_interval_seconds
+                ):
+                    self.popularity_tracker.decay()
+                    last_decayed_at = time.monotonic()
+
+                self.refresh_trending()
+            except Exception as e:
+                LOGGER.exception("Unable to refresh the trending clips", exc_info=e)
 
     ## Methods
 
     def remove_clips(self):
         """Unloads the preset clips from the bot's command list."""
 
-        self.clips = {}
+        ## Swap in a new catalog rather than clearing the old one, so in-flight searches still resolve their clip ids
+        self.catalog = ClipCatalog(self.text_normalizer)
         self.clip_groups = {}
+        self._clip_groups_by_path = {}
+        self._manifest_states = {}
+        self._shadowed_clips = {}
+        self._searchable_clip_texts = ()
+        self.search_index = None
+        self.invalidate_search_caches()
+        self.rebuild_random_clip_picker()
+
+
+    def invalidate_search_caches(self):
+        """Drops every cached search result, since the clip ids that they refer to may no longer be valid"""
+
+        self._search_cache_generation += 1
+        self._find_cache.clear()
+        self._autocomplete_cache.clear()
+
+
+    def sync_clip_commands(self):
+        """Registers the clip commands while the clips are loading or available, and unregisters them otherwise"""
+
+        ## Don't register clip commands if no clips have been loaded!
+        should_register = (not self.is_loaded or bool(self.catalog))
+        if (should_register == self._clip_commands_registered):
+            return
+
+        if (should_register):
+            self.add_clip_commands()
+        else:
+            self.remove_clip_commands()
 
 
     def add_clip_commands(self):
         """Adds the clip commands to the bot"""
 
-        ## Don't register clip commands if no clips have been loaded!
-        if (self.clips):
-            ## Add the random command
-            self.add_command(discord.app_commands.Command(
-                name=Clips.RANDOM_COMMAND_NAME,
-                description=self.random_command.__doc__,
-                callback=self.random_command
-            ))
-
-            # Add the find command
-            self.add_command(discord.app_commands.Command(
-                name=Clips.FIND_COMMAND_NAME,
-                description=self.find_command.__doc__,
-                callback=self.find_command
-            ))
-
-            ## Add the clip command
-            ## Wrap the clip command to have access to self in the autocomplete decorator. Unfortunately the parameter
-            ## description decorators must also be moved up here.
-            ## todo: Investigate a workaround that's less ugly?
-            @autocomplete(name=self._clip_name_command_autocomplete)
-            @describe(name="The name of the clip to speak")
-            @describe(user="The user to speak the clip to")
-            async def clip_command_wrapper(interaction: Interaction, name: str, user: discord.Member = None):
-                await self.clip_command(interaction, name, user)
-
-            self.add_command(discord.app_commands.Command(
-                name=Clips.CLIP_COMMAND_NAME,
-                description=self.clip_command.__doc__,
-                callback=clip_command_wrapper,
-                extras={"cog": self}
-            ))
+        ## Add the random command
+        self.add_command(discord.app_commands.Command(
+            name=Clips.RANDOM_COMMAND_NAME,
+            description=self.random_command.__doc__,
+            callback=self.random_command
+        ))
+
+        # Add the find command
+        self.add_command(discord.app_commands.Command(
+            name=Clips.FIND_COMMAND_NAME,
+            description=self.find_command.__doc__,
+            callback=self.find_command
+        ))
+
+        ## Add the clip command
+        ## Wrap the clip command to have access to self in the autocomplete decorator. Unfortunately the parameter
+        ## description decorators must also be moved up here.
+        ## todo: Investigate a workaround that's less ugly?
+        @autocomplete(name=self._clip_name_command_autocomplete)
+        @describe(name="The name of the clip to speak")
+        @describe(user="The user to speak the clip to")
+        async def clip_command_wrapper(interaction: Interaction, name: str, user: discord.Member = None):
+            await self.clip_command(interaction, name, user)
+
+        self.add_command(discord.app_commands.Command(
+            name=Clips.CLIP_COMMAND_NAME,
+            description=self.clip_command.__doc__,
+            callback=clip_command_wrapper,
+            extras={"cog": self}
+        ))
+
+        self._clip_commands_registered = True
 
 
     def remove_clip_commands(self):
@@ -149,6 +660,8 @@ class Clips(DiscoverableCog):
         self.bot.tree.remove_command(Clips.CLIP_COMMAND_NAME)
         self.bot.tree.remove_command(Clips.FIND_COMMAND_NAME)
 
+        self._clip_commands_registered = False
+
 
     def gather_channel_timeout_clip_paths(self) -> list[Path]:
         channel_timeout_clip_paths = list(CONFIG_OPTIONS.get('channel_timeout_clip_paths', []))
@@ -178,33 +691,189 @@ class Clips(DiscoverableCog):
 
 
 
-    def init_clips(self) -> int:
-        """Initialize the clips available to the bot"""
+    def _remove_clip_group(self, path: Path, freed_clip_names: set[str] = None) -> int:
+        """
+        Removes the clip group (and its clips) that was loaded from the given manifest path. The names of the removed
+        clips are added to freed_clip_names, if provided, so that any clips they were shadowing can be restored.
+        """
+
+        clip_group = self._clip_groups_by_path.pop(path, None)
+        if (clip_group is None):
+            return 0
 
-        clip_group_file_paths = self.clip_file_manager.discover_clip_groups(self.clips_folder_path)
         counter = 0
-        for clip_file_path in clip_group_file_paths:
-            starting_count = counter
-            clip_group = self.clip_file_manager.load_clip_group(clip_file_path)
-
-            clip: Clip
-            for clip in clip_group.clips.values():
-                try:
-                    self.clips[clip.name] = clip
-                except Exception as e:
-                    LOGGER.warning("Skipping...", exc_info=e)
-                else:
-                    counter += 1
+        clip: Clip
+        for clip in clip_group.clips:
+            if (self.catalog.remove(clip)):
+                counter += 1
+                if (freed_clip_names is not None):
+                    freed_clip_names.add(clip.name)
+            elif ((shadowed_clips := self._shadowed_clips.get(clip.name)) is not None):
+                shadowed_clips[:] = [shadowed for shadowed in shadowed_clips if shadowed[1] is not clip]
+                if (not shadowed_clips):
+                    del self._shadowed_clips[clip.name]
+
+        if (self.clip_groups.get(clip_group.key) is clip_group):
+            del self.clip_groups[clip_group.key]
+
+        return counter
+
 
-            ## Ensure we don't add in empty clip files into the groupings
-            ## todo: this isn't necessary any more, is it?
-            if(counter > starting_count):
-                self.clip_groups[clip_group.key] = clip_group
+    def _add_clip_group(self, path: Path, clip_group: ClipGroup) -> int:
+        """Makes the given clip group (and its clips) available to the bot"""
+
+        counter = 0
+        clip: Clip
+        for clip in clip_group.clips:
+            try:
+                self.catalog.add(clip)
+            except Exception as e:
+                LOGGER.warning("Skipping...", exc_info=e)
+                if (clip.name in self.catalog):
+                    self._shadowed_clips.setdefault(clip.name, []).append((path, clip))
+            else:
+                counter += 1
+
+        ## Groups are always tracked by path (so their shadowed clips can be restored later), but ensure we don't add
+        ## in empty clip files into the groupings
+        self._clip_groups_by_path[path] = clip_group
+        if (counter > 0):
+            self.clip_groups[clip_group.key] = clip_group
 
-        LOGGER.info(f'Loaded {counter} clip{"s" if counter != 1 else ""}.')
         return counter
 
 
+    def _restore_shadowed_clips(self, clip_names: Iterable[str]) -> int:
+        """Restores the first shadowed clip for each of the given names that's no longer taken, and returns how many were"""
+
+        counter = 0
+        for clip_name in clip_names:
+            if (clip_name in self.catalog or clip_name not in self._shadowed_clips):
+                continue
+
+            shadowed_clips = self._shadowed_clips[clip_name]
+            path, clip = shadowed_clips.pop(0)
+            if (not shadowed_clips):
+                del self._shadowed_clips[clip_name]
+
+            self.catalog.add(clip)
+            counter += 1
+
+            clip_group = self._clip_groups_by_path[path]
+            self.clip_groups.setdefault(clip_group.key, clip_group)
+
+        return counter
+
+
+    def apply_clip_group_changes(self, changes: ClipGroupChanges) -> int:
+        """Swaps out the clip groups that have changed, and returns the number of clips that were added"""
+
+        removed = 0
+        freed_clip_names = set()
+        for path in [*changes.removed_paths, *changes.loaded_clip_groups.keys()]:
+            removed += self._remove_clip_group(path, freed_clip_names)
+
+        added = 0
+        for path, clip_group in changes.loaded_clip_groups.items():
+            if (clip_group is not None):
+                added += self._add_clip_group(path, clip_group)
+
+        ## Clips that were only skipped because of a clip that's just been removed can take its place
+        added += self._restore_shadowed_clips(freed_clip_names)
+
+        self._manifest_states = changes.manifest_states
+        self._searchable_clip_texts = self.catalog.build_search_texts()
+        self.invalidate_search_caches()
+        self.rebuild_random_clip_picker()
+        self.notify_clip_groups_changed()
+
+        LOGGER.info(
+            f'Loaded {added} clip{"s" if added != 1 else ""} and removed {removed} from '
+            f'{len(changes.loaded_clip_groups) + len(changes.removed_paths)} clip group(s). '
+            f'{len(self.catalog)} clips are available.'
+        )
+        return added
+
+
+    def notify_clip_groups_changed(self):
+        for listener in self.clip_groups_changed_listeners:
+            try:
+                listener()
+            except Exception as e:
+                LOGGER.exception("Unable to notify listener of clip group changes", exc_info=e)
+
+
+    async def search_clips(self, search: str, limit: int = 1) -> list[tuple[Clip, float]]:
+        """
+        Searches the clips with the configured backend, and returns the best (up to limit) matching clips and their
+        scores, best first. Raises ExecutorPoolFullException if there's no room to run the search.
+        """
+
+        ## Normalize the search the same way as the clips, which strips out punctuation, accents, and repeated letters
+        search = self.text_normalizer.normalize(search)
+
+        catalog = self.catalog
+        search_index = self.search_index
+
+        ## The cache is emptied whenever the catalog changes, so any cached clip ids are still valid
+        generation = self._search_cache_generation
+        cache_key = (search, limit)
+        if ((cached_results := self._find_cache.get(cache_key)) is not None):
+            self.search_cache_requests_counter.inc(cache="find", result="hit")
+            return [(catalog.get_by_id(clip_id), score) for clip_id, score in cached_results]
+
+        self.search_cache_requests_counter.inc(cache="find", result="miss")
+
+        ## Scoring every clip is CPU heavy, so keep it off of the event loop. Either backend's data (the index, or the
+        ## texts of every clip) is too big to be worth pickling over to a process pool for every search, so it's always
+        ## searched in a thread.
+        if (search_index is not None):
+            clip_texts = search_index.clip_texts
+            results = await self.executor_pool.run_in_thread("find_command", search_index.search, search, limit)
+        else:
+            clip_texts = self._searchable_clip_texts
+            results = await self.executor_pool.run_in_thread(
+                "find_command",
+                find_similar_clips,
+                search,
+                clip_texts,
+                self.string_similarity,
+                limit
+            )
+
+        ## Clips whose normalized name or phonetic key matches the search are extra candidates, scored on the same scale
+        ## as the scan's results. There's only ever a handful of them, so they're cheap enough to score right here.
+        if (key_clip_ids := catalog.lookup(search)):
+            self.find_key_lookups_counter.inc(result="hit")
+
+            ## The catalog can be reloaded while searching, so only score ids that the scanned texts cover
+            key_clip_ids.difference_update(clip_id for clip_id, _ in results)
+            key_clip_ids = {clip_id for clip_id in key_clip_ids if clip_id < len(clip_texts)}
+            if (search_index is not None):
+                key_results = search_index.score(search, key_clip_ids)
+            else:
+                scores = score_clips(search, clip_texts, self.string_similarity, key_clip_ids)
+                key_results = [(clip_id, scores[clip_id]) for clip_id in key_clip_ids if scores[clip_id]]
+
+            results = heapq.nlargest(limit, [*results, *key_results], key=lambda result: result[1])
+        else:
+            self.find_key_lookups_counter.inc(result="miss")
+
+        matches = []
+        for clip_id, score in results:
+            ## The catalog can be reloaded while searching, so make sure that the id still refers to the same clip
+            if (catalog.get_search_text(clip_id) is not clip_texts[clip_id]):
+                continue
+
+            if ((clip := catalog.get_by_id(clip_id)) is not None):
+                matches.append((clip, score))
+
+        if (generation == self._search_cache_generation):
+            self._find_cache.set(cache_key, tuple((clip.id, score) for clip, score in matches))
+
+        return matches
+
+
     def build_clip_command_string(self, clip: Clip, activation_str: str = None) -> str:
         """Builds an example string to invoke the specified clip"""
 
@@ -245,26 +914,59 @@ class Clips(DiscoverableCog):
             LOGGER.error("FileNotFound when invoking `play_audio`", exc_info=e)
             return InvokedCommand(False, e, f"Sorry <@{author.id}>, I can't say that right now.")
 
+        guild = getattr(author, "guild", None)
+        self.popularity_tracker.record_play(clip.name, guild.id if guild is not None else None)
+
         return InvokedCommand(True)
 
+    async def send_warming_up_message(self, interaction: Interaction):
+        """Lets the user know that the clips are still being loaded (or that loading them has been failing)"""
+
+        await self.database_manager.store(interaction, valid=False)
+
+        if (self._load_failures > 0):
+            await interaction.response.send_message(
+                f"Sorry <@{interaction.user.id}>, I'm having trouble loading my clips right now. I'll keep trying, so try again later!",
+                ephemeral=True
+            )
+        else:
+            await interaction.response.send_message(
+                f"Sorry <@{interaction.user.id}>, I'm still warming up. Try again in a moment!", ephemeral=True
+            )
+
     ## Commands
 
     @describe(user="The user to speak the clip to")
     async def random_command(self, interaction: Interaction, user: discord.Member = None):
         """Plays a random clip"""
 
-        clip: Clip = random.choice(list(self.clips.values()))
+        if (not self.is_loaded):
+            await self.send_warming_up_message(interaction)
+            return
+
+        clip: Clip = self.random_clip_picker.pick(interaction.guild_id)
+        ## Every clip can be weighted out of the running (ex. every group has a 'random_weight' of 0)
+        if (clip is None):
+            await self.database_manager.store(interaction, valid=False)
+            await interaction.response.send_message(
+                f"Sorry <@{interaction.user.id}>, there aren't any clips available to choose from.",
+                ephemeral=True
+            )
+            return
 
 
         async def callback(invoked_command: InvokedCommand):
             if (invoked_command.successful):
                 await self.database_manager.store(interaction)
-                await interaction.response.send_message(
+                await self.invoked_command_handler.send_message(
+                    interaction,
                     f"<@{interaction.user.id}> randomly chose **{self.build_clip_command_string(clip)}**"
                 )
             else:
                 await self.database_manager.store(interaction, valid=False)
-                await interaction.response.send_message(invoked_command.human_readable_error_message, ephemeral=True)
+                await self.invoked_command_handler.send_message(
+                    interaction, invoked_command.human_readable_error_message, ephemeral=True
+                )
 
 
         action = lambda: self.play_clip(
@@ -281,20 +983,60 @@ class Clips(DiscoverableCog):
             return Choice(name=f"{clip.name} - {clip.help or clip.brief}", value=clip.name)
 
 
-        if (current.strip() == ""):
-            clips = random.choices(list(self.clips.values()), k=5)
-            return [generate_choice(clip) for clip in clips]
+        def matches(clip: Clip) -> bool:
+            if ((search_text := catalog.get_search_text(clip.id)) is None):
+                return False
+
+            name, description = search_text
+            return query in name or query in (description or "")
+
+
+        if (not self.is_loaded):
+            return []
+
+        ## Match against the normalized query and clip text (like find does), so that differently cased or spaced
+        ## queries share a cache entry
+        catalog = self.catalog
+        query = self.text_normalizer.normalize(current)
+        trending_clips = self.get_trending_clips(interaction.guild_id)
+
+        if (query == ""):
+            if (trending_clips):
+                return [generate_choice(clip) for clip in trending_clips]
+
+            ## Nothing's been played yet, so just suggest a few clips
+            all_clips = catalog.get_clips()
+            return [generate_choice(clip) for clip in random.sample(all_clips, min(len(all_clips), 5))]
         else:
-            clips = [generate_choice(clip) for clip in self.clips.values() if current in clip.name or current in clip.help]
-            return clips[:25] ## Max of 25 results can be returned at once
+            if ((clip_ids := self._autocomplete_cache.get(query)) is not None):
+                self.search_cache_requests_counter.inc(cache="autocomplete", result="hit")
+            else:
+                self.search_cache_requests_counter.inc(cache="autocomplete", result="miss")
+                clip_ids = tuple(clip.id for clip in catalog if matches(clip))[:25]
+                self._autocomplete_cache.set(query, clip_ids)
+
+            ## Put any clips with a matching alias or tag first, then the matching trending clips, followed by the rest
+            ## of the matches
+            clips = catalog.resolve(current)[:25] if current not in catalog else []
+            clips.extend(clip for clip in trending_clips if matches(clip) and clip not in clips)
+            clips.extend(
+                clip for clip_id in clip_ids if (clip := catalog.get_by_id(clip_id)) not in clips
+            )
+
+            return [generate_choice(clip) for clip in clips[:25]] ## Max of 25 results can be returned at once
 
 
     async def clip_command(self, interaction: Interaction, name: str, user: discord.Member = None):
         """Plays the specific clip"""
 
-        ## Get the actual clip from the clip name provided by autocomplete
-        clip: Clip = self.clips.get(name)
-        if (clip is None):
+        if (not self.is_loaded):
+            await self.send_warming_up_message(interaction)
+            return
+
+        ## Get the actual clip from the clip name provided by autocomplete. Aliases resolve to their clip, and tags
+        ## resolve to a random clip with that tag.
+        clips = self.catalog.resolve(name)
+        if (not clips):
             await self.database_manager.store(interaction, valid=False)
             await interaction.response.send_message(
                 f"Sorry <@{interaction.user.id}>, **{name}** isn't a valid clip.",
@@ -302,15 +1044,21 @@ class Clips(DiscoverableCog):
             )
             return
 
+        clip: Clip = random.choice(clips)
+
 
         async def callback(invoked_command: InvokedCommand):
             if (invoked_command.successful):
                 await self.database_manager.store(interaction)
                 clip_command_string = self.build_clip_command_string(clip)
-                await interaction.response.send_message(f"<@{interaction.user.id}> used **{clip_command_string}**")
+                await self.invoked_command_handler.send_message(
+                    interaction, f"<@{interaction.user.id}> used **{clip_command_string}**"
+                )
             else:
                 await self.database_manager.store(interaction, valid=False)
-                await interaction.response.send_message(invoked_command.human_readable_error_message, ephemeral=True)
+                await self.invoked_command_handler.send_message(
+                    interaction, invoked_command.human_readable_error_message, ephemeral=True
+                )
 
 
         action = lambda: self.play_clip(
@@ -327,65 +1075,57 @@ class Clips(DiscoverableCog):
     async def find_command(self, interaction: Interaction, search: str, user: discord.Member = None):
         """Plays the most similar clip"""
 
-        def calc_substring_score(message: str, description: str) -> float:
-            """Scores a given string (message) based on how many of it's words exist in another string (description)"""
-
-            ## Todo: shrink instances of repeated letters down to a single letter in both message and description
-            ##       (ex. yeeeee => ye or reeeeeboot => rebot)
-
-            message_split = message.split(' ')
-            word_frequency = sum(word in description.split(' ') for word in message_split)
-
-            return word_frequency / len(message_split)
-
-
-        ## Strip all non alphanumeric and non whitespace characters out of the message
-        search = "".join(char for char in search.lower() if (char.isalnum() or char.isspace()))
-
-        most_similar_clip = (None, 0)
-        clip: Clip
-        for clip in self.clips.values():
-            scores = []
+        if (not self.is_loaded):
+            await self.send_warming_up_message(interaction)
+            return
 
-            ## Score the clip
-            scores.append(
-                calc_substring_score(search, clip.name) +
-                StringSimilarity.similarity(search, clip.name) / 2
+        ## The search can be held up waiting on the executor pool, so defer if it runs past the latency budget. The
+        ## deferral is public since a single match is announced to everyone, and anything private is sent separately.
+        try:
+            matches, _ = await self.invoked_command_handler.run_within_latency_budget(
+                interaction,
+                self.search_clips(search, self.find_command_result_count),
+                ephemeral=False
             )
-            if (clip.description is not None):
-                scores.append(
-                    calc_substring_score(search, clip.description) +
-                    StringSimilarity.similarity(search, clip.description) / 2
-                )
+        except ExecutorPoolFullException:
+            await self.database_manager.store(interaction, valid=False)
+            await self.invoked_command_handler.send_message(
+                interaction,
+                f"Sorry <@{interaction.user.id}>, I'm a bit busy right now. Try searching again in a moment.",
+                ephemeral=True
+            )
+            return
 
-            distance = sum(scores) / len(scores)
-            if (distance > most_similar_clip[1]):
-                most_similar_clip = (clip, distance)
+        if (matches):
+            self.find_top_score_histogram.observe(matches[0][1])
 
-        if (most_similar_clip[1] < self.find_command_minimum_similarity):
+        matches = [match for match in matches if match[1] >= self.find_command_minimum_similarity]
+        if (not matches):
+            self.find_searches_counter.inc(outcome="no_match")
             await self.database_manager.store(interaction, valid=False)
-            await interaction.response.send_message(
-                f"Sorry <@{interaction.user.id}>, I couldn't find anything close to that.", ephemeral=True
+            await self.invoked_command_handler.send_message(
+                interaction, f"Sorry <@{interaction.user.id}>, I couldn't find anything close to that.", ephemeral=True
             )
             return
 
+        ## If there's a clear winner then play it, otherwise let the user pick from the close matches
+        close_matches = [match for match in matches if matches[0][1] - match[1] < self.find_command_close_score_margin]
+        if (len(close_matches) > 1):
+            self.find_searches_counter.inc(outcome="menu")
+            await self.send_find_results_menu(interaction, close_matches, user)
+            return
+
+        self.find_searches_counter.inc(outcome="single_match")
+        clip = matches[0][0]
+
         ## With the clip found, prepare to speak it!
 
         async def callback(invoked_command: InvokedCommand):
-            if (invoked_command.successful):
-                await self.database_manager.store(interaction)
-                command_string = self.command_reconstructor.reconstruct_command_string(interaction)
-                clip_string = self.build_clip_command_string(most_similar_clip[0])
-                await interaction.response.send_message(
-                    f"<@{interaction.user.id}> searched with **{command_string}**, and found **{clip_string}**"
-                )
-            else:
-                await self.database_manager.store(interaction, valid=False)
-                await interaction.response.send_message(invoked_command.human_readable_error_message, ephemeral=True)
+            await self.send_found_clip_response(interaction, interaction, clip, invoked_command)
 
 
         action = lambda: self.play_clip(
-            most_similar_clip[0],
+            clip,
             author=interaction.user,
             target_member=user or interaction.user,
             interaction=interaction
@@ -393,5 +1133,97 @@ class Clips(DiscoverableCog):
         await self.invoked_command_handler.invoke_command(interaction, action, ephemeral=False, callback=callback)
 
 
+    async def send_found_clip_response(
+            self,
+            interaction: Interaction,
+            response_interaction: Interaction,
+            clip: Clip,
+            invoked_command: InvokedCommand
+    ):
+        """Lets everyone know which clip the find command (invoked via interaction) found, via response_interaction"""
+
+        if (invoked_command.successful):
+            await self.database_manager.store(interaction)
+            command_string = self.command_reconstructor.reconstruct_command_string(interaction)
+            clip_string = self.build_clip_command_string(clip)
+            await self.invoked_command_handler.send_message(
+                response_interaction,
+                f"<@{interaction.user.id}> searched with **{command_string}**, and found **{clip_string}**"
+            )
+        else:
+            await self.database_manager.store(interaction, valid=False)
+            await self.invoked_command_handler.send_message(
+                response_interaction, invoked_command.human_readable_error_message, ephemeral=True
+            )
+
+
+    async def send_find_results_menu(self, interaction: Interaction, matches: list[tuple[Clip, float]], user: discord.Member = None):
+        """Shows the user a menu of the find command's close matches, and plays the one that they pick"""
+
+        menu_message: discord.WebhookMessage = None
+
+
+        async def edit_menu(content: str):
+            ## The menu is a followup if the search was deferred, otherwise it's the interaction's original response
+            try:
+                if (menu_message is not None):
+                    await menu_message.edit(content=content, view=None)
+                else:
+                    await interaction.edit_original_response(content=content, view=None)
+            except discord.HTTPException:
+                pass
+
+
+        async def on_select(select_interaction: Interaction, clip: Clip, rank: int):
+            self.find_menu_selections_counter.inc(rank=str(rank))
+
+            ## Selections aren't app command interactions, so they skip the command tree's rate limiting. Count them
+            ## against the find command instead.
+            if (not await self.command_rate_limiter.interaction_check(select_interaction, Clips.FIND_COMMAND_NAME)):
+                return
+
+            await edit_menu(f"You picked **{clip.name}**.")
+
+
+            async def callback(invoked_command: InvokedCommand):
+                await self.send_found_clip_response(interaction, select_interaction, clip, invoked_command)
+
+
+            action = lambda: self.play_clip(
+                clip,
+                author=interaction.user,
+                target_member=user or interaction.user,
+                interaction=select_interaction
+            )
+            await self.invoked_command_handler.invoke_command(
+                select_interaction,
+                action,
+                ephemeral=False,
+                callback=callback,
+                command_interaction=interaction
+            )
+
+
+        async def on_timeout():
+            self.find_menu_selections_counter.inc(rank="none")
+            await self.database_manager.store(interaction, valid=False)
+
+            await edit_menu("Never mind, that search has expired.")
+
+
+        menu_message = await self.invoked_command_handler.send_message(
+            interaction,
+            f"<@{interaction.user.id}>, I found a few clips that are close to that. Which one did you mean?",
+            view=FindResultsView(matches, on_select, on_timeout),
+            ephemeral=True
+        )
+
+    ## Listeners
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        self.start_loading()
+
+
 def main() -> ModuleInitializationContainer:
-    return ModuleInitializationContainer(Clips, dependencies=["AdminCog", "AudioPlayer", "InvokedCommandHandler", "DatabaseManager", "CommandReconstructor"])
+    return ModuleInitializationContainer(Clips, dependencies=["AdminCog", "AudioPlayer", "InvokedCommandHandler", "DatabaseManager", "CommandReconstructor", "ExecutorPool", "MetricsManager", "CommandRateLimiter"])
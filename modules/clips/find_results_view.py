@@ -0,0 +1,59 @@
+from typing import Awaitable, Callable
+
+from modules.clips.models.clip import Clip
+
+from discord import Interaction, SelectOption
+from discord.ui import Select, View
+
+
+class FindResultsView(View):
+    '''A select menu of the find command's closest matches, which lets the user pick the clip that they meant'''
+
+    TIMEOUT_SECONDS = 60
+    MAX_TEXT_LENGTH = 100   # Discord's limit for select option labels and descriptions
+
+    def __init__(
+            self,
+            matches: list[tuple[Clip, float]],
+            on_select: Callable[[Interaction, Clip, int], Awaitable[None]],
+            on_timeout: Callable[[], Awaitable[None]]
+    ):
+        super().__init__(timeout=self.TIMEOUT_SECONDS)
+
+        self._matches = matches
+        self._on_select = on_select
+        self._on_timeout = on_timeout
+        self.selected = False
+
+        ## Options are keyed by their (1-based) rank in the matches
+        self.select = Select(
+            placeholder="Did you mean...",
+            options=[
+                SelectOption(
+                    label=clip.name[:self.MAX_TEXT_LENGTH],
+                    value=str(rank),
+                    description=(clip.help or clip.brief or clip.description or "")[:self.MAX_TEXT_LENGTH] or None
+                )
+                for rank, (clip, _) in enumerate(matches, start=1)
+            ]
+        )
+        self.select.callback = self._select_callback
+        self.add_item(self.select)
+
+    ## Methods
+
+    async def _select_callback(self, interaction: Interaction):
+        ## Ignore any extra selections that sneak in before the menu is removed
+        if (self.selected):
+            return
+
+        self.selected = True
+        self.stop()
+
+        rank = int(self.select.values[0])
+        await self._on_select(interaction, self._matches[rank - 1][0], rank)
+
+
+    async def on_timeout(self):
+        if (not self.selected):
+            await self._on_timeout()
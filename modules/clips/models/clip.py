@@ -1,4 +1,5 @@
 import logging
+import sys
 from pathlib import Path
 
 from common.logging import Logging
@@ -7,36 +8,61 @@ from modules.clips.to_dict import ToDict
 ## Logging
 LOGGER = Logging.initialize_logging(logging.getLogger(__name__))
 
+
+def _intern(value: str | None) -> str | None:
+    ## Lots of clips share the same help/brief/description text, so only keep one copy of each string around
+    return sys.intern(value) if isinstance(value, str) else value
+
+
 class Clip(ToDict):
+    ## Libraries can hold tens of thousands of clips, so skip the per-instance __dict__
+    __slots__ = (
+        'id', 'name', '_path', 'help', 'brief', 'description', '_derived_description', 'is_music', 'aliases', 'tags'
+    )
+
     def __init__(self, name: str, path: Path, **kwargs):
-        self.name = name
-        self.path = path
-        self.help = kwargs.get('help')
-        self.brief = kwargs.get('brief')
-        self.description = kwargs.get('description')
+        self.id: int = None     # Assigned by the ClipCatalog
+        self.name = _intern(name)
+        self._path = str(path)
+        self.help = _intern(kwargs.get('help'))
+        self.brief = _intern(kwargs.get('brief'))
+        self.description = _intern(kwargs.get('description'))
         self._derived_description = kwargs.get('derived_description', False)
         self.is_music = kwargs.get('is_music', False)
-        self.kwargs = kwargs
+        ## Alternate names that the clip can be played with, and tags that group it with similar clips
+        self.aliases: tuple[str, ...] = tuple(_intern(alias) for alias in kwargs.get('aliases', ()))
+        self.tags: tuple[str, ...] = tuple(_intern(tag) for tag in kwargs.get('tags', ()))
 
 
     def __str__(self):
-        return f"{self.name} - {self.__dict__}"
+        return f"{self.name} - {self._get_attributes()}"
+
+    ## Properties
+
+    @property
+    def path(self) -> Path:
+        return Path(self._path)
 
     ## Methods
 
     def to_dict(self) -> dict:
         data = super().to_dict()
 
-        del data['kwargs']
+        del data['id']
 
-        if (self.encoded != True):
-            del data['encoded']
+        if (getattr(self, 'encoded', None) != True):
+            data.pop('encoded', None)
         if (self.help is None):
             del data['help']
         if (self.brief is None):
             del data['brief']
         if (not self.is_music):
             del data['is_music']
+        for key in ('aliases', 'tags'):
+            if (data[key]):
+                data[key] = list(data[key])
+            else:
+                del data[key]
         if (self._derived_description and 'description' in data):
             del data['description']
 
@@ -20,12 +20,12 @@ class ClipGroup(ToDict):
         self.path = path
         self.kwargs = kwargs
 
-        self.clips = {}
+        self.clips: list[Clip] = []
 
     ## Methods
 
     def add_clip(self, clip: Clip):
-        self.clips[clip.name] = clip
+        self.clips.append(clip)
 
 
     def add_all_clips(self, clips: List[Clip]):
@@ -42,6 +42,6 @@ class ClipGroup(ToDict):
         for key, value in self.kwargs.items():
             data[key] = value
 
-        data['clips'] = [clip.to_dict() for clip in self.clips.values()]
+        data['clips'] = [clip.to_dict() for clip in self.clips]
 
         return data
@@ -0,0 +1,86 @@
+import random
+from collections import OrderedDict, deque
+from typing import Iterable
+
+from common.alias_sampler import AliasSampler
+from modules.clips.clip_catalog import ClipCatalog
+from modules.clips.models.clip import Clip
+
+
+class RandomClipPicker:
+    '''
+    Picks weighted random clips in constant time. The weights are baked into an AliasSampler whenever the catalog (or
+    the weights) change, rather than on every pick. Each guild's most recent picks can also be avoided, so that the
+    same clip doesn't come up twice in a row.
+    '''
+
+    MAX_ATTEMPTS = 8    # How many times to redraw a recently picked clip, before giving up and allowing the repeat
+    MAX_GUILDS = 1000
+
+    def __init__(self, recent_repeat_window: int = 0):
+        self.recent_repeat_window = max(recent_repeat_window, 0)
+        self._catalog: ClipCatalog = None
+        self._clip_ids: tuple[int, ...] = ()
+        self._sampler: AliasSampler = None
+        self._recent_clip_ids: OrderedDict[int, deque[int]] = OrderedDict()
+
+    ## Magic Methods
+
+    def __getstate__(self) -> dict:
+        ## The recent picks change with every pick (and don't matter much after a restart), so leave them out of pickles
+        state = self.__dict__.copy()
+        state['_recent_clip_ids'] = OrderedDict()
+
+        return state
+
+    ## Methods
+
+    def rebuild(self, catalog: ClipCatalog, weighted_clips: Iterable[tuple[Clip, float]]):
+        '''Rebuilds the sampler from the (clip, weight) pairs. Clips without a positive weight will never be picked.'''
+
+        clip_ids = []
+        weights = []
+        for clip, weight in weighted_clips:
+            if (weight > 0):
+                clip_ids.append(clip.id)
+                weights.append(weight)
+
+        self._catalog = catalog
+        self._clip_ids = tuple(clip_ids)
+        self._sampler = AliasSampler(weights) if clip_ids else None
+
+
+    def _remember(self, guild_id: int, clip_id: int):
+        recent_clip_ids = self._recent_clip_ids.get(guild_id)
+        if (recent_clip_ids is None):
+            recent_clip_ids = deque(maxlen=self.recent_repeat_window)
+            self._recent_clip_ids[guild_id] = recent_clip_ids
+
+            while (len(self._recent_clip_ids) > self.MAX_GUILDS):
+                self._recent_clip_ids.popitem(last=False)
+        else:
+            self._recent_clip_ids.move_to_end(guild_id)
+
+        recent_clip_ids.append(clip_id)
+
+
+    def pick(self, guild_id: int = None, rng: random.Random = random) -> Clip | None:
+        '''Picks a random clip, avoiding the guild's recent picks where possible'''
+
+        if (self._sampler is None):
+            return None
+
+        recent_clip_ids = ()
+        if (guild_id is not None and self.recent_repeat_window > 0):
+            recent_clip_ids = self._recent_clip_ids.get(guild_id, ())
+
+        clip_id = None
+        for _ in range(self.MAX_ATTEMPTS):
+            clip_id = self._clip_ids[self._sampler.sample(rng)]
+            if (clip_id not in recent_clip_ids):
+                break
+
+        if (guild_id is not None and self.recent_repeat_window > 0):
+            self._remember(guild_id, clip_id)
+
+        return self._catalog.get_by_id(clip_id)
@@ -1,6 +1,24 @@
 import copy
 
 class ToDict:
+    ## Keep subclasses free to use __slots__
+    __slots__ = ()
+
+    def _get_attributes(self) -> dict:
+        '''Gets the instance's attributes, whether they're stored in __dict__ or __slots__'''
+
+        if (hasattr(self, '__dict__')):
+            return self.__dict__
+
+        attributes = {}
+        for cls in reversed(type(self).__mro__):
+            for name in getattr(cls, '__slots__', ()):
+                if (hasattr(self, name)):
+                    attributes[name] = getattr(self, name)
+
+        return attributes
+
+
     def to_dict(self) -> dict:
         def attempt_map_privates_to_properties(data: dict) -> dict:
             mapped_data = {}
@@ -20,7 +38,7 @@ class ToDict:
             return mapped_data
 
 
-        data = copy.deepcopy(self.__dict__)
+        data = copy.deepcopy(self._get_attributes())
         data = attempt_map_privates_to_properties(data)
 
         return data